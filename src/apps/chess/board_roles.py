@@ -0,0 +1,216 @@
+import string
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, NamedTuple, Self, cast, get_args
+
+import chess
+
+from .helpers import symbol_from_piece_role
+from .types import PieceRole
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from .types import ChessMoveResult, PieceRoleBySquare, PlayerSide, Square
+
+# The interned table of all the roles a piece can have on the board.
+# A role is stored as its index in this table, plus one - 0 means "empty square".
+# ⚠️ The codes end up in the players' cookies: new roles can be appended to the
+# `PieceRole` type, but existing ones must never be reordered.
+PIECE_ROLES: tuple["PieceRole", ...] = get_args(PieceRole)
+_PIECE_ROLE_CODES: dict["PieceRole", int] = {
+    role: code for code, role in enumerate(PIECE_ROLES, start=1)
+}
+
+_SQUARES = cast(tuple["Square", ...], tuple(chess.SQUARE_NAMES))
+_SQUARE_INDEXES: dict["Square", int] = {
+    square: index for index, square in enumerate(_SQUARES)
+}
+
+# Each square is encoded as a single char in the cookie, following the same codes.
+# (we have 64 chars there, so they can also be used to encode square indexes)
+_EMPTY_SQUARE_CHAR = "."
+_CODE_CHARS = _EMPTY_SQUARE_CHAR + string.ascii_letters + string.digits + "_"
+assert len(_CODE_CHARS) == 64 and len(_CODE_CHARS) > len(PIECE_ROLES)
+_ENCODING_TABLE = bytes.maketrans(bytes(range(len(_CODE_CHARS))), _CODE_CHARS.encode())
+_DECODING_TABLE = bytes.maketrans(_CODE_CHARS.encode(), bytes(range(len(_CODE_CHARS))))
+# From role codes to the FEN symbols of the pieces - "." for empty squares:
+_FEN_SYMBOLS_TABLE = bytes.maketrans(
+    bytes(range(len(PIECE_ROLES) + 1)),
+    (
+        _EMPTY_SQUARE_CHAR
+        + "".join(symbol_from_piece_role(role) for role in PIECE_ROLES)
+    ).encode(),
+)
+# (longest runs of empty squares first)
+_EMPTY_SQUARES_RUNS = tuple(
+    (_EMPTY_SQUARE_CHAR * count, str(count)) for count in range(8, 0, -1)
+)
+
+
+class BoardRolesMove(NamedTuple):
+    """What `BoardRoles.apply_move()` changed - so it can be reverted."""
+
+    captured_piece_role: "PieceRole | None"
+    # (square index, previous role code) pairs, in the order they were changed:
+    previous_codes: tuple[tuple[int, int], ...]
+
+    def encode(self) -> str:
+        """
+        Returns a short string (2 chars per changed square), to be stored in a cookie.
+        Only what's needed by `revert_move()` is encoded.
+        """
+        return (
+            bytes(code for change in self.previous_codes for code in change)
+            .translate(_ENCODING_TABLE)
+            .decode()
+        )
+
+    @classmethod
+    def decode(cls, encoded: str) -> Self:
+        if len(encoded) % 2 or encoded.strip(_CODE_CHARS):
+            raise ValueError(f"Invalid encoded board roles move: '{encoded}'")
+        codes = encoded.encode().translate(_DECODING_TABLE)
+        return cls(
+            captured_piece_role=None,
+            previous_codes=tuple(zip(codes[::2], codes[1::2], strict=True)),
+        )
+
+
+class BoardRoles(Mapping["Square", "PieceRole"]):
+    """
+    The role of each piece on the board, stored in a fixed 64-slot array of role codes
+    indexed like the `chess` library's squares (a1, b1, ... h8).
+
+    It can be used as a read-only `Mapping[Square, PieceRole]` - i.e. like a
+    `PieceRoleBySquare` dict - but moves are applied (and reverted) in place.
+    """
+
+    __slots__ = ("_codes",)
+
+    def __init__(self, codes: bytearray | None = None):
+        self._codes = codes if codes is not None else bytearray(64)
+
+    @classmethod
+    def from_piece_role_by_square(
+        cls, piece_role_by_square: "PieceRoleBySquare"
+    ) -> Self:
+        codes = bytearray(64)
+        for square, role in piece_role_by_square.items():
+            codes[_SQUARE_INDEXES[square]] = _PIECE_ROLE_CODES[role]
+        return cls(codes)
+
+    def to_piece_role_by_square(self) -> "PieceRoleBySquare":
+        return dict(self.items())
+
+    def encode(self) -> str:
+        """Returns a 64-chars string, to be stored in a cookie."""
+        return self._codes.translate(_ENCODING_TABLE).decode()
+
+    @classmethod
+    def decode(cls, encoded: str) -> Self:
+        if len(encoded) != 64 or encoded.strip(_CODE_CHARS):
+            raise ValueError(f"Invalid encoded board roles: '{encoded}'")
+        codes = bytearray(encoded.encode().translate(_DECODING_TABLE))
+        if max(codes) > len(PIECE_ROLES):
+            raise ValueError(f"Invalid encoded board roles: '{encoded}'")
+        return cls(codes)
+
+    def pack(self) -> bytes:
+        """
+        Returns the (square index, role code) pairs of the occupied squares - which is
+        more compact than `encode()` for binary formats.
+        """
+        packed = bytearray()
+        for index, code in enumerate(self._codes):
+            if code:
+                packed += bytes((index, code))
+        return bytes(packed)
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        if len(packed) % 2:
+            raise ValueError(f"Invalid packed board roles: {packed!r}")
+        codes = bytearray(64)
+        for index, code in zip(packed[::2], packed[1::2], strict=True):
+            if index > 63 or not 0 < code <= len(PIECE_ROLES):
+                raise ValueError(f"Invalid packed board roles: {packed!r}")
+            codes[index] = code
+        return cls(codes)
+
+    def board_fen(self) -> str:
+        """Returns the pieces placement part of the FEN of this board."""
+        squares = self._codes.translate(_FEN_SYMBOLS_TABLE).decode()
+        # (FENs start with the 8th rank, while our squares start with a1)
+        board_fen = "/".join(
+            squares[rank_start : rank_start + 8] for rank_start in range(56, -1, -8)
+        )
+        for empty_squares, count in _EMPTY_SQUARES_RUNS:
+            board_fen = board_fen.replace(empty_squares, count)
+        return board_fen
+
+    def copy(self) -> Self:
+        return self.__class__(self._codes.copy())
+
+    def apply_move(
+        self, move_result: "ChessMoveResult", *, active_player_side: "PlayerSide"
+    ) -> BoardRolesMove:
+        """
+        Updates the board in place, following the result of a `do_chess_move` call.
+        The returned object can be passed to `revert_move()` to restore the board.
+        """
+        codes = self._codes
+        previous_codes: list[tuple[int, int]] = []
+
+        def set_code(index: int, code: int) -> None:
+            previous_codes.append((index, codes[index]))
+            codes[index] = code
+
+        if promotion := move_result["promotion"]:
+            # Let's promote that piece!
+            promoted_square_index = _SQUARE_INDEXES[move_result["moves"][0][0]]
+            promoted_role = PIECE_ROLES[codes[promoted_square_index] - 1] + (
+                promotion.upper() if active_player_side == "w" else promotion
+            )
+            set_code(
+                promoted_square_index,
+                _PIECE_ROLE_CODES[cast("PieceRole", promoted_role)],
+            )
+
+        captured_piece_role: "PieceRole | None" = None
+        if captured := move_result["captured"]:
+            captured_square_index = _SQUARE_INDEXES[captured]
+            captured_piece_role = PIECE_ROLES[codes[captured_square_index] - 1]
+            set_code(captured_square_index, 0)  # this square is now empty
+
+        for move_from, move_to in move_result["moves"]:
+            from_index, to_index = _SQUARE_INDEXES[move_from], _SQUARE_INDEXES[move_to]
+            set_code(to_index, codes[from_index])
+            set_code(from_index, 0)  # this square is now empty
+
+        return BoardRolesMove(
+            captured_piece_role=captured_piece_role,
+            previous_codes=tuple(previous_codes),
+        )
+
+    def revert_move(self, move: BoardRolesMove) -> None:
+        for index, previous_code in reversed(move.previous_codes):
+            self._codes[index] = previous_code
+
+    def __getitem__(self, square: "Square") -> "PieceRole":
+        if not (code := self._codes[_SQUARE_INDEXES[square]]):
+            raise KeyError(square)
+        return PIECE_ROLES[code - 1]
+
+    def __iter__(self) -> "Iterator[Square]":
+        return (_SQUARES[index] for index, code in enumerate(self._codes) if code)
+
+    def __len__(self) -> int:
+        return 64 - self._codes.count(0)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BoardRoles):
+            return self._codes == other._codes
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_piece_role_by_square()!r})"
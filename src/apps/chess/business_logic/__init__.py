@@ -2,5 +2,9 @@
 
 from ._calculate_fen_before_move import calculate_fen_before_move
 from ._calculate_piece_available_targets import calculate_piece_available_targets
-from ._compute_game_score import compute_game_score
+from ._compute_game_score import (
+    GameScoreEngine,
+    compute_game_score,
+    compute_games_scores,
+)
 from ._do_chess_move import do_chess_move
@@ -1,13 +1,23 @@
 import logging
-from typing import TYPE_CHECKING
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Literal
 
 import chess
 import chess.engine
 from django.conf import settings
 
+from ..consts import MATE_SCORE
+from ..uci_engine_pool import get_uci_engine_pool
+
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from concurrent.futures import Executor
+
     from ..types import FEN
 
+GameScoreEngine = Literal["uci", "andoma"]
+
 _logger = logging.getLogger(__name__)
 
 
@@ -34,15 +44,61 @@ def compute_game_score(
     )
 
     try:
-        engine = chess.engine.SimpleEngine.popen_uci(settings.STOCKFISH_PATH)
-    except chess.engine.EngineTerminatedError as exc:
-        _logger.error("Stockfish engine terminated before analyze: %s", exc)
+        return get_uci_engine_pool().score(chess_board=chess_board)
+    except (chess.engine.EngineError, chess.engine.EngineTerminatedError) as exc:
+        _logger.error("Stockfish engine failed to analyse the game: %s", exc)
         return 0
 
-    info = engine.analyse(
-        chess_board, chess.engine.Limit(time=settings.STOCKFISH_TIME_LIMIT)
+
+def compute_games_scores(
+    fens: "Sequence[FEN]",
+    *,
+    engine: GameScoreEngine = "uci",
+    workers: int | None = None,
+    andoma_depth: int = 3,
+    executor: "Executor | None" = None,
+) -> list[int]:
+    """
+    Same as `compute_game_score`, for many games at once: their positions are
+    analysed concurrently by up to `workers` engines.
+
+    With the "uci" engine these are processes of our pool of Stockfish processes,
+    while the "andoma" one - our bundled Python engine, for when no Stockfish binary
+    is available - is run in a pool of `workers` Python processes. An `executor`
+    can be given for that, so that it can be re-used between calls.
+    ⚠ This function is blocking too, and can take a while to return!
+    """
+    _logger.info("Computing game scores for %s FENs with %s", len(fens), engine)
+
+    if engine == "uci":
+        return get_uci_engine_pool().score_many(fens, concurrency=workers)
+
+    if executor is not None:
+        return list(executor.map(_andoma_score, fens, [andoma_depth] * len(fens)))
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return list(executor.map(_andoma_score, fens, [andoma_depth] * len(fens)))
+
+
+def _andoma_score(fen: "FEN", depth: int) -> int:
+    # N.B. This runs in our worker processes: it must stay free of Django-related stuff.
+    from lib.chess_engines.andoma.movegeneration import (
+        MATE_SCORE as ANDOMA_MATE_SCORE,
+        MATE_THRESHOLD,
+        Searcher,
+        TranspositionTable,
     )
-    advantage = info["score"].white().score()
-    engine.quit()
 
-    return advantage or 0
+    searcher = Searcher(transposition_table=TranspositionTable())
+    searcher.search(chess.Board(fen), depth)
+    score = searcher.score
+    if score is None:
+        return 0
+    if abs(score) >= MATE_THRESHOLD:
+        # Andoma's mate scores lose 1 point per ply between the root's move and the
+        # mate: we convert them to our own bounded mate scores, like UCI ones.
+        plies = ANDOMA_MATE_SCORE - round(abs(score))
+        mate_in_moves = plies // 2 + 1
+        return (MATE_SCORE - mate_in_moves) * (1 if score > 0 else -1)
+    return round(score)
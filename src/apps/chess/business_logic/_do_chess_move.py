@@ -1,4 +1,3 @@
-from functools import lru_cache
 from typing import TYPE_CHECKING, Literal, cast
 
 import chess
@@ -8,6 +7,7 @@ from apps.chess.helpers import (
     file_and_rank_from_square,
     square_from_file_and_rank,
 )
+from apps.chess.move_results_cache import get_move_results_cache
 from apps.chess.types import (
     ChessInvalidMoveException,
     ChessMoveResult,
@@ -62,8 +62,17 @@ _EN_PASSANT_CAPTURED_PIECES_RANK_CONVERSION: dict["Rank", "Rank"] = {
 }
 
 
-@lru_cache(maxsize=512)
 def do_chess_move(*, fen: "FEN", from_: "Square", to: "Square") -> ChessMoveResult:
+    # The results are shared between our workers - see `move_results_cache.py`:
+    return get_move_results_cache().get_or_compute(
+        fen=fen,
+        from_=from_,
+        to=to,
+        compute=lambda: _do_chess_move(fen=fen, from_=from_, to=to),
+    )
+
+
+def _do_chess_move(*, fen: "FEN", from_: "Square", to: "Square") -> ChessMoveResult:
     moves: list["MoveTuple"] = []
     captured: "Square | None" = None
 
@@ -1,13 +1,13 @@
 import json
-from functools import cache
+from functools import cache, lru_cache
 from string import Template
-from typing import TYPE_CHECKING, Literal, cast
+from typing import TYPE_CHECKING, Literal, NamedTuple, cast
 
 from chess import FILE_NAMES, RANK_NAMES
 from django.conf import settings
 from django.templatetags.static import static
 from dominate.tags import button, div, section, span
-from dominate.util import raw as unescaped_html
+from dominate.util import escape as escape_html, raw as unescaped_html
 
 from ..helpers import (
     file_and_rank_from_square,
@@ -16,6 +16,7 @@ from ..helpers import (
     type_from_piece_role,
 )
 from ..models import UserPrefsBoardTexture, UserPrefsGameSpeed
+from ..position_analysis import get_position_analysis
 from .chess_helpers import (
     chess_unit_symbol_class,
     piece_character_classes,
@@ -29,7 +30,7 @@ if TYPE_CHECKING:
     from dominate.tags import dom_tag
 
     from ..presenters import GamePresenter
-    from ..types import Factions, PieceRole, PieceType, PlayerSide, Square
+    from ..types import FEN, Faction, Factions, PieceRole, PlayerSide, Square
 
 
 SQUARE_COLOR_TAILWIND_CLASSES = ("bg-chess-square-dark", "bg-chess-square-light")
@@ -86,6 +87,13 @@ _PLAY_SOLUTION_JS_TEMPLATE = Template(
 )
 
 
+def _use_html_fast_path() -> bool:
+    # Our "*_html()" fast path functions render the same HTML than dominate's
+    # non-pretty mode - which is the one we use when we're not in DEBUG mode, for
+    # the HTMX fragments as well as for the full pages (see `layout.document()`).
+    return not settings.DEBUG
+
+
 def chess_arena(
     *, game_presenter: "GamePresenter", status_bars: "list[dom_tag]", board_id: str
 ) -> "dom_tag":
@@ -177,14 +185,21 @@ def chess_board(*, game_presenter: "GamePresenter", board_id: str) -> "dom_tag":
         game_presenter.force_square_info or game_presenter.is_preview
     )
     squares: list[dom_tag] = []
-    for file in FILE_NAMES:
-        for rank in RANK_NAMES:
-            squares.append(
-                chess_board_square(
-                    cast("Square", f"{file}{rank}"),
-                    force_square_info=force_square_info,
-                )
+    if _use_html_fast_path():
+        squares.append(
+            unescaped_html(
+                chess_board_squares_html(force_square_info=force_square_info)
             )
+        )
+    else:
+        for file in FILE_NAMES:
+            for rank in RANK_NAMES:
+                squares.append(
+                    chess_board_square(
+                        cast("Square", f"{file}{rank}"),
+                        force_square_info=force_square_info,
+                    )
+                )
 
     squares_container_classes: list[str] = [
         "relative",
@@ -220,15 +235,30 @@ def chess_pieces(
     *, game_presenter: "GamePresenter", board_id: str, **extra_attrs: str
 ) -> "dom_tag":
     pieces: "list[dom_tag]" = []
-    for square, piece_role in game_presenter.piece_role_by_square.items():
+    if _use_html_fast_path():
         pieces.append(
-            chess_piece(
-                square=square,
-                piece_role=piece_role,
-                game_presenter=game_presenter,
-                board_id=board_id,
+            unescaped_html(
+                "".join(
+                    chess_piece_html(
+                        square=square,
+                        piece_role=piece_role,
+                        game_presenter=game_presenter,
+                        board_id=board_id,
+                    )
+                    for square, piece_role in game_presenter.piece_role_by_square.items()
+                )
             )
         )
+    else:
+        for square, piece_role in game_presenter.piece_role_by_square.items():
+            pieces.append(
+                chess_piece(
+                    square=square,
+                    piece_role=piece_role,
+                    game_presenter=game_presenter,
+                    board_id=board_id,
+                )
+            )
 
     bot_turn_html_elements = _bot_turn_html_elements(
         game_presenter=game_presenter, board_id=board_id
@@ -237,6 +267,10 @@ def chess_pieces(
         game_presenter=game_presenter, board_id=board_id
     )
 
+    client_side_selection_html_elements = _client_side_selection_html_elements(
+        game_presenter=game_presenter, board_id=board_id
+    )
+
     return div(
         div(
             data_board_state=game_presenter.game_phase,
@@ -245,6 +279,7 @@ def chess_pieces(
         *pieces,
         *bot_turn_html_elements,
         *solution_play_html_elements,
+        *client_side_selection_html_elements,
         id=f"chess-board-pieces-{board_id}",
         cls="relative aspect-square",
         **extra_attrs,
@@ -292,6 +327,21 @@ def chess_board_square(
     )
 
 
+@cache
+def chess_board_squares_html(*, force_square_info: bool = False) -> str:
+    """
+    Same output as the non-pretty rendering of all the `chess_board_square`s,
+    in the order `chess_board()` displays them.
+    """
+    return "".join(
+        chess_board_square(
+            cast("Square", f"{file}{rank}"), force_square_info=force_square_info
+        ).render(pretty=False)
+        for file in FILE_NAMES
+        for rank in RANK_NAMES
+    )
+
+
 def chess_piece(
     *,
     game_presenter: "GamePresenter",
@@ -299,34 +349,128 @@ def chess_piece(
     piece_role: "PieceRole",
     board_id: str,
 ) -> "dom_tag":
-    player_side = player_side_from_piece_role(piece_role)
+    piece_state = _chess_piece_state(
+        game_presenter=game_presenter, square=square, piece_role=piece_role
+    )
+    return _chess_piece_tag(
+        piece_state,
+        board_id=board_id,
+        htmx_get_url=_chess_piece_htmx_get_url(
+            piece_state, game_presenter=game_presenter, board_id=board_id
+        ),
+    )
 
-    piece_can_be_moved_by_player = (
-        game_presenter.solution_index is not None
-        and game_presenter.is_player_turn
-        and square in game_presenter.squares_with_pieces_that_can_move
+
+def chess_piece_html(
+    *,
+    game_presenter: "GamePresenter",
+    square: "Square",
+    piece_role: "PieceRole",
+    board_id: str,
+) -> str:
+    """
+    Same output as `chess_piece(...).render(pretty=False)`, without building
+    a dominate tree: only the board id and the htmx URL are interpolated in a
+    template compiled from that tree.
+    """
+    piece_state = _chess_piece_state(
+        game_presenter=game_presenter, square=square, piece_role=piece_role
     )
-    unit_display = chess_character_display(
-        piece_role=piece_role, game_presenter=game_presenter, square=square
+    htmx_get_url = _chess_piece_htmx_get_url(
+        piece_state, game_presenter=game_presenter, board_id=board_id
+    )
+    return _chess_piece_template(piece_state).substitute(
+        board_id=escape_html(board_id, True),
+        htmx_get_url=escape_html(htmx_get_url, True) if htmx_get_url else "",
+    )
+
+
+class _ChessPieceState(NamedTuple):
+    """Everything that the HTML of a piece depends on, apart from the board id."""
+
+    square: "Square"
+    piece_role: "PieceRole"
+    can_be_moved_by_player: bool
+    is_selected: bool
+    is_game_over: bool
+    can_be_selected: bool
+    animation_speed: str
+    character_display: "_ChessCharacterDisplayState"
+
+
+def _chess_piece_state(
+    *, game_presenter: "GamePresenter", square: "Square", piece_role: "PieceRole"
+) -> _ChessPieceState:
+    is_game_over = game_presenter.is_game_over
+    return _ChessPieceState(
+        square=square,
+        piece_role=piece_role,
+        can_be_moved_by_player=(
+            game_presenter.solution_index is not None
+            and game_presenter.is_player_turn
+            and square in game_presenter.squares_with_pieces_that_can_move
+        ),
+        is_selected=bool(
+            square
+            and game_presenter.selected_piece
+            and game_presenter.selected_piece.square == square
+        ),
+        is_game_over=is_game_over,
+        can_be_selected=not is_game_over and game_presenter.can_select_pieces,
+        animation_speed=(
+            "duration-300"
+            if game_presenter.user_prefs.game_speed == UserPrefsGameSpeed.NORMAL
+            else "duration-75"  # almost instant
+        ),
+        character_display=_chess_character_display_state(
+            piece_role=piece_role, game_presenter=game_presenter, square=square
+        ),
+    )
+
+
+def _chess_piece_htmx_get_url(
+    piece_state: _ChessPieceState, *, game_presenter: "GamePresenter", board_id: str
+) -> str | None:
+    if not piece_state.can_be_selected:
+        return None
+    if piece_state.is_selected:
+        # Re-selecting an already selected piece de-selects it:
+        return game_presenter.urls.htmx_game_no_selection_url(board_id=board_id)
+    return game_presenter.urls.htmx_game_select_piece_url(
+        square=piece_state.square, board_id=board_id
+    )
+
+
+@lru_cache(maxsize=4_096)
+def _chess_piece_template(piece_state: _ChessPieceState) -> Template:
+    # (none of our Tailwind classes contains a "$", so the rendered tree can safely
+    # be used as a Template)
+    return Template(
+        _chess_piece_tag(
+            piece_state,
+            board_id="${board_id}",
+            htmx_get_url="${htmx_get_url}" if piece_state.can_be_selected else None,
+        ).render(pretty=False)
+    )
+
+
+def _chess_piece_tag(
+    piece_state: _ChessPieceState, *, board_id: str, htmx_get_url: str | None
+) -> "dom_tag":
+    square, piece_role = piece_state.square, piece_state.piece_role
+    player_side = player_side_from_piece_role(piece_role)
+
+    unit_display = _chess_character_display_tag(
+        piece_role=piece_role, state=piece_state.character_display
     )
     unit_chess_symbol_display = chess_unit_symbol_display(
         piece_role=piece_role, square=square
     )
     ground_marker = chess_unit_ground_marker(
-        player_side=player_side, can_move=piece_can_be_moved_by_player
-    )
-    is_selected_piece = bool(
-        square
-        and game_presenter.selected_piece
-        and game_presenter.selected_piece.square == square
+        player_side=player_side, can_move=piece_state.can_be_moved_by_player
     )
-    is_game_over = game_presenter.is_game_over
+    is_game_over = piece_state.is_game_over
 
-    animation_speed = (
-        "duration-300"
-        if game_presenter.user_prefs.game_speed == UserPrefsGameSpeed.NORMAL
-        else "duration-75"  # almost instant
-    )
     classes = [
         "absolute",
         "aspect-square",
@@ -336,25 +480,18 @@ def chess_piece(
         "pointer-events-auto" if not is_game_over else "pointer-events-none",
         # Transition-related classes:
         "transition-coordinates",
-        animation_speed,
+        piece_state.animation_speed,
         "ease-in",
         "transform-gpu",
     ]
 
     additional_attributes: dict = {}
     htmx_attributes: dict[str, str] = {}
-    if not is_game_over and game_presenter.can_select_pieces:
+    if piece_state.can_be_selected:
+        assert htmx_get_url is not None
         htmx_attributes = {
             "data_hx_trigger": "click",
-            "data_hx_get": (
-                game_presenter.urls.htmx_game_select_piece_url(
-                    square=square,
-                    board_id=board_id,
-                )
-                if not is_selected_piece
-                # Re-selecting an already selected piece de-selects it:
-                else game_presenter.urls.htmx_game_no_selection_url(board_id=board_id)
-            ),
+            "data_hx_get": htmx_get_url,
             "data_hx_target": f"#chess-pieces-container-{board_id}",
         }
     else:
@@ -411,6 +548,25 @@ def chess_available_target(
         not game_presenter.is_game_over
         and game_presenter.active_player_side == piece_player_side
     )
+    return _chess_available_target_tag(
+        square=square,
+        board_id=board_id,
+        move_piece_url=(
+            game_presenter.urls.htmx_game_move_piece_url(
+                square=square, board_id=board_id
+            )
+            if can_move
+            else None
+        ),
+    )
+
+
+def _chess_available_target_tag(
+    *, square: "Square", board_id: str, move_piece_url: str | None
+) -> "dom_tag":
+    # If we have no URL, this target is not clickable
+    # (i.e. it belongs to the opponent's pieces)
+    can_move = move_piece_url is not None
     bg_class = (
         "bg-active-chess-available-target-marker"
         if can_move
@@ -441,9 +597,7 @@ def chess_available_target(
 
     if can_move:
         htmx_attributes = {
-            "data_hx_post": game_presenter.urls.htmx_game_move_piece_url(
-                square=square, board_id=board_id
-            ),
+            "data_hx_post": move_piece_url,
             "data_hx_target": f"#chess-pieces-container-{board_id}",
         }
     else:
@@ -471,6 +625,32 @@ def chess_character_display(
         game_presenter or factions
     ), "You must provide either a GamePresenter or a Factions kwarg."
 
+    return _chess_character_display_tag(
+        piece_role=piece_role,
+        state=_chess_character_display_state(
+            piece_role=piece_role,
+            game_presenter=game_presenter,
+            square=square,
+            factions=factions,
+        ),
+        additional_classes=additional_classes,
+    )
+
+
+class _ChessCharacterDisplayState(NamedTuple):
+    factions: "tuple[tuple[PlayerSide, Faction], ...]"
+    is_active_player_piece: bool
+    is_highlighted: bool
+    is_potential_capture: bool
+
+
+def _chess_character_display_state(
+    *,
+    piece_role: "PieceRole",
+    game_presenter: "GamePresenter | None" = None,
+    square: "Square | None" = None,
+    factions: "Factions | None" = None,
+) -> _ChessCharacterDisplayState:
     # Some data we'll need:
     piece_player_side = player_side_from_piece_role(piece_role)
     is_active_player_piece = (
@@ -495,9 +675,7 @@ def chess_character_display(
         ):
             is_potential_capture = True
 
-    is_w_side = piece_player_side == "w"
-    piece_type: "PieceType" = type_from_piece_role(piece_role)
-    is_knight, is_king = piece_type == "n", piece_type == "k"
+    is_king = type_from_piece_role(piece_role) == "k"
 
     # Right, let's do this shall we?
     if (
@@ -517,13 +695,31 @@ def chess_character_display(
     ):
         is_potential_capture = True  # let's highlight checks in "see solution" mode
 
+    game_factions = cast("Factions", factions or game_presenter.factions)  # type: ignore
+
+    return _ChessCharacterDisplayState(
+        factions=tuple(game_factions.items()),
+        is_active_player_piece=is_active_player_piece,
+        is_highlighted=is_highlighted,
+        is_potential_capture=is_potential_capture,
+    )
+
+
+def _chess_character_display_tag(
+    *,
+    piece_role: "PieceRole",
+    state: _ChessCharacterDisplayState,
+    additional_classes: "Sequence[str]|None" = None,
+) -> "dom_tag":
+    piece_player_side = player_side_from_piece_role(piece_role)
+    is_w_side = piece_player_side == "w"
+    is_knight = type_from_piece_role(piece_role) == "n"
+
     horizontal_translation = (
         ("left-3" if is_knight else "left-0") if is_w_side else "right-0"
     )
     vertical_translation = "top-2" if is_knight and is_w_side else "top-1"
 
-    game_factions = cast("Factions", factions or game_presenter.factions)  # type: ignore
-
     classes = [
         "relative",
         "w-10/12" if is_knight else "w-11/12",
@@ -533,22 +729,22 @@ def chess_character_display(
         _CHESS_PIECE_Z_INDEXES["character"],
         horizontal_translation,
         vertical_translation,
-        *piece_character_classes(piece_role=piece_role, factions=game_factions),
+        *piece_character_classes(piece_role=piece_role, factions=dict(state.factions)),
         # Conditional classes:
         (
             (
                 "drop-shadow-active-selected-piece"
-                if is_active_player_piece
+                if state.is_active_player_piece
                 else "drop-shadow-opponent-selected-piece"
             )
-            if is_highlighted
+            if state.is_highlighted
             else (
                 "drop-shadow-piece-symbol-w"
                 if piece_player_side == "w"
                 else "drop-shadow-piece-symbol-b"
             )
         ),
-        "drop-shadow-potential-capture" if is_potential_capture else "",
+        "drop-shadow-potential-capture" if state.is_potential_capture else "",
     ]
     if additional_classes:
         classes.extend(additional_classes)
@@ -737,6 +933,20 @@ def _bot_turn_html_elements(
     else:
         move_delay = _BOT_MOVE_DELAY
 
+    if game_presenter.server_side_bot and not game_presenter.forced_bot_move:
+        # Our server computes the bot's move: no need for a chess engine in the
+        # browser, we just have to ask for that move after the usual delay.
+        return [
+            div(
+                id=play_move_htmx_element_id,
+                data_hx_post=game_presenter.urls.htmx_game_play_server_bot_move_url(
+                    board_id=board_id
+                ),
+                data_hx_target=f"#chess-pieces-container-{board_id}",
+                data_hx_trigger=f"load delay:{move_delay}ms",
+            )
+        ]
+
     htmx_attributes = {
         "data_hx_post": game_presenter.urls.htmx_game_play_bot_move_url(
             board_id=board_id
@@ -766,6 +976,81 @@ def _bot_turn_html_elements(
     ]
 
 
+def _client_side_selection_html_elements(
+    *, game_presenter: "GamePresenter", board_id: str
+) -> "list[dom_tag]":
+    # When the player has no selected piece yet, we ship the legal targets of all the
+    # pieces of the board: "chess-main.ts" can then display the targets of the piece
+    # the player clicks on (and highlight it, as well as its potential captures)
+    # without waiting for the server. It only asks it for the status bar and speech
+    # bubble of the selection, in the background - see the "?parts=status" parameter
+    # of our selection views.
+    # Without this data (or without JS), clicking a piece keeps triggering its htmx
+    # request, and the selection is rendered server-side.
+    if not (
+        game_presenter.client_side_piece_selection
+        and game_presenter.game_phase == "waiting_for_player_selection"
+        and game_presenter.can_select_pieces
+        and game_presenter.solution_index is None
+    ):
+        return []
+
+    return [
+        div(
+            id=f"chess-board-client-side-selection-{board_id}",
+            aria_hidden="true",
+            hidden=True,
+            data_targets_by_square=_targets_by_square_json(game_presenter.fen),
+            data_move_piece_url=game_presenter.urls.htmx_game_move_piece_url_pattern(
+                board_id=board_id
+            ),
+            data_active_player_side=game_presenter.active_player_side,
+            data_target_markers=_client_side_target_markers_json(board_id),
+            data_no_selection_url=game_presenter.urls.htmx_game_no_selection_url(
+                board_id=board_id
+            ),
+            # "chess-main.ts" fetches the status of the selections through this
+            # element: a new selection cancels the previous pending request.
+            data_hx_sync="this:replace",
+        )
+    ]
+
+
+@lru_cache(maxsize=256)
+def _targets_by_square_json(fen: "FEN") -> str:
+    """
+    A compact `{"[from square]": "[target squares]"}` map of the legal targets of both
+    sides' pieces - e.g. `{"e2":"e3e4","g1":"f3h3"}`.
+    """
+    targets_by_square = get_position_analysis(fen).targets_by_square
+    return json.dumps(
+        {
+            square: "".join(sorted(targets))
+            for square, targets in sorted(targets_by_square.items())
+        },
+        separators=(",", ":"),
+    )
+
+
+@lru_cache(maxsize=32)
+def _client_side_target_markers_json(board_id: str) -> str:
+    """
+    The HTML of our active and opponent player's target markers, on square "a1":
+    "chess-main.ts" moves them to the target squares.
+    """
+    return json.dumps(
+        [
+            _chess_available_target_tag(
+                square="a1", board_id=board_id, move_piece_url=""
+            ).render(pretty=False),
+            _chess_available_target_tag(
+                square="a1", board_id=board_id, move_piece_url=None
+            ).render(pretty=False),
+        ],
+        separators=(",", ":"),
+    )
+
+
 def _solution_turn_html_elements(
     *, game_presenter: "GamePresenter", board_id: str
 ) -> "list[dom_tag]":
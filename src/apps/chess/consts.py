@@ -23,6 +23,12 @@ PIECES_VALUES: Final[dict["PieceType", int]] = {
     "q": 9,
 }
 
+# Mates don't have a centipawns value: our game scores give them a bounded one,
+# greater than any realistic material advantage - and the quicker the mate, the
+# greater the score (a mate in N moves is worth `MATE_SCORE - N`, like python-chess'
+# `Score.score(mate_score=MATE_SCORE)`).
+MATE_SCORE: Final[int] = 100_000
+
 # fmt: off
 SQUARES: Final[tuple["Square", ...]] = (
     # The order matters here, as we use that for the board visual representation.
@@ -0,0 +1,491 @@
+import datetime as dt
+import multiprocessing
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+import chess
+import msgspec
+
+from lib.django_helpers import get_git_revision
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .types import FEN
+
+# A benchmark of the Python engines we ship in `lib/chess_engines/`, on a fixed set
+# of positions:
+# - perft checks of the moves generation (python-chess', and sunfish's one)
+# - fixed-depth and fixed-time searches of andoma and sunfish
+# - fixed-depth searches of andoma variants: the upstream andoma we started from,
+#   our iterative deepening search without/with its transposition table, and with
+#   the killer/history moves ordering heuristics - so we can see what each of our
+#   changes brings (the "andoma/depth" search adds the captures-first ordering to
+#   "andoma-tt/depth", and "andoma-heuristics/depth" adds killer/history moves to it)
+# - andoma's root-parallel search, with various numbers of worker processes
+# Like our views benchmark, its JSON reports can be compared between commits.
+
+BENCHMARK_POSITIONS_FILE_PATH = (
+    Path(__file__).parent / "data" / "engines_benchmark_positions.epd"
+)
+
+BenchmarkedEngine = Literal["andoma", "sunfish"]
+SearchMode = Literal["depth", "time"]
+AndomaVariant = Literal[
+    "andoma-upstream", "andoma-plain", "andoma-tt", "andoma-heuristics"
+]
+
+_ENGINES: tuple[BenchmarkedEngine, ...] = ("andoma", "sunfish")
+_ANDOMA_VARIANTS: tuple[AndomaVariant, ...] = (
+    "andoma-upstream",
+    "andoma-plain",
+    "andoma-tt",
+    "andoma-heuristics",
+)
+_SEARCH_MODES: tuple[SearchMode, ...] = ("depth", "time")
+# (fixed-time searches stop when they're out of time, way before that depth)
+_MAX_SEARCH_DEPTH = 64
+
+
+class BenchmarkPosition(NamedTuple):
+    id: str
+    fen: "FEN"
+    # Known perft nodes counts, by depth:
+    perft_nodes: dict[int, int]
+
+
+class PerftResult(msgspec.Struct, kw_only=True):
+    move_generator: Literal["python-chess", "sunfish"]
+    position: str
+    depth: int
+    nodes: int
+    expected_nodes: int | None
+    nps: int
+
+    @property
+    def is_correct(self) -> bool:
+        return self.expected_nodes is None or self.nodes == self.expected_nodes
+
+
+class EngineSearchStats(msgspec.Struct, kw_only=True):
+    nodes: int
+    nps: int
+    # How long it took to complete each depth, summed for all the positions
+    # (only for fixed-depth searches):
+    time_to_depth: list[float]
+    average_depth: float
+    best_moves: dict[str, str]
+
+
+class ParallelSearchStats(msgspec.Struct, kw_only=True):
+    nodes: int
+    seconds: float
+    # Compared to andoma's serial fixed-depth search:
+    speedup: float
+    # The parallel search must find the same moves as the serial one:
+    same_best_moves: bool
+
+
+class EnginesBenchmarkReport(msgspec.Struct, kw_only=True):
+    created_at: dt.datetime
+    git_revision: str | None
+    python_version: str
+    perft_depth: int
+    search_depth: int
+    search_time: float
+    perft: list[PerftResult]
+    # Keyed by "[engine]/[search mode]", e.g. "andoma/depth" - andoma variants are
+    # only benchmarked with fixed-depth searches, e.g. "andoma-upstream/depth":
+    searches: dict[str, EngineSearchStats]
+    # How often andoma and sunfish agree on the best move, by search mode:
+    best_move_agreement: dict[str, float]
+    # Andoma's fixed-depth searches, by number of worker processes:
+    parallel_searches: dict[int, ParallelSearchStats] = {}
+
+    @property
+    def perft_failures(self) -> list[PerftResult]:
+        return [result for result in self.perft if not result.is_correct]
+
+    def to_json(self) -> bytes:
+        return msgspec.json.format(msgspec.json.encode(self))
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "EnginesBenchmarkReport":
+        return msgspec.json.decode(data, type=cls)
+
+
+class SearchComparison(NamedTuple):
+    nps_change: float
+    best_moves_changes_count: int
+
+
+class _SearchOutcome(NamedTuple):
+    best_move: str
+    nodes: int
+    seconds: float
+    time_to_depth: list[float]
+    depth: int
+
+
+def load_benchmark_positions(
+    file_path: Path = BENCHMARK_POSITIONS_FILE_PATH,
+) -> list[BenchmarkPosition]:
+    positions = []
+    for line in file_path.read_text().splitlines():
+        if not line.strip():
+            continue
+        chess_board = chess.Board()
+        operations = chess_board.set_epd(line)
+        positions.append(
+            BenchmarkPosition(
+                id=str(operations["id"]),
+                fen=chess_board.fen(),
+                perft_nodes={
+                    int(opcode[1:]): int(operand)  # type: ignore[arg-type]
+                    for opcode, operand in operations.items()
+                    if opcode.startswith("D") and opcode[1:].isdigit()
+                },
+            )
+        )
+    return positions
+
+
+def run_engines_benchmark(
+    *,
+    perft_depth: int = 2,
+    search_depth: int = 3,
+    search_time: float = 1.0,
+    parallel_workers: "Sequence[int]" = (),
+    positions: "Sequence[BenchmarkPosition] | None" = None,
+) -> EnginesBenchmarkReport:
+    """
+    `search_time` is expressed in seconds, and is a budget per position.
+    N.B. Sunfish can only stop between 2 depths, so it may exceed that budget.
+    """
+    if positions is None:
+        positions = load_benchmark_positions()
+
+    perft_results: list[PerftResult] = []
+    for position in positions:
+        perft_results.extend(_perft_results(position, depth=perft_depth))
+
+    searches: dict[str, EngineSearchStats] = {}
+    serial_outcomes: dict[str, _SearchOutcome] = {}
+    for engine in _ENGINES:
+        for mode in _SEARCH_MODES:
+            outcomes = {
+                position.id: _search(
+                    engine,
+                    position.fen,
+                    depth=search_depth if mode == "depth" else _MAX_SEARCH_DEPTH,
+                    time_limit=search_time if mode == "time" else None,
+                )
+                for position in positions
+            }
+            searches[f"{engine}/{mode}"] = _search_stats(outcomes, mode=mode)
+            if (engine, mode) == ("andoma", "depth"):
+                serial_outcomes = outcomes
+    for variant in _ANDOMA_VARIANTS:
+        searches[f"{variant}/depth"] = _search_stats(
+            {
+                position.id: _andoma_variant_search(
+                    variant, position.fen, depth=search_depth
+                )
+                for position in positions
+            },
+            mode="depth",
+        )
+
+    parallel_searches = {
+        workers: _parallel_search_stats(
+            positions, depth=search_depth, workers=workers, serial=serial_outcomes
+        )
+        for workers in parallel_workers
+    }
+
+    return EnginesBenchmarkReport(
+        created_at=dt.datetime.now(dt.UTC),
+        git_revision=get_git_revision(),
+        python_version=platform.python_version(),
+        perft_depth=perft_depth,
+        search_depth=search_depth,
+        search_time=search_time,
+        perft=perft_results,
+        searches=searches,
+        best_move_agreement={
+            mode: _best_move_agreement(
+                searches[f"andoma/{mode}"], searches[f"sunfish/{mode}"]
+            )
+            for mode in _SEARCH_MODES
+        },
+        parallel_searches=parallel_searches,
+    )
+
+
+def compare_engines_benchmark_reports(
+    previous: EnginesBenchmarkReport, current: EnginesBenchmarkReport
+) -> dict[str, SearchComparison]:
+    """Compares the searches present in both reports."""
+    comparisons = {}
+    for search_name, stats in current.searches.items():
+        if (previous_stats := previous.searches.get(search_name)) is None:
+            continue
+        comparisons[search_name] = SearchComparison(
+            nps_change=(
+                round((stats.nps - previous_stats.nps) / previous_stats.nps, 3)
+                if previous_stats.nps
+                else 0.0
+            ),
+            best_moves_changes_count=sum(
+                1
+                for position_id, move in stats.best_moves.items()
+                if previous_stats.best_moves.get(position_id, move) != move
+            ),
+        )
+    return comparisons
+
+
+def perft(
+    chess_board: chess.Board, depth: int, *, queen_promotions_only: bool = False
+) -> int:
+    """
+    Counts the leaf nodes of the moves tree, at the given depth.
+    Sunfish only promotes pawns to queens: `queen_promotions_only` gives us the
+    number of nodes it should find.
+    """
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in chess_board.legal_moves:
+        if queen_promotions_only and move.promotion not in (None, chess.QUEEN):
+            continue
+        chess_board.push(move)
+        nodes += perft(
+            chess_board, depth - 1, queen_promotions_only=queen_promotions_only
+        )
+        chess_board.pop()
+    return nodes
+
+
+def sunfish_perft(fen: "FEN", depth: int) -> int:
+    from lib.chess_engines.sunfish import tools as sunfish_tools
+
+    def count(position, depth: int) -> int:
+        if depth == 0:
+            return 1
+        # (the positions Sunfish gives us after a move are already rotated)
+        return sum(
+            count(next_position, depth - 1)
+            for _, next_position in sunfish_tools.gen_legal_moves(position)
+        )
+
+    return count(sunfish_tools.parseFEN(fen), depth)
+
+
+def _perft_results(position: BenchmarkPosition, *, depth: int) -> list[PerftResult]:
+    start = time.perf_counter()
+    nodes = perft(chess.Board(position.fen), depth)
+    python_chess_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sunfish_nodes = sunfish_perft(position.fen, depth)
+    sunfish_seconds = time.perf_counter() - start
+
+    return [
+        PerftResult(
+            move_generator="python-chess",
+            position=position.id,
+            depth=depth,
+            nodes=nodes,
+            expected_nodes=position.perft_nodes.get(depth),
+            nps=_nps(nodes, python_chess_seconds),
+        ),
+        PerftResult(
+            move_generator="sunfish",
+            position=position.id,
+            depth=depth,
+            nodes=sunfish_nodes,
+            expected_nodes=perft(
+                chess.Board(position.fen), depth, queen_promotions_only=True
+            ),
+            nps=_nps(sunfish_nodes, sunfish_seconds),
+        ),
+    ]
+
+
+def _search(
+    engine: BenchmarkedEngine,
+    fen: "FEN",
+    *,
+    depth: int,
+    time_limit: float | None,
+) -> _SearchOutcome:
+    if engine == "andoma":
+        return _andoma_search(fen, depth=depth, time_limit=time_limit)
+    return _sunfish_search(fen, depth=depth, time_limit=time_limit)
+
+
+def _andoma_search(
+    fen: "FEN",
+    *,
+    depth: int,
+    time_limit: float | None,
+    executor: ProcessPoolExecutor | None = None,
+    workers: int = 1,
+) -> _SearchOutcome:
+    from lib.chess_engines.andoma.movegeneration import Searcher, TranspositionTable
+
+    searcher = Searcher(
+        transposition_table=TranspositionTable(), executor=executor, workers=workers
+    )
+    start = time.perf_counter()
+    move = searcher.search(chess.Board(fen), depth, time_limit=time_limit)
+    return _SearchOutcome(
+        best_move=move.uci(),
+        nodes=searcher.nodes,
+        seconds=time.perf_counter() - start,
+        time_to_depth=searcher.time_to_depth,
+        depth=searcher.completed_depth,
+    )
+
+
+def _andoma_variant_search(
+    variant: AndomaVariant, fen: "FEN", *, depth: int
+) -> _SearchOutcome:
+    from lib.chess_engines.andoma.baseline import BaselineSearcher
+    from lib.chess_engines.andoma.movegeneration import Searcher, TranspositionTable
+
+    if variant == "andoma-upstream":
+        # (a single fixed-depth search: there's no "time to depth" to measure)
+        baseline_searcher = BaselineSearcher()
+        start = time.perf_counter()
+        move = baseline_searcher.search(chess.Board(fen), depth)
+        return _SearchOutcome(
+            best_move=move.uci(),
+            nodes=baseline_searcher.nodes,
+            seconds=time.perf_counter() - start,
+            time_to_depth=[],
+            depth=depth,
+        )
+
+    searcher = Searcher(
+        transposition_table=(
+            TranspositionTable() if variant != "andoma-plain" else None
+        ),
+        order_captures_first=variant == "andoma-heuristics",
+        use_move_ordering_heuristics=variant == "andoma-heuristics",
+    )
+    start = time.perf_counter()
+    move = searcher.search(chess.Board(fen), depth)
+    return _SearchOutcome(
+        best_move=move.uci(),
+        nodes=searcher.nodes,
+        seconds=time.perf_counter() - start,
+        time_to_depth=searcher.time_to_depth,
+        depth=searcher.completed_depth,
+    )
+
+
+def _sunfish_search(
+    fen: "FEN", *, depth: int, time_limit: float | None
+) -> _SearchOutcome:
+    from lib.chess_engines.sunfish import sunfish, tools as sunfish_tools
+
+    position = sunfish_tools.parseFEN(fen)
+    searcher = sunfish.Searcher()  # type: ignore[attr-defined]
+    move = None
+    time_to_depth: list[float] = []
+    search_depth = 0
+    start = time.perf_counter()
+    for search_depth, search_move, _ in searcher.search(position):
+        elapsed = time.perf_counter() - start
+        time_to_depth.append(elapsed)
+        if search_move is not None:
+            move = search_move
+        if search_depth >= depth or (time_limit is not None and elapsed > time_limit):
+            break
+    return _SearchOutcome(
+        best_move=sunfish_tools.mrender(position, move) if move else "",
+        nodes=searcher.nodes,
+        seconds=time.perf_counter() - start,
+        time_to_depth=time_to_depth,
+        depth=search_depth,
+    )
+
+
+def _parallel_search_stats(
+    positions: "Sequence[BenchmarkPosition]",
+    *,
+    depth: int,
+    workers: int,
+    serial: dict[str, _SearchOutcome],
+) -> ParallelSearchStats:
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        # Starting the worker processes is not part of what we measure:
+        list(executor.map(abs, range(workers)))
+        outcomes = {
+            position.id: _andoma_search(
+                position.fen,
+                depth=depth,
+                time_limit=None,
+                executor=executor,
+                workers=workers,
+            )
+            for position in positions
+        }
+    seconds = sum(outcome.seconds for outcome in outcomes.values())
+    serial_seconds = sum(outcome.seconds for outcome in serial.values())
+    return ParallelSearchStats(
+        nodes=sum(outcome.nodes for outcome in outcomes.values()),
+        seconds=round(seconds, 4),
+        speedup=round(serial_seconds / seconds, 2) if seconds else 0.0,
+        same_best_moves=all(
+            outcome.best_move == serial[position_id].best_move
+            for position_id, outcome in outcomes.items()
+        ),
+    )
+
+
+def _search_stats(
+    outcomes: dict[str, _SearchOutcome], *, mode: SearchMode
+) -> EngineSearchStats:
+    nodes = sum(outcome.nodes for outcome in outcomes.values())
+    seconds = sum(outcome.seconds for outcome in outcomes.values())
+    time_to_depth: list[float] = []
+    if mode == "depth":
+        for outcome in outcomes.values():
+            for i, elapsed in enumerate(outcome.time_to_depth):
+                if i < len(time_to_depth):
+                    time_to_depth[i] += elapsed
+                else:
+                    time_to_depth.append(elapsed)
+    return EngineSearchStats(
+        nodes=nodes,
+        nps=_nps(nodes, seconds),
+        time_to_depth=[round(elapsed, 4) for elapsed in time_to_depth],
+        average_depth=round(
+            sum(outcome.depth for outcome in outcomes.values()) / len(outcomes), 2
+        ),
+        best_moves={
+            position_id: outcome.best_move for position_id, outcome in outcomes.items()
+        },
+    )
+
+
+def _best_move_agreement(
+    stats: EngineSearchStats, other_stats: EngineSearchStats
+) -> float:
+    agreements = [
+        move == other_stats.best_moves.get(position_id)
+        for position_id, move in stats.best_moves.items()
+    ]
+    return round(sum(agreements) / len(agreements), 3) if agreements else 0.0
+
+
+def _nps(nodes: int, seconds: float) -> int:
+    return round(nodes / seconds) if seconds else 0
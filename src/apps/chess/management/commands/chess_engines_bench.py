@@ -0,0 +1,156 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from apps.chess.engines_benchmark import (
+    EnginesBenchmarkReport,
+    compare_engines_benchmark_reports,
+    run_engines_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the chess engines we ship in 'lib/chess_engines/': perft checks "
+        "of their moves generation, and searches on a fixed set of positions - "
+        "including the upstream andoma search, as a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--perft-depth",
+            type=int,
+            default=2,
+            help="Depth of the perft checks.",
+        )
+        parser.add_argument(
+            "--search-depth",
+            type=int,
+            default=3,
+            help="Depth of the fixed-depth searches.",
+        )
+        parser.add_argument(
+            "--search-time",
+            type=float,
+            default=1.0,
+            help="Time budget of the fixed-time searches, in seconds per position.",
+        )
+        parser.add_argument(
+            "--parallel-workers",
+            default="2,4",
+            help=(
+                "Comma-separated numbers of worker processes to benchmark andoma's "
+                "root-parallel search with - or an empty string to skip it."
+            ),
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Path of the JSON file the report will be written to.",
+        )
+        parser.add_argument(
+            "--compare-with",
+            type=Path,
+            help="Path of the JSON report of a previous run, to compare results with.",
+        )
+
+    def handle(
+        self,
+        *args,
+        perft_depth: int,
+        search_depth: int,
+        search_time: float,
+        parallel_workers: str,
+        output: Path | None,
+        compare_with: Path | None,
+        **options,
+    ):
+        previous_report = (
+            EnginesBenchmarkReport.from_json(compare_with.read_bytes())
+            if compare_with
+            else None
+        )
+
+        report = run_engines_benchmark(
+            perft_depth=perft_depth,
+            search_depth=search_depth,
+            search_time=search_time,
+            parallel_workers=[
+                int(workers) for workers in parallel_workers.split(",") if workers
+            ],
+        )
+
+        self.stdout.write(
+            f"{'perft':<40} {'depth':>5} {'nodes':>9} {'expected':>9} {'nps':>9}"
+        )
+        for result in report.perft:
+            line = (
+                f"{result.move_generator + ' / ' + result.position:<40} "
+                f"{result.depth:>5} {result.nodes:>9} "
+                f"{result.expected_nodes if result.expected_nodes is not None else '-':>9} "
+                f"{result.nps:>9}"
+            )
+            self.stdout.write(
+                line if result.is_correct else self.style.ERROR(line + " ✗")
+            )
+
+        comparisons = (
+            compare_engines_benchmark_reports(previous_report, report)
+            if previous_report
+            else {}
+        )
+        header = (
+            f"\n{'search':<24} {'nodes':>9} {'nps':>9} {'avg depth':>9}  time to depth"
+        )
+        if previous_report:
+            header += f"  (vs {previous_report.git_revision or '?'})"
+        self.stdout.write(header)
+        for search_name, stats in report.searches.items():
+            time_to_depth = ", ".join(
+                f"d{i + 1}={elapsed:.2f}s"
+                for i, elapsed in enumerate(stats.time_to_depth)
+            )
+            line = (
+                f"{search_name:<24} {stats.nodes:>9} {stats.nps:>9} "
+                f"{stats.average_depth:>9.2f}  {time_to_depth or '-'}"
+            )
+            if (comparison := comparisons.get(search_name)) is not None:
+                line += (
+                    f"  nps {comparison.nps_change:+.1%}, "
+                    f"{comparison.best_moves_changes_count} best move(s) changed"
+                )
+            self.stdout.write(line)
+
+        self.stdout.write(
+            "\nBest move agreement between andoma and sunfish: "
+            + ", ".join(
+                f"{mode}={agreement:.0%}"
+                for mode, agreement in report.best_move_agreement.items()
+            )
+        )
+
+        if report.parallel_searches:
+            self.stdout.write(
+                f"\n{'andoma parallel search':<24} {'nodes':>9} {'seconds':>8} "
+                f"{'speedup':>8}"
+            )
+        for workers, parallel_stats in report.parallel_searches.items():
+            line = (
+                f"{str(workers) + ' workers':<24} {parallel_stats.nodes:>9} "
+                f"{parallel_stats.seconds:>8.2f} {parallel_stats.speedup:>7.2f}x"
+            )
+            self.stdout.write(
+                line
+                if parallel_stats.same_best_moves
+                else self.style.ERROR(line + " ✗ (not the same moves as serial)")
+            )
+
+        if output:
+            output.write_bytes(report.to_json())
+            self.stdout.write(f"Report written to {self.style.SUCCESS(str(output))}.")
+
+        if report.perft_failures:
+            raise CommandError(
+                f"{len(report.perft_failures)} perft check(s) failed - "
+                "the moves generation of our engines is not correct."
+            )
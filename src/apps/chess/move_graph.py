@@ -0,0 +1,114 @@
+import zlib
+from typing import TYPE_CHECKING, Self, cast
+
+import chess
+import msgspec
+
+from .business_logic import do_chess_move
+from .types import ChessInvalidMoveException, ChessMoveResult
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from .types import FEN, Square
+
+PositionMoves = dict[str, ChessMoveResult]
+"""The results of all the legal moves of a position, by UCI move (e.g. "e2e4")."""
+
+_ENCODER = msgspec.msgpack.Encoder()
+_DECODER = msgspec.msgpack.Decoder(dict[str, PositionMoves])
+
+
+class ChessMoveGraph:
+    """
+    A graph of chess positions: for each FEN we know, we store the results of all its
+    legal moves - so answering a move is just a dictionary lookup.
+
+    Moves played from positions we don't know are computed one by one, like
+    `do_chess_move` does - computing all the moves of the position would cost ~30
+    times as much. They're kept in the graph too, up to `max_lazy_moves` moves
+    (a move result takes ~0.5KB in memory).
+    """
+
+    def __init__(
+        self,
+        positions: "dict[FEN, PositionMoves] | None" = None,
+        *,
+        max_lazy_moves: int = 2_000,
+    ):
+        self._positions: "dict[FEN, PositionMoves]" = positions or {}
+        self._lazy_moves: "dict[tuple[FEN, str], ChessMoveResult]" = {}
+        self._lazy_moves_count = 0
+        self.max_lazy_moves = max_lazy_moves
+
+    @classmethod
+    def build(cls, *, fens: "Iterable[FEN]", depth: int) -> Self:
+        """
+        Creates a graph containing the given positions, as well as all the positions
+        that can be reached from them in less than `depth` half-moves.
+        """
+        graph = cls()
+        frontier = list(fens)
+        for _ in range(depth):
+            next_frontier: "list[FEN]" = []
+            for fen in frontier:
+                next_frontier.extend(
+                    move_result["fen"]
+                    for move_result in graph.add_position(fen).values()
+                    if not move_result["game_over"]
+                )
+            frontier = next_frontier
+        return graph
+
+    def add_position(self, fen: "FEN") -> "Mapping[str, ChessMoveResult]":
+        """Computes all the moves of a position, and stores them in the graph."""
+        if (moves := self._positions.get(fen)) is None:
+            moves = self._positions[fen] = _compute_position_moves(fen)
+        return moves
+
+    def move(self, *, fen: "FEN", from_: "Square", to: "Square") -> ChessMoveResult:
+        """Same as `do_chess_move`, but backed by this graph"""
+        move_uci = f"{from_}{to}"
+        if (moves := self._positions.get(fen)) is not None:
+            try:
+                return moves[move_uci]
+            except KeyError as exc:
+                raise ChessInvalidMoveException(
+                    f"Invalid move '{move_uci}' for FEN '{fen}'"
+                ) from exc
+
+        if (move_result := self._lazy_moves.get((fen, move_uci))) is not None:
+            return move_result
+        move_result = do_chess_move(fen=fen, from_=from_, to=to)
+        if self._lazy_moves_count < self.max_lazy_moves:
+            self._lazy_moves[(fen, move_uci)] = move_result
+            self._lazy_moves_count += 1
+        return move_result
+
+    def __contains__(self, fen: "FEN") -> bool:
+        return fen in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(_ENCODER.encode(self._positions))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **kwargs) -> Self:
+        return cls(_DECODER.decode(zlib.decompress(data)), **kwargs)
+
+
+def _compute_position_moves(fen: "FEN") -> PositionMoves:
+    chess_board = chess.Board(fen)
+    moves: PositionMoves = {}
+    for move in chess_board.legal_moves:
+        if move.promotion not in (None, chess.QUEEN):
+            # We only manage promotions to queens for now
+            continue
+        from_, to = (
+            cast("Square", chess.square_name(move.from_square)),
+            cast("Square", chess.square_name(move.to_square)),
+        )
+        moves[f"{from_}{to}"] = do_chess_move(fen=fen, from_=from_, to=to)
+    return moves
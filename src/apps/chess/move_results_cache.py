@@ -0,0 +1,357 @@
+import atexit
+import contextlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import cache
+from typing import TYPE_CHECKING, NamedTuple
+
+import msgspec
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .types import ChessMoveResult
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .types import FEN, Square
+
+_logger = logging.getLogger(__name__)
+
+# Everyone plays the same daily challenge, so the same (FEN, from, to) triples come up
+# all day long: this cache allows us to share the results of `do_chess_move` between
+# our Gunicorn workers - and to keep them when a worker is recycled.
+
+_ENCODER = msgspec.msgpack.Encoder()
+_DECODER = msgspec.msgpack.Decoder(ChessMoveResult)
+
+
+class MoveResultsCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class BaseMoveResultsCache(ABC):
+    """
+    A bounded, LRU-evicted cache of `ChessMoveResult`s, keyed by (FEN, from, to).
+    Values are stored in a compact msgpack encoding.
+    """
+
+    def __init__(self, *, max_size: int = 10_000):
+        self.max_size = max_size
+
+    def get_or_compute(
+        self,
+        *,
+        fen: "FEN",
+        from_: "Square",
+        to: "Square",
+        compute: "Callable[[], ChessMoveResult]",
+    ) -> ChessMoveResult:
+        key = self.make_key(fen=fen, from_=from_, to=to)
+        if (encoded := self.get(key)) is not None:
+            return _DECODER.decode(encoded)
+        # N.B. If `compute` raises an exception (i.e. invalid move), nothing is stored.
+        result = compute()
+        self.set(key, _ENCODER.encode(result))
+        return result
+
+    @staticmethod
+    def make_key(*, fen: "FEN", from_: "Square", to: "Square") -> str:
+        return f"{fen}|{from_}{to}"
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> MoveResultsCacheStats: ...
+
+
+class LocMemMoveResultsCache(BaseMoveResultsCache):
+    """
+    A per-process backend, similar to what the previous `lru_cache` was giving us.
+    Mostly useful for tests and development.
+    """
+
+    def __init__(self, *, max_size: int = 10_000):
+        super().__init__(max_size=max_size)
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> MoveResultsCacheStats:
+        return MoveResultsCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._data),
+        )
+
+
+class SQLiteMoveResultsCache(BaseMoveResultsCache):
+    """
+    A backend stored in a SQLite file, shared by all the workers of the machine.
+    Its content (and its hit/miss counters) survive the recycling of the workers.
+
+    This is on the hot path of every move, so we keep SQLite's write lock out of it
+    as much as we can:
+    - each process keeps its most recently used results in memory, in front of the
+      SQLite file
+    - the LRU recency of the entries and the hit/miss counters are updated in
+      batches: when `flush_threshold` lookups are pending, when the oldest pending
+      one is more than `flush_interval` seconds old, and when we write a new result
+      anyway
+    - the size of the cache is only checked every 1% of `max_size` new results,
+      so it can briefly go a bit beyond it.
+    A failing SQLite file is logged, and treated as a cache miss: the move results
+    are then computed as if there was no cache.
+    """
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS move_results (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            last_used_at INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS move_results_last_used_at "
+        "ON move_results (last_used_at)",
+        """CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )""",
+        "INSERT OR IGNORE INTO counters (name, value) "
+        "VALUES ('hits', 0), ('misses', 0), ('evictions', 0)",
+    )
+
+    def __init__(
+        self,
+        *,
+        path: str | None = None,
+        max_size: int = 10_000,
+        local_max_size: int = 1_000,
+        flush_threshold: int = 100,
+        flush_interval: float = 5.0,
+    ):
+        super().__init__(max_size=max_size)
+        self.path = path or os.path.join(
+            tempfile.gettempdir(), "zakuchess_move_results_cache.sqlite3"
+        )
+        # (the local cache can't be larger than the shared one, so that it doesn't
+        # keep results that the shared one has already evicted for too long)
+        self.local_max_size = min(local_max_size, max_size)
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._connection_pid: int | None = None
+        self._local_data: OrderedDict[str, bytes] = OrderedDict()
+        # Lookups not written to the SQLite file yet:
+        self._pending_used_at: dict[str, int] = {}
+        self._pending_hits = self._pending_misses = 0
+        self._pending_since: float | None = None
+        self._sets_since_size_check = 0
+        atexit.register(self.flush)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            if (value := self._local_data.get(key)) is None:
+                try:
+                    with self._connect() as connection:
+                        row = connection.execute(
+                            "SELECT value FROM move_results WHERE key = ?", (key,)
+                        ).fetchone()
+                except sqlite3.Error:
+                    self._on_database_error()
+                    return None
+                if row is not None:
+                    value = row[0]
+                    self._set_local(key, value)
+            else:
+                self._local_data.move_to_end(key)
+
+            if value is None:
+                self._pending_misses += 1
+            else:
+                self._pending_hits += 1
+                self._pending_used_at[key] = time.time_ns()
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            if (
+                self._pending_hits + self._pending_misses >= self.flush_threshold
+                or time.monotonic() - self._pending_since >= self.flush_interval
+            ):
+                self._flush()
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._set_local(key, value)
+            self._sets_since_size_check += 1
+            try:
+                with self._connect() as connection:
+                    # We're taking the write lock anyway: let's flush our pending
+                    # lookups in the same transaction.
+                    self._write_pending(connection)
+                    connection.execute(
+                        "INSERT OR REPLACE INTO move_results "
+                        "(key, value, last_used_at) VALUES (?, ?, ?)",
+                        (key, value, time.time_ns()),
+                    )
+                    if self._sets_since_size_check >= max(1, self.max_size // 100):
+                        self._sets_since_size_check = 0
+                        self._evict_overflow(connection)
+            except sqlite3.Error:
+                self._on_database_error()
+                return
+            self._clear_pending()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM move_results")
+            connection.execute("UPDATE counters SET value = 0")
+            self._local_data.clear()
+            self._clear_pending()
+
+    def stats(self) -> MoveResultsCacheStats:
+        with self._lock:
+            self._flush()
+            with self._connect() as connection:
+                counters = dict(connection.execute("SELECT name, value FROM counters"))
+                (size,) = connection.execute(
+                    "SELECT COUNT(*) FROM move_results"
+                ).fetchone()
+        return MoveResultsCacheStats(
+            hits=counters["hits"],
+            misses=counters["misses"],
+            evictions=counters["evictions"],
+            size=size,
+        )
+
+    def _set_local(self, key: str, value: bytes) -> None:
+        self._local_data[key] = value
+        self._local_data.move_to_end(key)
+        while len(self._local_data) > self.local_max_size:
+            self._local_data.popitem(last=False)
+
+    def _flush(self) -> None:
+        if self._pending_since is None:
+            return
+        try:
+            with self._connect() as connection:
+                self._write_pending(connection)
+        except sqlite3.Error:
+            self._on_database_error()
+        # (if we could not write them, these pending lookups are lost: they're only
+        # used for stats and for an approximate LRU eviction, that's fine)
+        self._clear_pending()
+
+    def _write_pending(self, connection: sqlite3.Connection) -> None:
+        if self._pending_used_at:
+            connection.executemany(
+                "UPDATE move_results SET last_used_at = ? WHERE key = ?",
+                ((used_at, key) for key, used_at in self._pending_used_at.items()),
+            )
+        if self._pending_hits or self._pending_misses:
+            connection.executemany(
+                "UPDATE counters SET value = value + ? WHERE name = ?",
+                ((self._pending_hits, "hits"), (self._pending_misses, "misses")),
+            )
+
+    def _clear_pending(self) -> None:
+        self._pending_used_at = {}
+        self._pending_hits = self._pending_misses = 0
+        self._pending_since = None
+
+    def _evict_overflow(self, connection: sqlite3.Connection) -> None:
+        (size,) = connection.execute("SELECT COUNT(*) FROM move_results").fetchone()
+        if (overflow := size - self.max_size) > 0:
+            connection.execute(
+                "DELETE FROM move_results WHERE key IN ("
+                "SELECT key FROM move_results ORDER BY last_used_at LIMIT ?"
+                ")",
+                (overflow,),
+            )
+            connection.execute(
+                "UPDATE counters SET value = value + ? WHERE name = 'evictions'",
+                (overflow,),
+            )
+
+    def _on_database_error(self) -> None:
+        _logger.exception(
+            "Move results cache unavailable (%s): computing the move.", self.path
+        )
+        # Let's start from a new connection next time:
+        if self._connection is not None:
+            with contextlib.suppress(sqlite3.Error):
+                self._connection.close()
+        self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across a `fork()`, so we (re)open
+        # the connection lazily in each process.
+        if self._connection is None or self._connection_pid != os.getpid():
+            if self._connection_pid != os.getpid():
+                # (the parent's lookups and results are not ours to flush)
+                self._local_data.clear()
+                self._clear_pending()
+            connection = sqlite3.connect(
+                self.path, timeout=5, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in self._SCHEMA:
+                connection.execute(statement)
+            # From now on we want the `with connection:` blocks to be transactions:
+            connection.isolation_level = "DEFERRED"
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+
+@cache
+def get_move_results_cache() -> BaseMoveResultsCache:
+    config = settings.CHESS_MOVE_RESULTS_CACHE
+    backend_class: type[BaseMoveResultsCache] = import_string(config["BACKEND"])
+    return backend_class(**config.get("OPTIONS", {}))
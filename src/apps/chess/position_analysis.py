@@ -0,0 +1,148 @@
+from collections import defaultdict
+from functools import lru_cache
+from typing import TYPE_CHECKING, cast
+
+import chess
+
+from .helpers import chess_lib_color_to_player_side, chess_lib_square_to_square
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from .types import FEN, PieceType, PlayerSide, Square
+
+# Our presenters used to ask the chess board the same questions (legal moves, check,
+# outcome, pins...) for each request - and each time the same position is displayed
+# to one of our players.
+# Everything we need to know about a position only depends on its FEN: we compute it
+# once per FEN, and share the result between all the requests of the process.
+
+_PIECES_VALUES: dict["PieceType", int] = {
+    "p": 1,
+    "n": 3,
+    "b": 3,
+    "r": 5,
+    "q": 9,
+}
+
+
+class PositionAnalysis:
+    """
+    An immutable summary of a chess position, computed once from its FEN.
+    """
+
+    __slots__ = (
+        "fen",
+        "active_player_side",
+        "is_check",
+        "winner",
+        "naive_score",
+        "squares_with_pieces_that_can_move",
+        "targets_by_square",
+        "_pinned_squares",
+    )
+
+    def __init__(
+        self,
+        *,
+        fen: "FEN",
+        active_player_side: "PlayerSide",
+        is_check: bool,
+        winner: "PlayerSide | None",
+        naive_score: int,
+        squares_with_pieces_that_can_move: frozenset["Square"],
+        targets_by_square: "Mapping[Square, frozenset[Square]]",
+        pinned_squares: frozenset["Square"],
+    ):
+        self.fen = fen
+        self.active_player_side = active_player_side
+        self.is_check = is_check
+        self.winner = winner
+        self.naive_score = naive_score
+        self.squares_with_pieces_that_can_move = squares_with_pieces_that_can_move
+        self.targets_by_square = targets_by_square
+        self._pinned_squares = pinned_squares
+
+    @classmethod
+    def from_fen(cls, fen: "FEN") -> "PositionAnalysis":
+        chess_board = chess.Board(fen)
+
+        # Legal targets of the active player's pieces...
+        active_player_targets = _legal_targets_by_square(chess_board)
+        # ...and of their opponent's ones, as if it was their turn:
+        opponent_chess_board = chess_board.copy(stack=False)
+        opponent_chess_board.turn = not opponent_chess_board.turn
+        targets_by_square = {
+            **_legal_targets_by_square(opponent_chess_board),
+            **active_player_targets,
+        }
+
+        outcome = chess_board.outcome()
+        return cls(
+            fen=fen,
+            active_player_side=chess_lib_color_to_player_side(chess_board.turn),
+            is_check=chess_board.is_check(),
+            winner=(
+                None
+                if outcome is None
+                else chess_lib_color_to_player_side(outcome.winner)
+            ),
+            naive_score=_naive_score(chess_board),
+            squares_with_pieces_that_can_move=frozenset(active_player_targets.keys()),
+            targets_by_square=targets_by_square,
+            pinned_squares=frozenset(
+                chess_lib_square_to_square(square)
+                for square, piece in chess_board.piece_map().items()
+                if chess_board.is_pinned(piece.color, square)
+            ),
+        )
+
+    @property
+    def is_game_over(self) -> bool:
+        return self.winner is not None
+
+    def piece_available_targets(self, square: "Square") -> frozenset["Square"]:
+        """
+        Returns the legal targets of the piece at the given square - whichever side
+        it belongs to.
+        """
+        return self.targets_by_square.get(square, frozenset())
+
+    def is_pinned(self, square: "Square") -> bool:
+        return square in self._pinned_squares
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.fen}>"
+
+
+@lru_cache(maxsize=2_048)
+def get_position_analysis(fen: "FEN") -> PositionAnalysis:
+    return PositionAnalysis.from_fen(fen)
+
+
+def _legal_targets_by_square(
+    chess_board: chess.Board,
+) -> "dict[Square, frozenset[Square]]":
+    targets: "defaultdict[Square, set[Square]]" = defaultdict(set)
+    for move in chess_board.legal_moves:
+        targets[chess_lib_square_to_square(move.from_square)].add(
+            chess_lib_square_to_square(move.to_square)
+        )
+    return {
+        square: frozenset(square_targets) for square, square_targets in targets.items()
+    }
+
+
+def _naive_score(chess_board: chess.Board) -> int:
+    """
+    A negative score means the "b(lack)" player is winning,
+    while a positive value means the "w(hite) player is winning.
+    This is a very naive score, only based on the value of pieces left on each side.
+    """
+    score = 0
+    for piece in chess_board.piece_map().values():
+        if piece.piece_type == chess.KING:
+            continue
+        multiplier = 1 if piece.color == chess.WHITE else -1
+        score += _PIECES_VALUES[cast("PieceType", piece.symbol().lower())] * multiplier
+    return score
@@ -4,33 +4,30 @@ from typing import TYPE_CHECKING, NamedTuple, cast
 
 import chess
 
-from apps.chess.business_logic import calculate_piece_available_targets
-
 from .consts import PLAYER_SIDES
 from .helpers import (
     chess_lib_color_to_player_side,
-    chess_lib_square_to_square,
-    get_active_player_side_from_chess_board,
     player_side_from_piece_role,
-    player_side_from_piece_symbol,
     symbol_from_piece_role,
     team_member_role_from_piece_role,
 )
 from .models import UserPrefs
+from .position_analysis import get_position_analysis
 from .types import ChessInvalidStateException
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     from dominate.util import text
 
+    from .position_analysis import PositionAnalysis
     from .types import (
         FEN,
         Factions,
         GamePhase,
         GameTeams,
         PieceRole,
-        PieceRoleBySquare,
         PieceSymbol,
-        PieceType,
         PlayerSide,
         Square,
         TeamMember,
@@ -40,14 +37,6 @@ if TYPE_CHECKING:
 
 # Presenters are the objects we pass to our templates.
 
-_PIECES_VALUES: dict["PieceType", int] = {
-    "p": 1,
-    "n": 3,
-    "b": 3,
-    "r": 5,
-    "q": 9,
-}
-
 
 class GamePresenter(ABC):
     """
@@ -61,7 +50,8 @@ class GamePresenter(ABC):
         self,
         *,
         fen: "FEN",
-        piece_role_by_square: "PieceRoleBySquare",
+        # A `PieceRoleBySquare` dict, or a `BoardRoles` object:
+        piece_role_by_square: "Mapping[Square, PieceRole]",
         teams: "GameTeams",
         refresh_last_move: bool,
         is_htmx_request: bool,
@@ -124,32 +114,30 @@ class GamePresenter(ABC):
     def fen(self) -> str:
         return self._chess_board.fen()
 
+    @cached_property
+    def position_analysis(self) -> "PositionAnalysis":
+        # Shared between all the presenters displaying the same position:
+        return get_position_analysis(self.fen)
+
     @cached_property
     def is_check(self) -> bool:
-        return self._chess_board.is_check()
+        return self.position_analysis.is_check
 
     @cached_property
     def is_game_over(self) -> bool:
-        return self.winner is not None
+        return self.position_analysis.is_game_over
 
     @cached_property
     def winner(self) -> "PlayerSide | None":
-        return (
-            None
-            if (outcome := self._chess_board.outcome()) is None
-            else chess_lib_color_to_player_side(outcome.winner)
-        )
+        return self.position_analysis.winner
 
     @cached_property
     def active_player(self) -> "PlayerSide":
-        return get_active_player_side_from_chess_board(self._chess_board)
+        return self.position_analysis.active_player_side
 
     @cached_property
-    def squares_with_pieces_that_can_move(self) -> set["Square"]:
-        return set(
-            chess_lib_square_to_square(move.from_square)
-            for move in self._chess_board.legal_moves
-        )
+    def squares_with_pieces_that_can_move(self) -> frozenset["Square"]:
+        return self.position_analysis.squares_with_pieces_that_can_move
 
     # Properties derived from the Game model:
     @cached_property
@@ -160,6 +148,19 @@ class GamePresenter(ABC):
     def can_select_pieces(self) -> bool:
         return True
 
+    @property
+    def server_side_bot(self) -> bool:
+        """If True, the bot's moves are computed by our server, not by the browser."""
+        return False
+
+    @property
+    def client_side_piece_selection(self) -> bool:
+        """
+        If True, the legal targets of all the pieces are shipped with the board,
+        so the player's piece selection can be managed without server round-trips.
+        """
+        return False
+
     @property
     @abstractmethod
     def is_player_turn(self) -> bool: ...
@@ -193,7 +194,7 @@ class GamePresenter(ABC):
     def speech_bubble(self) -> "SpeechBubbleData | None": ...
 
     @cached_property
-    def piece_role_by_square(self) -> "PieceRoleBySquare":
+    def piece_role_by_square(self) -> "Mapping[Square, PieceRole]":
         return self._piece_role_by_square
 
     def piece_role_at_square(self, square: "Square") -> "PieceRole":
@@ -221,18 +222,7 @@ class GamePresenter(ABC):
         while a positive value means the "w(hite) player is winning.
         This is a very naive score, only based on the value of pieces left on each side.
         """
-        remaining_pieces = cast(
-            "list[PieceSymbol]",
-            [piece.symbol() for piece in self._chess_board.piece_map().values()],
-        )
-        score = 0
-        for piece in remaining_pieces:
-            piece_symbol = cast("PieceType", piece.lower())
-            if piece_symbol == "k":
-                continue
-            multiplier = 1 if player_side_from_piece_symbol(piece) == "w" else -1
-            score += _PIECES_VALUES[piece_symbol] * multiplier
-        return score
+        return self.position_analysis.naive_score
 
     @property
     def chess_board(self) -> chess.Board:
@@ -252,9 +242,15 @@ class GamePresenterUrls(ABC):
     def htmx_game_move_piece_url(self, *, square: "Square", board_id: str) -> str:
         raise NotImplementedError
 
+    def htmx_game_move_piece_url_pattern(self, *, board_id: str) -> str:
+        raise NotImplementedError
+
     def htmx_game_play_bot_move_url(self, *, board_id: str) -> str:
         raise NotImplementedError
 
+    def htmx_game_play_server_bot_move_url(self, *, board_id: str) -> str:
+        raise NotImplementedError
+
     def htmx_game_play_solution_move_url(self, *, board_id: str) -> str:
         raise NotImplementedError
 
@@ -329,24 +325,10 @@ class SelectedPiecePresenter(SelectedSquarePresenter):
 
     @cached_property
     def available_targets(self) -> frozenset["Square"]:
-        chess_board_active_player_side = chess_lib_color_to_player_side(
-            self._chess_board.turn
-        )
-        square_index = chess.parse_square(self.square)
-        piece_player_side = chess_lib_color_to_player_side(
-            self._chess_board.color_at(square_index)
-        )
-
-        if chess_board_active_player_side != piece_player_side:
-            # Let's pretend it's that player's turn,
-            # so we can calculate the available targets:
-            chess_board = self._chess_board.copy()
-            chess_board.turn = not chess_board.turn
-        else:
-            chess_board = self._chess_board
-
-        return calculate_piece_available_targets(
-            chess_board=chess_board, piece_square=self.square
+        # (for the opponent's pieces, these are the targets they would have if it was
+        # their turn)
+        return self._game_presenter.position_analysis.piece_available_targets(
+            self.square
         )
 
     def is_potential_capture(self, square: "Square") -> bool:
@@ -354,10 +336,7 @@ class SelectedPiecePresenter(SelectedSquarePresenter):
 
     @cached_property
     def is_pinned(self) -> bool:
-        return self._chess_board.is_pinned(
-            self.piece_at.color,
-            self._chess_lib_square,
-        )
+        return self._game_presenter.position_analysis.is_pinned(self.square)
 
     def __str__(self) -> str:
         return f"{self.piece_role} at {self.square}"
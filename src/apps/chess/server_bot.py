@@ -0,0 +1,242 @@
+import logging
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from functools import cache, partial
+from typing import TYPE_CHECKING, Literal, NamedTuple, cast
+
+import chess
+from django.conf import settings
+
+from .helpers import uci_move_squares
+from .types import ChessInvalidStateException
+
+if TYPE_CHECKING:
+    from .types import FEN, Square
+
+    ServerBotEngine = Literal["andoma", "sunfish"]
+
+# Our bot's moves are usually computed in the player's browser, by Stockfish WASM.
+# This is the optional server-side alternative: the Python engines we ship in
+# `lib/chess_engines/` compute the bot's moves, in a bounded pool of worker
+# processes - so a slow search doesn't hog the GIL of our request threads.
+# Players of the same daily challenge face the same positions, so the moves are
+# cached by (FEN, depth).
+
+_logger = logging.getLogger(__name__)
+
+
+class ServerBotStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class ServerBot:
+    def __init__(
+        self,
+        *,
+        engine: "ServerBotEngine" = "andoma",
+        time_budget: float = 1.0,
+        nodes_budget: int = 200_000,
+        workers: int = 2,
+        cache_max_size: int = 2_000,
+        max_wait: float = 4.0,
+    ):
+        """
+        `time_budget` and `max_wait` are expressed in seconds.
+        With 0 `workers`, moves are computed in the calling thread.
+        """
+        self.engine = engine
+        # (the engines' own budget must fit in the time we're ready to wait for them)
+        self.time_budget = min(time_budget, max_wait)
+        self.max_wait = max_wait
+        self.nodes_budget = nodes_budget
+        self.workers = workers
+        self.cache_max_size = cache_max_size
+
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._moves: OrderedDict[tuple["FEN", int], str] = OrderedDict()
+        self._hits = self._misses = self._evictions = 0
+
+    def get_move(self, *, fen: "FEN", depth: int) -> tuple["Square", "Square"]:
+        key = (fen, depth)
+        with self._lock:
+            if (move := self._moves.get(key)) is not None:
+                self._moves.move_to_end(key)
+                self._hits += 1
+                return uci_move_squares(move)
+            self._misses += 1
+
+        move, is_fallback = self._compute_move(fen=fen, depth=depth)
+        if is_fallback:
+            # (let's not remember this weak move: the workers will do better next time)
+            return uci_move_squares(move)
+        with self._lock:
+            self._moves[key] = move
+            self._moves.move_to_end(key)
+            while len(self._moves) > self.cache_max_size:
+                self._moves.popitem(last=False)
+                self._evictions += 1
+        return uci_move_squares(move)
+
+    def stats(self) -> ServerBotStats:
+        return ServerBotStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._moves),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._moves.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def _compute_move(self, *, fen: "FEN", depth: int) -> tuple[str, bool]:
+        """Returns the UCI move, and whether it's our instant fallback move."""
+        compute = partial(
+            compute_bot_move,
+            engine=self.engine,
+            fen=fen,
+            depth=depth,
+            time_budget=self.time_budget,
+            nodes_budget=self.nodes_budget,
+        )
+        if self.workers < 1:
+            return compute(), False
+
+        future = self._get_pool().submit(compute)
+        try:
+            # The engines stop by themselves when their budget is exhausted: if we
+            # don't have an answer after a while, it's because the pool is saturated.
+            # We must answer before Gunicorn kills our worker, so no more searching
+            # in the request thread from there.
+            return future.result(timeout=self.max_wait), False
+        except TimeoutError:
+            future.cancel()
+            _logger.warning(
+                "Server bot pool didn't answer in time for FEN '%s': "
+                "falling back to the first of the ordered moves",
+                fen,
+            )
+            return fallback_bot_move(fen), True
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # ("fork"-ing a multi-threaded web server process is not safe)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+
+@cache
+def get_server_bot() -> ServerBot | None:
+    """Returns None if our bot's moves are not computed server-side."""
+    config = settings.CHESS_SERVER_BOT
+    if not config["ENABLED"]:
+        return None
+    return ServerBot(
+        engine=config["ENGINE"],
+        time_budget=config["TIME_BUDGET"],
+        nodes_budget=config["NODES_BUDGET"],
+        workers=config["WORKERS"],
+        cache_max_size=config["CACHE_MAX_SIZE"],
+        max_wait=config["MAX_WAIT"],
+    )
+
+
+def compute_bot_move(
+    *,
+    engine: "ServerBotEngine",
+    fen: "FEN",
+    depth: int,
+    time_budget: float,
+    nodes_budget: int,
+) -> str:
+    """
+    Returns the UCI move (e.g. "e2e4") the given engine wants to play.
+    N.B. This runs in our worker processes: it must stay free of Django-related stuff.
+    """
+    board = chess.Board(fen)
+    if board.is_game_over():
+        raise ChessInvalidStateException(f"Game is over for FEN '{fen}'")
+
+    move: chess.Move | None = None
+    if engine == "sunfish":
+        move = _sunfish_move(
+            fen, depth=depth, time_budget=time_budget, nodes_budget=nodes_budget
+        )
+        if move is not None and move not in board.legal_moves:
+            # Sunfish is a "king capture" engine, which doesn't know much about the
+            # chess rules - let's not trust it blindly.
+            _logger.warning("Sunfish move %s is not legal for FEN '%s'", move, fen)
+            move = None
+    if move is None:
+        move = _andoma_move(
+            board, depth=depth, time_budget=time_budget, nodes_budget=nodes_budget
+        )
+
+    # We only manage promotions to queens:
+    return move.uci()[:4]
+
+
+def fallback_bot_move(fen: "FEN") -> str:
+    """
+    Returns a "not too silly" UCI move instantly, without any search: the best one
+    according to Andoma's moves ordering heuristic.
+    """
+    from lib.chess_engines.andoma.movegeneration import get_ordered_moves
+
+    board = chess.Board(fen)
+    if board.is_game_over():
+        raise ChessInvalidStateException(f"Game is over for FEN '{fen}'")
+    return get_ordered_moves(board)[0].uci()[:4]
+
+
+def _andoma_move(
+    board: chess.Board, *, depth: int, time_budget: float, nodes_budget: int
+) -> chess.Move:
+    from lib.chess_engines.andoma.movegeneration import next_move
+
+    return next_move(
+        depth, board, debug=False, time_limit=time_budget, max_nodes=nodes_budget
+    )
+
+
+def _sunfish_move(
+    fen: "FEN", *, depth: int, time_budget: float, nodes_budget: int
+) -> chess.Move | None:
+    from lib.chess_engines.sunfish import sunfish, tools as sunfish_tools
+
+    position = sunfish_tools.parseFEN(fen)
+    searcher = sunfish.Searcher()  # type: ignore[attr-defined]
+    deadline = time.monotonic() + time_budget
+    move = None
+    # Sunfish searches with iterative deepening: we stop at the requested depth,
+    # or as soon as we're out of budget.
+    for search_depth, search_move, _ in searcher.search(position):
+        if search_move is not None:
+            move = search_move
+        if (
+            search_depth >= depth
+            or searcher.nodes > nodes_budget
+            or time.monotonic() > deadline
+        ):
+            break
+    if move is None:
+        return None
+    return chess.Move.from_uci(cast(str, sunfish_tools.mrender(position, move))[:4])
@@ -15,6 +15,8 @@ window.__admin__playFromFEN = playFromFEN
 // @ts-ignore
 window.__admin__getChessEngineWorker = getChessEngineWorker
 
+document.addEventListener("htmx:beforeRequest", onHtmxBeforeRequest)
+
 function cursorIsNotOnChessBoardInteractiveElement(boardId: string): boolean {
     // Must return `true` only if the user hasn't clicked on one of the game clickable elements.
     // @link https://htmx.org/attributes/hx-trigger/
@@ -80,10 +82,194 @@ function cursorIsNotOnChessBoardInteractiveElement(boardId: string): boolean {
         return false // don't actually cancel the selection when interacting with a modal
     }
 
+    if (clearClientSideSelection(boardId)) {
+        console.log("no interactive UI element clicked: we reset the client-side selection")
+        return false // no need to ask the server for that
+    }
+
     console.log("no interactive UI element clicked: we reset the board state")
     return true
 }
 
+// Client-side piece selection:
+// When the server ships the legal targets of all the pieces with the board (see the
+// "_client_side_selection_html_elements" Python function), selecting a piece doesn't
+// need a round-trip to the server: we cancel the piece's htmx request and display its
+// targets, as well as the selected piece and potential captures highlights, ourselves.
+// The status bar (with the selected character's info) and the speech bubble are
+// still rendered by the server, but fetched in the background: the board doesn't wait
+// for them. If that data is not there, the htmx request goes on as usual.
+
+type ClientSideSelectionData = {
+    dataHolder: HTMLElement
+    targetsBySquare: Record<string, string>
+    movePieceUrl: string
+    noSelectionUrl: string
+    activePlayerSide: "w" | "b"
+    targetMarkers: [string, string] // [active player's marker, opponent's marker], on "a1"
+}
+
+const PIECES_CONTAINER_ID_PREFIX = "chess-board-pieces-"
+const FILES = "abcdefgh"
+// Same classes as our "_chess_character_display_tag" Python function:
+const PIECE_SYMBOL_SHADOW_CLASSES = { w: "drop-shadow-piece-symbol-w", b: "drop-shadow-piece-symbol-b" }
+const SELECTED_PIECE_SHADOW_CLASSES = {
+    active: "drop-shadow-active-selected-piece",
+    opponent: "drop-shadow-opponent-selected-piece",
+}
+const POTENTIAL_CAPTURE_SHADOW_CLASS = "drop-shadow-potential-capture"
+
+// The characters we highlighted client-side, with their original classes - by board id:
+const clientSideHighlights = new Map<string, [HTMLElement, string][]>()
+
+function onHtmxBeforeRequest(event: Event): void {
+    const pieceElement = (event as CustomEvent).detail.elt as HTMLElement
+    const square = pieceElement.dataset.square
+    const pieceRole = pieceElement.dataset.pieceRole
+    if (!square || !pieceRole) {
+        return // not a chess piece
+    }
+    const piecesContainer = pieceElement.closest(`[id^="${PIECES_CONTAINER_ID_PREFIX}"]`)
+    if (!piecesContainer) {
+        return
+    }
+    const boardId = piecesContainer.id.substring(PIECES_CONTAINER_ID_PREFIX.length)
+    const selectionData = getClientSideSelectionData(boardId)
+    if (!selectionData) {
+        return // let's use the server-rendered selection
+    }
+
+    event.preventDefault()
+
+    const selectedSquare = clearClientSideSelection(boardId)
+    if (selectedSquare === square) {
+        // Re-selecting the selected piece de-selects it:
+        fetchServerSideSelectionStatus(selectionData, selectionData.noSelectionUrl)
+        return
+    }
+    selectPieceClientSide(boardId, square, pieceRole, selectionData)
+    fetchServerSideSelectionStatus(selectionData, pieceElement.dataset.hxGet!)
+}
+
+function getClientSideSelectionData(boardId: string): ClientSideSelectionData | null {
+    const dataHolder = document.getElementById(`chess-board-client-side-selection-${boardId}`)
+    if (!dataHolder) {
+        return null
+    }
+    return {
+        dataHolder,
+        targetsBySquare: JSON.parse(dataHolder.dataset.targetsBySquare!),
+        movePieceUrl: dataHolder.dataset.movePieceUrl!,
+        noSelectionUrl: dataHolder.dataset.noSelectionUrl!,
+        activePlayerSide: dataHolder.dataset.activePlayerSide as "w" | "b",
+        targetMarkers: JSON.parse(dataHolder.dataset.targetMarkers!),
+    }
+}
+
+function selectPieceClientSide(
+    boardId: string,
+    square: string,
+    pieceRole: string,
+    selectionData: ClientSideSelectionData,
+): void {
+    const targetsContainer = document.getElementById(`chess-board-available-targets-${boardId}`)
+    if (!targetsContainer) {
+        return
+    }
+
+    // White pieces' roles are upper case, black ones are lower case:
+    const pieceSide = pieceRole === pieceRole.toUpperCase() ? "w" : "b"
+    const canMove = pieceSide === selectionData.activePlayerSide
+    const markerTemplate = document.createElement("template")
+    markerTemplate.innerHTML = selectionData.targetMarkers[canMove ? 0 : 1]
+    const markerPrototype = markerTemplate.content.firstElementChild as HTMLElement
+
+    const targets = selectionData.targetsBySquare[square] ?? ""
+    for (let i = 0; i < targets.length; i += 2) {
+        const targetSquare = targets.substring(i, i + 2)
+        const marker = markerPrototype.cloneNode(true) as HTMLElement
+        // Same classes as our "square_to_piece_tailwind_classes" Python function:
+        marker.classList.replace("translate-y-0/1", `translate-y-${FILES.indexOf(targetSquare[0])}/1`)
+        marker.classList.replace("translate-x-0/1", `translate-x-${Number(targetSquare[1]) - 1}/1`)
+        marker.dataset.square = targetSquare
+        if (canMove) {
+            marker.dataset.hxPost = selectionData.movePieceUrl.replace("<from>", square).replace("<to>", targetSquare)
+        }
+        targetsContainer.appendChild(marker)
+        window.htmx.process(marker)
+    }
+
+    // The selected piece, and the pieces it could capture, are highlighted:
+    const highlights: [HTMLElement, string][] = []
+    const highlight = (characterElement: HTMLElement | null, update: (classes: DOMTokenList) => void) => {
+        if (!characterElement) {
+            return
+        }
+        highlights.push([characterElement, characterElement.className])
+        update(characterElement.classList)
+    }
+    const piecesContainer = document.getElementById(`${PIECES_CONTAINER_ID_PREFIX}${boardId}`)
+    highlight(getCharacterElement(piecesContainer, square), (classes) =>
+        classes.replace(
+            PIECE_SYMBOL_SHADOW_CLASSES[pieceSide],
+            SELECTED_PIECE_SHADOW_CLASSES[canMove ? "active" : "opponent"],
+        ),
+    )
+    for (let i = 0; i < targets.length; i += 2) {
+        highlight(getCharacterElement(piecesContainer, targets.substring(i, i + 2)), (classes) =>
+            classes.add(POTENTIAL_CAPTURE_SHADOW_CLASS),
+        )
+    }
+    clientSideHighlights.set(boardId, highlights)
+
+    targetsContainer.dataset.clientSideSelection = square
+    setBoardState(boardId, "waiting_for_player_target_choice")
+}
+
+function getCharacterElement(piecesContainer: HTMLElement | null, square: string): HTMLElement | null {
+    const selector = `[data-square="${square}"][data-piece-role] div[data-piece-role]`
+    return piecesContainer?.querySelector<HTMLElement>(selector) ?? null
+}
+
+/**
+ * Fetches the server-rendered status bar and speech bubble of a client-side (de)selection.
+ * Only their out-of-band swaps are applied (see the "?parts=status" Python views
+ * parameter), and a new selection cancels the previous pending request.
+ */
+function fetchServerSideSelectionStatus(selectionData: ClientSideSelectionData, url: string): void {
+    const separator = url.includes("?") ? "&" : "?"
+    window.htmx.ajax("GET", `${url}${separator}parts=status`, {
+        source: selectionData.dataHolder,
+        swap: "none",
+    })
+}
+
+/**
+ * Returns the square of the piece that was selected client-side, if any.
+ */
+function clearClientSideSelection(boardId: string): string | null {
+    const targetsContainer = document.getElementById(`chess-board-available-targets-${boardId}`)
+    const selectedSquare = targetsContainer?.dataset.clientSideSelection
+    if (!targetsContainer || !selectedSquare) {
+        return null
+    }
+    targetsContainer.replaceChildren()
+    delete targetsContainer.dataset.clientSideSelection
+    for (const [characterElement, originalClasses] of clientSideHighlights.get(boardId) ?? []) {
+        characterElement.className = originalClasses
+    }
+    clientSideHighlights.delete(boardId)
+    setBoardState(boardId, "waiting_for_player_selection")
+    return selectedSquare
+}
+
+function setBoardState(boardId: string, boardState: string): void {
+    const boardStateElement = document.querySelector<HTMLElement>(`#chess-arena-${boardId} [data-board-state]`)
+    if (boardStateElement) {
+        boardStateElement.dataset.boardState = boardState
+    }
+}
+
 type BotMoveDescription = {
     fen: string
     htmxElementId: string
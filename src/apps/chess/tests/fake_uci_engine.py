@@ -0,0 +1,82 @@
+"""
+A tiny stand-in for Stockfish, speaking just enough of the UCI protocol for our
+tests: its scores are the pieces' material balance, and it plays the first legal
+move it finds.
+
+Usage: python fake_uci_engine.py [--crash-after=N]
+With `--crash-after=N`, the process dies when it receives its Nth "go" command.
+"""
+
+import sys
+
+import chess
+
+_PIECES_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 300,
+    chess.BISHOP: 300,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 0,
+}
+
+
+def main(crash_after: int | None) -> None:
+    board = chess.Board()
+    go_commands_count = 0
+
+    for line in sys.stdin:
+        command, *args = line.split()
+        if command == "uci":
+            _send("id name ZakuChess fake engine")
+            _send("uciok")
+        elif command == "isready":
+            _send("readyok")
+        elif command == "position":
+            board = _parse_position(args)
+        elif command == "go":
+            go_commands_count += 1
+            if crash_after is not None and go_commands_count >= crash_after:
+                sys.exit(1)
+            _send(f"info depth 1 score cp {_material_balance(board)}")
+            best_move = next(iter(board.legal_moves), None)
+            _send(f"bestmove {best_move.uci() if best_move else '0000'}")
+        elif command == "quit":
+            return
+
+
+def _parse_position(args: list[str]) -> chess.Board:
+    moves_index = args.index("moves") if "moves" in args else len(args)
+    if args[0] == "startpos":
+        board = chess.Board()
+    else:
+        board = chess.Board(" ".join(args[1:moves_index]))
+    for move in args[moves_index + 1 :]:
+        board.push_uci(move)
+    return board
+
+
+def _material_balance(board: chess.Board) -> int:
+    """From the point of view of the side to move, as UCI wants it."""
+    balance = sum(
+        _PIECES_VALUES[piece.piece_type] * (1 if piece.color == board.turn else -1)
+        for piece in board.piece_map().values()
+    )
+    return balance
+
+
+def _send(message: str) -> None:
+    sys.stdout.write(message + "\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    crash_after = next(
+        (
+            int(arg.split("=")[1])
+            for arg in sys.argv[1:]
+            if arg.startswith("--crash-after=")
+        ),
+        None,
+    )
+    main(crash_after)
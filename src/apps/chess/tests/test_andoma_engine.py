@@ -0,0 +1,114 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+import pytest
+
+from lib.chess_engines.andoma.movegeneration import (
+    EXACT,
+    LOWER_BOUND,
+    Searcher,
+    TranspositionTable,
+    next_move,
+)
+
+
+def test_transposition_table_is_bounded():
+    table = TranspositionTable(capacity=8)
+    table.new_search()
+    for key in range(100):
+        table.store(key, 1, 0.0, EXACT, None)
+
+    assert table.occupancy() == 1.0
+    assert len(table._slots) == 8
+    assert table.probe(99) is not None
+    assert table.probe(3) is None
+
+
+def test_transposition_table_replacement_scheme():
+    table = TranspositionTable(capacity=8)
+    table.new_search()
+    table.store(1, 4, 10.0, EXACT, None)
+
+    # A shallower result for another position doesn't evict a deeper one...
+    table.store(9, 2, 20.0, LOWER_BOUND, None)
+    assert table.probe(9) is None
+    assert (entry := table.probe(1)) is not None and entry.depth == 4
+
+    # ...unless the deeper one comes from a previous search:
+    table.new_search()
+    table.store(9, 2, 20.0, LOWER_BOUND, None)
+    assert table.probe(1) is None
+    assert (entry := table.probe(9)) is not None and entry.value == 20.0
+
+    assert table.hit_rate() == pytest.approx(2 / 4)
+
+
+@pytest.mark.parametrize(
+    ("fen", "expected_move"),
+    (
+        ("k7/8/1K6/8/8/8/8/6Q1 w - - 0 1", "g1g8"),
+        ("6q1/8/8/8/8/1k6/8/K7 b - - 0 1", "g8g1"),
+    ),
+)
+def test_next_move_finds_mates_in_one(fen: str, expected_move: str):
+    assert next_move(3, chess.Board(fen), debug=False).uci() == expected_move
+
+
+def test_transposition_table_reduces_the_search_tree():
+    board = chess.Board("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1")
+    plain_searcher = Searcher(order_captures_first=False)
+    plain_searcher.search(board, 3)
+    searcher = Searcher(
+        transposition_table=TranspositionTable(), order_captures_first=False
+    )
+    searcher.search(board, 3)
+
+    assert searcher.completed_depth == plain_searcher.completed_depth == 3
+    assert len(searcher.time_to_depth) == 3
+    assert searcher.nodes < plain_searcher.nodes
+    # The board we were given is left untouched:
+    assert board.move_stack == []
+
+
+def test_searching_captures_first_reduces_the_search_tree():
+    board = chess.Board(
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 1"
+    )
+    andoma_order_searcher = Searcher(
+        transposition_table=TranspositionTable(), order_captures_first=False
+    )
+    andoma_order_move = andoma_order_searcher.search(board, 3)
+    searcher = Searcher(transposition_table=TranspositionTable())
+    move = searcher.search(board, 3)
+
+    assert searcher.nodes < andoma_order_searcher.nodes
+    # Moves ordering only changes which moves get pruned, not the best move's score:
+    assert searcher.score == andoma_order_searcher.score
+    assert move == andoma_order_move
+
+
+def test_searcher_stops_when_out_of_nodes():
+    searcher = Searcher(transposition_table=TranspositionTable(), max_nodes=100)
+    move = searcher.search(chess.Board(), 10)
+
+    assert move in chess.Board().legal_moves
+    assert searcher.completed_depth < 10
+
+
+def test_parallel_search_finds_the_same_moves_as_the_serial_search():
+    fens = (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "6q1/8/8/8/8/1k6/8/K7 b - - 0 1",
+    )
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        for fen in fens:
+            serial_move = next_move(3, chess.Board(fen), debug=False)
+            parallel_searcher = Searcher(
+                transposition_table=TranspositionTable(), executor=executor, workers=2
+            )
+            assert parallel_searcher.search(chess.Board(fen), 3) == serial_move
+            assert parallel_searcher.completed_depth == 3
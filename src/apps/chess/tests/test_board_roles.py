@@ -0,0 +1,131 @@
+from typing import TYPE_CHECKING
+
+import pytest
+
+from ..board_roles import PIECE_ROLES, BoardRoles, BoardRolesMove
+from ..business_logic import do_chess_move
+
+if TYPE_CHECKING:
+    from ..types import FEN, PieceRole, PieceRoleBySquare, PlayerSide, Square
+
+
+def test_board_roles_mapping_interface():
+    piece_role_by_square: "PieceRoleBySquare" = {"a1": "K", "b7": "p1", "h8": "q"}
+
+    board_roles = BoardRoles.from_piece_role_by_square(piece_role_by_square)
+
+    assert len(board_roles) == 3
+    assert board_roles["b7"] == "p1"
+    assert "a2" not in board_roles
+    with pytest.raises(KeyError):
+        board_roles["a2"]
+    assert board_roles == piece_role_by_square
+    assert board_roles.to_piece_role_by_square() == piece_role_by_square
+
+
+def test_board_roles_encoding():
+    all_roles_board = BoardRoles.from_piece_role_by_square(
+        dict(zip(("a1", "a2", "a3", "a4", "a5", "a6", "a7", "a8"), PIECE_ROLES[:8]))
+        | dict(zip(("h1", "h2", "h3", "h4", "h5", "h6", "h7", "h8"), PIECE_ROLES[-8:]))
+    )
+
+    encoded = all_roles_board.encode()
+
+    assert len(encoded) == 64
+    assert BoardRoles.decode(encoded) == all_roles_board
+    assert BoardRoles.decode("." * 64) == BoardRoles()
+
+
+@pytest.mark.parametrize(
+    "encoded", ("", "." * 63, "." * 63 + "!", "." * 63 + "9", "." * 65)
+)
+def test_board_roles_decoding_rejects_invalid_input(encoded: str):
+    with pytest.raises(ValueError):
+        BoardRoles.decode(encoded)
+
+
+@pytest.mark.parametrize(
+    (
+        "fen",
+        "piece_role_by_square",
+        "move",
+        "expected_piece_role_by_square",
+        "expected_captured_piece_role",
+    ),
+    (
+        (
+            # simple move
+            "7k/8/8/8/8/8/8/K7 w - - 0 1",
+            {"a1": "K", "h8": "k"},
+            ("a1", "a2"),
+            {"a2": "K", "h8": "k"},
+            None,
+        ),
+        (
+            # capture
+            "7k/8/8/8/8/8/8/Kr6 w - - 0 1",
+            {"a1": "K", "b1": "r1", "h8": "k"},
+            ("a1", "b1"),
+            {"b1": "K", "h8": "k"},
+            "r1",
+        ),
+        (
+            # en passant
+            "7k/8/8/pP6/8/8/8/7K w - a6 0 1",
+            {"a5": "p1", "b5": "P2", "h1": "K", "h8": "k"},
+            ("b5", "a6"),
+            {"a6": "P2", "h1": "K", "h8": "k"},
+            "p1",
+        ),
+        (
+            # castling
+            "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1",
+            {"a1": "R1", "e1": "K", "h1": "R2", "a8": "r1", "e8": "k", "h8": "r2"},
+            ("e1", "g1"),
+            {"a1": "R1", "g1": "K", "f1": "R2", "a8": "r1", "e8": "k", "h8": "r2"},
+            None,
+        ),
+        (
+            # promotion, "w" side
+            "7k/P7/8/8/8/8/8/7K w - - 0 1",
+            {"a7": "P1", "h1": "K", "h8": "k"},
+            ("a7", "a8"),
+            {"a8": "P1Q", "h1": "K", "h8": "k"},
+            None,
+        ),
+        (
+            # promotion with a capture, "b" side
+            "7k/8/8/8/8/8/p7/1R5K b - - 0 1",
+            {"a2": "p3", "b1": "R1", "h1": "K", "h8": "k"},
+            ("a2", "b1"),
+            {"b1": "p3q", "h1": "K", "h8": "k"},
+            "R1",
+        ),
+    ),
+)
+def test_board_roles_apply_and_revert_move(
+    fen: "FEN",
+    piece_role_by_square: "PieceRoleBySquare",
+    move: tuple["Square", "Square"],
+    expected_piece_role_by_square: "PieceRoleBySquare",
+    expected_captured_piece_role: "PieceRole | None",
+):
+    board_roles = BoardRoles.from_piece_role_by_square(piece_role_by_square)
+    active_player_side: "PlayerSide" = fen.split(" ")[1]  # type: ignore[assignment]
+    move_result = do_chess_move(fen=fen, from_=move[0], to=move[1])
+
+    applied_move = board_roles.apply_move(
+        move_result, active_player_side=active_player_side
+    )
+
+    assert board_roles == expected_piece_role_by_square
+    assert board_roles.board_fen() == move_result["fen"].split(" ")[0]
+    assert applied_move.captured_piece_role == expected_captured_piece_role
+
+    # Moves can be reverted straight away, or after a trip in a cookie:
+    board_roles_copy = board_roles.copy()
+    board_roles.revert_move(applied_move)
+    board_roles_copy.revert_move(BoardRolesMove.decode(applied_move.encode()))
+
+    assert board_roles == board_roles_copy == piece_role_by_square
+    assert board_roles.board_fen() == fen.split(" ")[0]
@@ -0,0 +1,103 @@
+from typing import TYPE_CHECKING
+
+import chess
+import pytest
+
+from ..engines_benchmark import (
+    EnginesBenchmarkReport,
+    _andoma_search,
+    _sunfish_search,
+    compare_engines_benchmark_reports,
+    load_benchmark_positions,
+    perft,
+    run_engines_benchmark,
+    sunfish_perft,
+)
+
+if TYPE_CHECKING:
+    from ..engines_benchmark import BenchmarkPosition
+
+_POSITIONS = load_benchmark_positions()
+
+
+@pytest.mark.parametrize("position", _POSITIONS, ids=lambda position: position.id)
+def test_perft(position: "BenchmarkPosition"):
+    chess_board = chess.Board(position.fen)
+    for depth, expected_nodes in position.perft_nodes.items():
+        if depth > 2:
+            continue  # (deeper checks are left to the `chess_engines_bench` command)
+        assert perft(chess_board, depth) == expected_nodes
+
+    assert sunfish_perft(position.fen, 2) == perft(
+        chess_board, 2, queen_promotions_only=True
+    )
+
+
+def test_run_engines_benchmark():
+    positions = [
+        position for position in _POSITIONS if position.id == "perft position 3"
+    ]
+    report = run_engines_benchmark(
+        perft_depth=1,
+        search_depth=2,
+        search_time=0.05,
+        parallel_workers=(2,),
+        positions=positions,
+    )
+
+    assert report.perft_failures == []
+    assert len(report.perft) == 2
+    assert set(report.searches.keys()) == {
+        "andoma/depth",
+        "andoma/time",
+        "sunfish/depth",
+        "sunfish/time",
+        "andoma-upstream/depth",
+        "andoma-plain/depth",
+        "andoma-tt/depth",
+        "andoma-heuristics/depth",
+    }
+    for search_name in ("andoma/depth", "sunfish/depth", "andoma-tt/depth"):
+        assert len(report.searches[search_name].time_to_depth) == 2
+    for search_name, stats in report.searches.items():
+        if search_name.endswith("/depth"):
+            assert stats.average_depth == 2
+    # Our transposition table can only spare nodes:
+    assert (
+        report.searches["andoma-tt/depth"].nodes
+        <= report.searches["andoma-plain/depth"].nodes
+    )
+    # ...and so can searching the captures first:
+    assert (
+        report.searches["andoma/depth"].nodes
+        <= report.searches["andoma-tt/depth"].nodes
+    )
+    assert set(report.best_move_agreement.keys()) == {"depth", "time"}
+    assert report.parallel_searches[2].same_best_moves
+
+    assert EnginesBenchmarkReport.from_json(report.to_json()) == report
+    comparisons = compare_engines_benchmark_reports(report, report)
+    assert comparisons["andoma/depth"].nps_change == 0
+    assert comparisons["andoma/depth"].best_moves_changes_count == 0
+
+
+# N.B. These use pytest-benchmark: `pytest --benchmark-only --benchmark-json=...`
+# can track them between commits.
+
+
+@pytest.mark.parametrize("search", (_andoma_search, _sunfish_search))
+def test_benchmark_fixed_depth_search(benchmark, search):
+    kiwipete = next(position for position in _POSITIONS if position.id == "kiwipete")
+    outcome = benchmark.pedantic(
+        search, args=(kiwipete.fen,), kwargs={"depth": 2, "time_limit": None}, rounds=3
+    )
+    assert (
+        chess.Move.from_uci(outcome.best_move) in chess.Board(kiwipete.fen).legal_moves
+    )
+
+
+def test_benchmark_sunfish_perft(benchmark):
+    assert (
+        benchmark.pedantic(sunfish_perft, args=(chess.STARTING_FEN, 3), rounds=3)
+        == 8902
+    )
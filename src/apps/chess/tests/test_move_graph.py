@@ -0,0 +1,73 @@
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import pytest
+
+from ..business_logic import do_chess_move
+from ..business_logic._do_chess_move import _do_chess_move
+from ..move_graph import ChessMoveGraph
+from ..types import ChessInvalidMoveException
+
+if TYPE_CHECKING:
+    from ..types import FEN
+
+_FEN: "FEN" = "k7/pp3Q2/7p/8/8/8/7B/K7 w - - 0 2"
+
+
+def test_move_graph_build():
+    graph = ChessMoveGraph.build(fens=(_FEN,), depth=2)
+
+    # The starting position, and all the positions reached by the player's moves
+    # that don't end the game:
+    assert _FEN in graph
+    assert len(graph) > 1
+
+    after_king_move = graph.move(fen=_FEN, from_="a1", to="b1")
+    assert after_king_move == _do_chess_move(fen=_FEN, from_="a1", to="b1")
+    assert after_king_move["fen"] in graph
+
+
+def test_move_graph_survives_serialization():
+    graph = ChessMoveGraph.build(fens=(_FEN,), depth=1)
+
+    restored_graph = ChessMoveGraph.from_bytes(graph.to_bytes())
+
+    assert len(restored_graph) == len(graph) == 1
+    assert restored_graph.add_position(_FEN) == graph.add_position(_FEN)
+    # Checkmate, en passant, etc. are preserved:
+    assert restored_graph.move(fen=_FEN, from_="f7", to="f8")["game_over"] == {
+        "winner": "w",
+        "reason": "checkmate",
+    }
+
+
+def test_move_graph_is_extended_lazily():
+    graph = ChessMoveGraph(max_lazy_moves=2)
+    other_fen: "FEN" = "7k/8/8/pP6/8/8/8/7K w - a6 0 1"
+
+    # A position we don't know: only the played move is computed, and kept
+    with mock.patch(
+        "apps.chess.move_graph.do_chess_move", wraps=do_chess_move
+    ) as do_chess_move_mock:
+        graph.move(fen=_FEN, from_="a1", to="b1")
+        graph.move(fen=_FEN, from_="a1", to="b1")
+    assert do_chess_move_mock.call_count == 1
+    assert _FEN not in graph
+
+    graph.move(fen=_FEN, from_="a1", to="b2")
+    # The graph is full: this move is computed but not stored
+    with mock.patch(
+        "apps.chess.move_graph.do_chess_move", wraps=do_chess_move
+    ) as do_chess_move_mock:
+        graph.move(fen=other_fen, from_="b5", to="a6")
+        graph.move(fen=other_fen, from_="b5", to="a6")
+    assert do_chess_move_mock.call_count == 2
+    assert graph._lazy_moves_count == 2
+    assert len(graph) == 0
+
+
+def test_move_graph_rejects_invalid_moves():
+    graph = ChessMoveGraph.build(fens=(_FEN,), depth=1)
+
+    with pytest.raises(ChessInvalidMoveException):
+        graph.move(fen=_FEN, from_="a1", to="a3")
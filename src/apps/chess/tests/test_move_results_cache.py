@@ -0,0 +1,197 @@
+import os
+import runpy
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import pytest
+
+from ..business_logic._do_chess_move import _do_chess_move
+from ..move_results_cache import (
+    LocMemMoveResultsCache,
+    MoveResultsCacheStats,
+    SQLiteMoveResultsCache,
+    get_move_results_cache,
+)
+
+if TYPE_CHECKING:
+    from ..move_results_cache import BaseMoveResultsCache
+    from ..types import FEN, Square
+
+
+@pytest.fixture(params=("locmem", "sqlite"))
+def move_results_cache(request, tmp_path: "Path") -> "BaseMoveResultsCache":
+    if request.param == "sqlite":
+        return SQLiteMoveResultsCache(
+            path=str(tmp_path / "move_results_cache.sqlite3"), max_size=2
+        )
+    return LocMemMoveResultsCache(max_size=2)
+
+
+@pytest.mark.parametrize(
+    ("fen", "from_", "to"),
+    (
+        # en passant:
+        ("7k/8/8/pP6/8/8/8/7K w - a6 0 1", "b5", "a6"),
+        # castling:
+        ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "e1", "g1"),
+        # promotion:
+        ("7k/P7/8/8/8/8/8/7K w - - 0 1", "a7", "a8"),
+        # checkmate:
+        ("k7/pp3Q2/7p/8/8/8/7B/K7 w - - 0 2", "f7", "f8"),
+    ),
+)
+def test_move_results_survive_the_encoding(
+    move_results_cache: "BaseMoveResultsCache",
+    fen: "FEN",
+    from_: "Square",
+    to: "Square",
+):
+    expected_result = _do_chess_move(fen=fen, from_=from_, to=to)
+
+    def compute():
+        return _do_chess_move(fen=fen, from_=from_, to=to)
+
+    result_on_miss = move_results_cache.get_or_compute(
+        fen=fen, from_=from_, to=to, compute=compute
+    )
+    result_on_hit = move_results_cache.get_or_compute(
+        fen=fen, from_=from_, to=to, compute=compute
+    )
+
+    assert result_on_miss == expected_result
+    assert result_on_hit == expected_result
+    assert move_results_cache.stats() == MoveResultsCacheStats(
+        hits=1, misses=1, evictions=0, size=1
+    )
+
+
+def test_move_results_cache_evicts_least_recently_used_entries(
+    move_results_cache: "BaseMoveResultsCache",
+):
+    fen: "FEN" = "7k/8/8/8/8/8/8/K7 w - - 0 1"
+    computed_moves: list[str] = []
+
+    def play(to: "Square") -> None:
+        def compute():
+            computed_moves.append(to)
+            return _do_chess_move(fen=fen, from_="a1", to=to)
+
+        move_results_cache.get_or_compute(fen=fen, from_="a1", to=to, compute=compute)
+
+    play("a2")
+    play("b1")
+    play("a2")  # hit: "a2" is now the most recently used entry
+    play("b2")  # the cache is full: "b1" gets evicted
+    play("a2")  # still a hit
+    play("b1")  # ...but that one has to be computed again
+
+    assert computed_moves == ["a2", "b1", "b2", "b1"]
+    assert move_results_cache.stats() == MoveResultsCacheStats(
+        hits=2, misses=4, evictions=2, size=2
+    )
+
+
+def test_sqlite_move_results_cache_is_shared_between_instances(tmp_path: "Path"):
+    cache_path = str(tmp_path / "move_results_cache.sqlite3")
+    fen: "FEN" = "7k/8/8/8/8/8/8/K7 w - - 0 1"
+
+    worker_1_cache = SQLiteMoveResultsCache(path=cache_path)
+    worker_1_cache.get_or_compute(
+        fen=fen,
+        from_="a1",
+        to="a2",
+        compute=lambda: _do_chess_move(fen=fen, from_="a1", to="a2"),
+    )
+
+    # A new instance (i.e. a recycled worker) can use the result straight away:
+    def compute_should_not_be_called():
+        raise AssertionError("The result should have been cached")
+
+    worker_2_cache = SQLiteMoveResultsCache(path=cache_path)
+    result = worker_2_cache.get_or_compute(
+        fen=fen, from_="a1", to="a2", compute=compute_should_not_be_called
+    )
+
+    assert result["fen"] == "7k/8/8/8/8/8/K7/8 b - - 1 1"
+    assert worker_2_cache.stats() == MoveResultsCacheStats(
+        hits=1, misses=1, evictions=0, size=1
+    )
+
+
+def test_sqlite_move_results_cache_batches_its_writes(tmp_path: "Path"):
+    cache_path = str(tmp_path / "move_results_cache.sqlite3")
+    fen: "FEN" = "7k/8/8/8/8/8/8/K7 w - - 0 1"
+
+    worker_1_cache = SQLiteMoveResultsCache(
+        path=cache_path, flush_threshold=3, flush_interval=3600
+    )
+    worker_2_cache = SQLiteMoveResultsCache(path=cache_path)
+
+    def play() -> None:
+        worker_1_cache.get_or_compute(
+            fen=fen,
+            from_="a1",
+            to="a2",
+            compute=lambda: _do_chess_move(fen=fen, from_="a1", to="a2"),
+        )
+
+    play()  # miss: the result (and the pending miss) are written straight away
+    play()  # hit, served from the worker's memory
+    play()  # ditto
+    # These 2 hits are not written to the SQLite file yet:
+    assert worker_2_cache.stats() == MoveResultsCacheStats(
+        hits=0, misses=1, evictions=0, size=1
+    )
+
+    play()  # our 3rd pending lookup: time to flush them
+    assert worker_2_cache.stats() == MoveResultsCacheStats(
+        hits=3, misses=1, evictions=0, size=1
+    )
+
+
+def test_sqlite_move_results_cache_errors_fall_back_to_computing_moves(
+    tmp_path: "Path",
+):
+    fen: "FEN" = "7k/8/8/8/8/8/8/K7 w - - 0 1"
+    # (SQLite can't create a file in a directory that doesn't exist)
+    move_results_cache = SQLiteMoveResultsCache(
+        path=str(tmp_path / "missing_dir" / "move_results_cache.sqlite3")
+    )
+
+    result = move_results_cache.get_or_compute(
+        fen=fen,
+        from_="a1",
+        to="a2",
+        compute=lambda: _do_chess_move(fen=fen, from_="a1", to="a2"),
+    )
+
+    assert result["fen"] == "7k/8/8/8/8/8/K7/8 b - - 1 1"
+
+
+@pytest.mark.parametrize(
+    "backend_class", (LocMemMoveResultsCache, SQLiteMoveResultsCache)
+)
+def test_move_results_cache_backends_can_be_built_from_our_settings(
+    settings, tmp_path: Path, backend_class: type["BaseMoveResultsCache"]
+):
+    base_settings_path = Path(settings.BASE_DIR) / "src" / "project" / "settings"
+    env = {
+        "SECRET_KEY": "test",
+        "CHESS_MOVE_RESULTS_CACHE_BACKEND": (
+            f"{backend_class.__module__}.{backend_class.__name__}"
+        ),
+        "CHESS_MOVE_RESULTS_CACHE_PATH": str(tmp_path / "move_results_cache.sqlite3"),
+        "CHESS_MOVE_RESULTS_CACHE_MAX_SIZE": "12",
+    }
+    with mock.patch.dict(os.environ, env):
+        base_settings = runpy.run_path(str(base_settings_path / "_base.py"))
+
+    settings.CHESS_MOVE_RESULTS_CACHE = base_settings["CHESS_MOVE_RESULTS_CACHE"]
+    get_move_results_cache.cache_clear()
+    try:
+        move_results_cache = get_move_results_cache()
+        assert type(move_results_cache) is backend_class
+        assert move_results_cache.max_size == 12
+    finally:
+        get_move_results_cache.cache_clear()
@@ -0,0 +1,84 @@
+from typing import TYPE_CHECKING
+
+import chess
+import pytest
+
+from ..business_logic import calculate_piece_available_targets
+from ..helpers import chess_lib_square_to_square
+from ..position_analysis import PositionAnalysis, get_position_analysis
+
+if TYPE_CHECKING:
+    from ..types import FEN
+
+_FENS: "tuple[FEN, ...]" = (
+    chess.STARTING_FEN,
+    # Our "minimalist" challenge:
+    "k7/1p3Q2/p6p/8/8/8/7B/K7 w - - 0 2",
+    # The black king is checkmated:
+    "k4Q2/pp6/7p/8/8/8/7B/K7 b - - 1 2",
+    # The white bishop is pinned by the black queen:
+    "4k3/8/8/8/q7/8/2B5/3K4 w - - 0 1",
+    # Stalemate:
+    "k7/2Q5/1K6/8/8/8/8/8 b - - 0 1",
+)
+
+
+@pytest.mark.parametrize("fen", _FENS)
+def test_position_analysis_matches_the_chess_board(fen: "FEN"):
+    analysis = PositionAnalysis.from_fen(fen)
+    chess_board = chess.Board(fen)
+
+    assert analysis.is_check is chess_board.is_check()
+    assert analysis.is_game_over is chess_board.is_game_over()
+    assert analysis.squares_with_pieces_that_can_move == {
+        chess_lib_square_to_square(move.from_square) for move in chess_board.legal_moves
+    }
+
+    opponent_chess_board = chess_board.copy()
+    opponent_chess_board.turn = not opponent_chess_board.turn
+    for square_index, piece in chess_board.piece_map().items():
+        square = chess_lib_square_to_square(square_index)
+        expected_targets = calculate_piece_available_targets(
+            chess_board=(
+                chess_board if piece.color == chess_board.turn else opponent_chess_board
+            ),
+            piece_square=square,
+        )
+        assert analysis.piece_available_targets(square) == expected_targets
+        assert analysis.is_pinned(square) is chess_board.is_pinned(
+            piece.color, square_index
+        )
+
+
+@pytest.mark.parametrize(
+    ("fen", "expected_winner", "expected_naive_score"),
+    (
+        (chess.STARTING_FEN, None, 0),
+        ("k7/1p3Q2/p6p/8/8/8/7B/K7 w - - 0 2", None, 9),
+        ("k4Q2/pp6/7p/8/8/8/7B/K7 b - - 1 2", "w", 9),
+    ),
+)
+def test_position_analysis_outcome_and_score(
+    fen: "FEN", expected_winner: str | None, expected_naive_score: int
+):
+    analysis = PositionAnalysis.from_fen(fen)
+    assert analysis.winner == expected_winner
+    assert analysis.naive_score == expected_naive_score
+
+
+def test_position_analysis_pins():
+    analysis = PositionAnalysis.from_fen("4k3/8/8/8/q7/8/2B5/3K4 w - - 0 1")
+    assert analysis.is_pinned("c2")
+    assert not analysis.is_pinned("a4")
+    # A pinned piece can only move along the pin line:
+    assert analysis.piece_available_targets("c2") == {"b3", "a4"}
+    # Squares without pieces have no targets:
+    assert analysis.piece_available_targets("e4") == frozenset()
+
+
+def test_get_position_analysis_is_shared_between_callers():
+    get_position_analysis.cache_clear()
+    fen = "k7/1p3Q2/p6p/8/8/8/7B/K7 w - - 0 2"
+
+    assert get_position_analysis(fen) is get_position_analysis(fen)
+    assert get_position_analysis.cache_info().misses == 1
@@ -0,0 +1,90 @@
+from concurrent.futures import TimeoutError
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import chess
+import pytest
+
+from ..server_bot import ServerBot, ServerBotStats, compute_bot_move
+from ..types import ChessInvalidStateException
+
+if TYPE_CHECKING:
+    from ..server_bot import ServerBotEngine
+    from ..types import FEN
+
+_ENGINES: "tuple[ServerBotEngine, ...]" = ("andoma", "sunfish")
+
+
+@pytest.mark.parametrize("engine", _ENGINES)
+@pytest.mark.parametrize(
+    ("fen", "expected_move"),
+    (
+        # Mates in one, for both sides:
+        ("k7/8/1K6/8/8/8/8/6Q1 w - - 0 1", "g1g8"),
+        ("6q1/8/8/8/8/1k6/8/K7 b - - 0 1", "g8g1"),
+    ),
+)
+def test_compute_bot_move_finds_mates_in_one(
+    engine: "ServerBotEngine", fen: "FEN", expected_move: str
+):
+    assert (
+        compute_bot_move(
+            engine=engine, fen=fen, depth=2, time_budget=5.0, nodes_budget=100_000
+        )
+        == expected_move
+    )
+
+
+@pytest.mark.parametrize("engine", _ENGINES)
+def test_compute_bot_move_returns_a_legal_move_when_out_of_budget(
+    engine: "ServerBotEngine",
+):
+    move = compute_bot_move(
+        engine=engine,
+        fen=chess.STARTING_FEN,
+        depth=10,
+        time_budget=0.1,
+        nodes_budget=50,
+    )
+    assert chess.Move.from_uci(move) in chess.Board().legal_moves
+
+
+def test_compute_bot_move_fails_on_game_over():
+    with pytest.raises(ChessInvalidStateException):
+        compute_bot_move(
+            engine="andoma",
+            fen="k4Q2/pp6/7p/8/8/8/7B/K7 b - - 1 2",
+            depth=2,
+            time_budget=1.0,
+            nodes_budget=1_000,
+        )
+
+
+def test_server_bot_caches_moves_by_fen_and_depth():
+    server_bot = ServerBot(workers=0, cache_max_size=2)
+    fen = "k7/8/1K6/8/8/8/8/6Q1 w - - 0 1"
+
+    assert server_bot.get_move(fen=fen, depth=1) == ("g1", "g8")
+    assert server_bot.get_move(fen=fen, depth=1) == ("g1", "g8")
+    assert server_bot.stats() == ServerBotStats(hits=1, misses=1, evictions=0, size=1)
+
+    server_bot.get_move(fen=fen, depth=2)
+    server_bot.get_move(fen=chess.STARTING_FEN, depth=1)
+    assert server_bot.stats() == ServerBotStats(hits=1, misses=3, evictions=1, size=2)
+
+
+def test_server_bot_falls_back_to_an_instant_move_when_its_pool_is_saturated():
+    server_bot = ServerBot(workers=1, time_budget=10.0, max_wait=0.5)
+    # (the engines' budget is capped by the time we're ready to wait for them)
+    assert server_bot.time_budget == 0.5
+
+    pool_mock = mock.MagicMock()
+    pool_mock.submit.return_value.result.side_effect = TimeoutError
+    fen = "k7/8/1K6/8/8/8/8/6Q1 w - - 0 1"
+    with mock.patch.object(server_bot, "_get_pool", return_value=pool_mock):
+        from_, to = server_bot.get_move(fen=fen, depth=3)
+
+    pool_mock.submit.return_value.result.assert_called_once_with(timeout=0.5)
+    assert chess.Move.from_uci(f"{from_}{to}") in chess.Board(fen).legal_moves
+    # That weak fallback move is not cached:
+    assert server_bot.stats() == ServerBotStats(hits=0, misses=1, evictions=0, size=0)
@@ -0,0 +1,71 @@
+import tracemalloc
+
+from lib.chess_engines.sunfish import sunfish, tools as sunfish_tools
+
+_MIDDLEGAME_FEN = (
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 1"
+)
+
+
+def _search(searcher, fen: str, max_depth: int) -> None:
+    position = sunfish_tools.parseFEN(fen)
+    for depth, _, _ in searcher.search(position):
+        if depth >= max_depth:
+            break
+
+
+def test_bounded_table_evicts_its_oldest_entries():
+    table = sunfish.BoundedTable(capacity=3)
+    for key in "abc":
+        table[key] = key.upper()
+    # Storing a fresh result for "a" makes "b" the oldest entry:
+    table["a"] = "A2"
+    table["d"] = "D"
+
+    assert len(table) == 3
+    assert table.get("b") is None
+    assert table.get("a") == "A2"
+    assert table.get("d") == "D"
+    assert table.stats() == sunfish.TableStats(
+        size=3, capacity=3, occupancy=1.0, hits=2, probes=3, hit_rate=2 / 3
+    )
+
+
+def test_searcher_tables_are_shareable_between_searches():
+    searcher = sunfish.Searcher(table_size=5_000)
+    _search(searcher, _MIDDLEGAME_FEN, 3)
+    first_search_nodes = searcher.nodes
+    assert 0 < len(searcher.tp_move) <= 5_000
+
+    # The next search of the same position benefits from the moves we already know:
+    next_searcher = sunfish.Searcher(tp_move=searcher.tp_move, table_size=5_000)
+    _search(next_searcher, _MIDDLEGAME_FEN, 3)
+    assert next_searcher.nodes < first_search_nodes
+    assert next_searcher.tp_move.stats().hit_rate > 0
+
+
+def test_searcher_memory_ceiling():
+    capacity = 500
+    searcher = sunfish.Searcher(table_size=capacity)
+    fens = (
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    )
+
+    tracemalloc.start()
+    try:
+        _search(searcher, fens[0], 3)
+        memory_after_first_search, _ = tracemalloc.get_traced_memory()
+        for fen in fens:
+            _search(searcher, fen, 3)
+            assert len(searcher.tp_score) <= capacity
+            assert len(searcher.tp_move) <= capacity
+        memory_after_all_searches, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Our tables are full: searching more positions doesn't use more memory.
+    assert searcher.tp_move.stats().occupancy == 1.0
+    # (~1KB per entry, for both tables, is a generous ceiling)
+    assert memory_after_all_searches - memory_after_first_search < capacity * 2 * 1024
@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import chess
+import chess.engine
+import pytest
+
+from ..business_logic import compute_game_score, compute_games_scores
+from ..consts import MATE_SCORE
+from ..uci_engine_pool import UciEnginePool, _white_score, get_uci_engine_pool
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_FAKE_ENGINE_COMMAND = [
+    sys.executable,
+    str(Path(__file__).parent / "fake_uci_engine.py"),
+]
+
+# Our fake engine's scores are the material balance:
+_FENS = (
+    chess.STARTING_FEN,
+    "4k3/8/8/8/8/8/8/R3K3 w - - 0 1",
+    "4k3/8/8/8/8/8/8/R3K3 b - - 0 1",
+    "r3k3/8/8/8/8/8/8/4K3 w - - 0 1",
+)
+_EXPECTED_SCORES = [0, 500, 500, -500]
+
+
+@pytest.fixture
+def pool() -> "Iterator[UciEnginePool]":
+    pool = UciEnginePool(command=_FAKE_ENGINE_COMMAND, size=2)
+    yield pool
+    pool.close()
+
+
+def test_score(pool: UciEnginePool):
+    assert [pool.score(fen=fen) for fen in _FENS] == _EXPECTED_SCORES
+    assert pool.score(chess_board=chess.Board(_FENS[1])) == 500
+
+
+def test_engines_are_reused(pool: UciEnginePool):
+    for _ in range(5):
+        pool.score(fen=chess.STARTING_FEN)
+
+    stats = pool.stats()
+    assert stats.running == 1
+    assert stats.idle == 1
+    assert stats.restarts == 0
+
+
+def test_dead_engines_are_replaced():
+    pool = UciEnginePool(command=[*_FAKE_ENGINE_COMMAND, "--crash-after=2"], size=1)
+    try:
+        # Our engines die on their 2nd analysis: the pool should transparently
+        # restart them.
+        assert [pool.score(fen=fen) for fen in _FENS] == _EXPECTED_SCORES
+        assert pool.stats().restarts == len(_FENS) - 1
+        assert pool.stats().running == 1
+    finally:
+        pool.close()
+
+
+@pytest.mark.parametrize(
+    ("score", "expected_white_score"),
+    (
+        (chess.engine.PovScore(chess.engine.Cp(35), chess.WHITE), 35),
+        (chess.engine.PovScore(chess.engine.Cp(35), chess.BLACK), -35),
+        (chess.engine.PovScore(chess.engine.Mate(2), chess.WHITE), MATE_SCORE - 2),
+        (chess.engine.PovScore(chess.engine.Mate(2), chess.BLACK), -MATE_SCORE + 2),
+        (chess.engine.PovScore(chess.engine.Mate(-1), chess.WHITE), -MATE_SCORE + 1),
+    ),
+)
+def test_white_score(score: chess.engine.PovScore, expected_white_score: int):
+    # Mates don't have a centipawns value: they get a bounded one
+    assert _white_score({"score": score}) == expected_white_score
+
+
+def test_acquire_timeout():
+    pool = UciEnginePool(command=_FAKE_ENGINE_COMMAND, size=1, acquire_timeout=0.01)
+    try:
+        with pool._engine():
+            with pytest.raises(TimeoutError):
+                pool.score(fen=chess.STARTING_FEN)
+    finally:
+        pool.close()
+
+
+def test_score_many(pool: UciEnginePool):
+    fens = _FENS * 3
+    assert pool.score_many(fens) == _EXPECTED_SCORES * 3
+    # The batch is scored by our pooled engines, which stay alive for later calls:
+    stats = pool.stats()
+    assert stats.running == 2
+    assert stats.idle == 2
+
+    assert pool.score_many(fens, concurrency=10) == _EXPECTED_SCORES * 3
+    assert pool.score(fen=_FENS[1]) == 500
+    assert pool.stats().running == 2
+    assert pool.stats().restarts == 0
+
+
+def test_score_many_replaces_dead_engines():
+    pool = UciEnginePool(command=[*_FAKE_ENGINE_COMMAND, "--crash-after=3"], size=2)
+    try:
+        assert pool.score_many(_FENS * 2) == _EXPECTED_SCORES * 2
+        assert pool.stats().restarts > 0
+    finally:
+        pool.close()
+
+
+def test_compute_game_scores(settings):
+    settings.STOCKFISH_PATH = _FAKE_ENGINE_COMMAND
+    get_uci_engine_pool.cache_clear()
+    try:
+        assert compute_game_score(fen=_FENS[1]) == 500
+        assert compute_games_scores(_FENS) == _EXPECTED_SCORES
+    finally:
+        get_uci_engine_pool().close()
+        get_uci_engine_pool.cache_clear()
@@ -0,0 +1,253 @@
+import atexit
+import contextlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import TYPE_CHECKING, NamedTuple
+
+import chess
+import chess.engine
+from django.conf import settings
+
+from .consts import MATE_SCORE
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from .types import FEN
+
+# Starting a Stockfish process takes longer than the analysis we ask it for: rather
+# than starting a new one for each position we want to score, we keep a bounded pool
+# of long-lived UCI engine processes.
+# The engines that die are replaced, and the ones that stayed idle for a while are
+# pinged before being used again.
+
+_logger = logging.getLogger(__name__)
+
+
+class UciEnginePoolStats(NamedTuple):
+    size: int
+    running: int
+    idle: int
+    restarts: int
+
+
+class _PooledEngine:
+    __slots__ = ("engine", "last_used_at", "is_dead")
+
+    def __init__(self, engine: chess.engine.SimpleEngine):
+        self.engine = engine
+        self.last_used_at = time.monotonic()
+        self.is_dead = False
+
+
+class UciEnginePool:
+    def __init__(
+        self,
+        *,
+        command: str | list[str],
+        size: int = 2,
+        time_limit: float = 0.1,
+        acquire_timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+    ):
+        """
+        `command` is the engine's executable path - or its command line, as a list.
+        `time_limit`, `acquire_timeout` and `health_check_interval` are expressed
+        in seconds.
+        """
+        self.command = command
+        self.size = size
+        self.time_limit = time_limit
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+
+        self._condition = threading.Condition()
+        self._idle_engines: list[_PooledEngine] = []
+        self._running_count = 0
+        self._restarts = 0
+        self._closed = False
+
+    def score(
+        self,
+        *,
+        chess_board: chess.Board | None = None,
+        fen: "FEN | None" = None,
+        time_limit: float | None = None,
+    ) -> int:
+        """
+        Returns the advantage of the white player, in centipawns - mates get a
+        bounded score, see `MATE_SCORE`.
+        """
+        if chess_board is None:
+            chess_board = chess.Board(fen)
+        return _white_score(self.analyse(chess_board, time_limit=time_limit))
+
+    def analyse(
+        self, chess_board: chess.Board, *, time_limit: float | None = None
+    ) -> chess.engine.InfoDict:
+        """
+        If the engine dies during the analysis, we retry once with a new one.
+        Raises a `TimeoutError` if no engine becomes available in time.
+        """
+        limit = chess.engine.Limit(time=time_limit or self.time_limit)
+        for attempt in range(2):
+            with self._engine() as pooled_engine:
+                try:
+                    return pooled_engine.engine.analyse(chess_board, limit)
+                except (chess.engine.EngineTerminatedError, TimeoutError) as exc:
+                    pooled_engine.is_dead = True
+                    if attempt == 1:
+                        raise
+                    _logger.warning(
+                        "UCI engine died while analysing FEN '%s' (%r): retrying "
+                        "with a new one",
+                        chess_board.fen(),
+                        exc,
+                    )
+        raise AssertionError("unreachable")  # (for mypy)
+
+    def score_many(
+        self,
+        fens: "Sequence[FEN]",
+        *,
+        time_limit: float | None = None,
+        concurrency: int | None = None,
+    ) -> list[int]:
+        """
+        Scores many positions concurrently, with up to `concurrency` of our pooled
+        engine processes - the pool's size being the limit, shared with `score()`.
+        Returns the advantages of the white player, in the same order as `fens`.
+        """
+        concurrency = min(concurrency or self.size, self.size, len(fens))
+        if concurrency <= 1:
+            return [self.score(fen=fen, time_limit=time_limit) for fen in fens]
+        # (python-chess' SimpleEngine runs its engine's I/O in a background thread,
+        # so our threads mostly wait for the engines to answer)
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="uci-engine-pool"
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda fen: self.score(fen=fen, time_limit=time_limit), fens
+                )
+            )
+
+    def stats(self) -> UciEnginePoolStats:
+        with self._condition:
+            return UciEnginePoolStats(
+                size=self.size,
+                running=self._running_count,
+                idle=len(self._idle_engines),
+                restarts=self._restarts,
+            )
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle_engines, self._idle_engines = self._idle_engines, []
+            self._running_count -= len(idle_engines)
+            self._condition.notify_all()
+        for pooled_engine in idle_engines:
+            _quit_engine(pooled_engine.engine)
+
+    @contextlib.contextmanager
+    def _engine(self) -> "Iterator[_PooledEngine]":
+        pooled_engine = self._acquire()
+        try:
+            yield pooled_engine
+        finally:
+            self._release(pooled_engine)
+
+    def _acquire(self) -> _PooledEngine:
+        deadline = time.monotonic() + self.acquire_timeout
+        pooled_engine: _PooledEngine | None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("This UCI engine pool is closed")
+                if self._idle_engines:
+                    pooled_engine = self._idle_engines.pop()
+                    break
+                if self._running_count < self.size:
+                    self._running_count += 1
+                    pooled_engine = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise TimeoutError(
+                        f"No UCI engine became available in {self.acquire_timeout}s"
+                    )
+
+        if pooled_engine is None:
+            return self._start_engine()
+        if time.monotonic() - pooled_engine.last_used_at > self.health_check_interval:
+            pooled_engine = self._health_checked(pooled_engine)
+        return pooled_engine
+
+    def _release(self, pooled_engine: _PooledEngine) -> None:
+        if pooled_engine.is_dead:
+            _quit_engine(pooled_engine.engine)
+            with self._condition:
+                self._running_count -= 1
+                self._restarts += 1
+                self._condition.notify()
+            return
+
+        pooled_engine.last_used_at = time.monotonic()
+        with self._condition:
+            if self._closed:
+                self._running_count -= 1
+            else:
+                self._idle_engines.append(pooled_engine)
+                self._condition.notify()
+                return
+        _quit_engine(pooled_engine.engine)
+
+    def _start_engine(self) -> _PooledEngine:
+        try:
+            return _PooledEngine(chess.engine.SimpleEngine.popen_uci(self.command))
+        except BaseException:
+            with self._condition:
+                self._running_count -= 1
+                self._condition.notify()
+            raise
+
+    def _health_checked(self, pooled_engine: _PooledEngine) -> _PooledEngine:
+        try:
+            pooled_engine.engine.ping()
+            return pooled_engine
+        except (chess.engine.EngineError, chess.engine.EngineTerminatedError):
+            _logger.warning("Idle UCI engine failed its health check: restarting it")
+        _quit_engine(pooled_engine.engine)
+        with self._condition:
+            self._restarts += 1
+        # (its slot in the pool is still reserved for us)
+        return self._start_engine()
+
+
+@cache
+def get_uci_engine_pool() -> UciEnginePool:
+    pool = UciEnginePool(
+        command=settings.STOCKFISH_PATH,
+        size=settings.STOCKFISH_POOL["SIZE"],
+        time_limit=settings.STOCKFISH_TIME_LIMIT,
+        acquire_timeout=settings.STOCKFISH_POOL["ACQUIRE_TIMEOUT"],
+        health_check_interval=settings.STOCKFISH_POOL["HEALTH_CHECK_INTERVAL"],
+    )
+    atexit.register(pool.close)
+    return pool
+
+
+def _white_score(info: chess.engine.InfoDict) -> int:
+    score = info.get("score")
+    return score.white().score(mate_score=MATE_SCORE) if score else 0
+
+
+def _quit_engine(engine: chess.engine.SimpleEngine) -> None:
+    try:
+        engine.quit()
+    except (chess.engine.EngineError, chess.engine.EngineTerminatedError, TimeoutError):
+        engine.close()
@@ -5,7 +5,8 @@ from typing import TYPE_CHECKING, Any, Callable, Literal, TypeAlias, TypedDict,
 
 import chess
 from django import forms
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
 from django.core.exceptions import ValidationError
 from django.http import HttpResponse
 from django.shortcuts import redirect
@@ -18,10 +19,15 @@ from django.views.decorators.clickjacking import xframe_options_exempt
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
+from ..chess.board_roles import BoardRoles
 from ..chess.business_logic import calculate_fen_before_move
-from .business_logic import set_daily_challenge_teams_and_pieces_roles
+from ..chess.consts import MATE_SCORE
+from .business_logic import (
+    set_daily_challenge_teams_and_pieces_roles,
+    solve_daily_challenges,
+)
 from .cookie_helpers import clear_daily_challenge_game_state_in_session
-from .models import DailyChallenge, DailyChallengeStats
+from .models import DailyChallenge, DailyChallengeStats, DailyChallengeStatus
 from .presenters import DailyChallengeGamePresenter
 from .view_helpers import GameContext
 
@@ -53,6 +59,11 @@ _FUTURE_DAILY_CHALLENGE_COOKIE_DURATION = timedelta(minutes=20)
 
 _INVALID_FEN_FALLBACK: "FEN" = "3k4/p7/8/8/8/8/7P/3K4 w - - 0 1"
 
+# Our "solve with server-side engines" action solves the challenges in the request
+# thread: the whole selection has to be solved well within Gunicorn's timeout, with
+# at least that much time per challenge (seconds).
+_SOLVE_ACTION_MIN_TIME_BUDGET = 1.0
+
 
 class DailyChallengeAdminForm(forms.ModelForm):
     class Meta:
@@ -139,6 +150,7 @@ class DailyChallengeAdmin(ImportExportModelAdmin):
     ordering = ("-lookup_key",)
     list_display_links = ("lookup_key", "source")
     list_filter = ["status", SourceTypeListFilter]
+    actions = ["solve_with_server_engines"]
 
     readonly_fields = (
         "game_update",
@@ -155,6 +167,59 @@ class DailyChallengeAdmin(ImportExportModelAdmin):
     def status_display(self, obj: DailyChallenge) -> str:
         return obj.get_status_display()
 
+    @admin.action(description="Solve selected challenges with our server-side engines")
+    def solve_with_server_engines(
+        self, request: "HttpRequest", queryset: "QuerySet[DailyChallenge]"
+    ) -> None:
+        # The solutions of published challenges are part of their move graph, and of
+        # the current challenge's caches: they can't be solved from here.
+        challenges = list(queryset.filter(status=DailyChallengeStatus.PENDING))
+        if skipped_count := queryset.count() - len(challenges):
+            self.message_user(
+                request,
+                f"{skipped_count} challenge(s) skipped: only pending challenges can "
+                "be solved.",
+                messages.WARNING,
+            )
+        if not challenges:
+            return
+
+        # Solved in the request thread, so let's keep the selections small...
+        # The `dailychallenge_solve` command is there for the bigger batches.
+        total_time_budget = settings.GUNICORN_TIMEOUT / 2
+        time_budget = total_time_budget / len(challenges)
+        if time_budget < _SOLVE_ACTION_MIN_TIME_BUDGET:
+            max_count = int(total_time_budget // _SOLVE_ACTION_MIN_TIME_BUDGET)
+            self.message_user(
+                request,
+                f"Too many challenges selected: please select {max_count} pending "
+                "challenges at most, or use the `dailychallenge_solve` command.",
+                messages.ERROR,
+            )
+            return
+
+        solutions = solve_daily_challenges(
+            challenges,
+            engine=settings.CHESS_SERVER_BOT["ENGINE"],
+            workers=0,
+            time_budget=time_budget,
+            move_time_budget=min(2.0, time_budget),
+        )
+        for solution in solutions:
+            if solution.is_solved:
+                self.message_user(
+                    request,
+                    f"Challenge {solution.challenge_id} solved in "
+                    f"{solution.turns_count} turns: {solution.solution}",
+                    messages.SUCCESS,
+                )
+            else:
+                self.message_user(
+                    request,
+                    f"Challenge {solution.challenge_id} not solved: {solution.outcome}",
+                    messages.WARNING,
+                )
+
     def get_import_resource_classes(self):
         return [DailyChallengeImportResource]
 
@@ -274,9 +339,10 @@ class DailyChallengeAdmin(ImportExportModelAdmin):
                             computeScore("{game_presenter.fen}", "chess-bot-data-{board_id}")
                                 .then(([type, score]) => {{
                                     document.getElementById("chess-engine-score").innerText = `${{type}}: ${{score}}`;
-                                    if (type === "cp") {{
-                                        djangoFormDoc.getElementById("id_starting_advantage").value = score;
-                                    }}
+                                    // Mates get a bounded score, like the ones of our Python game scores:
+                                    djangoFormDoc.getElementById("id_starting_advantage").value = type === "cp"
+                                        ? score
+                                        : (score > 0 ? {MATE_SCORE} - score : -{MATE_SCORE} - score);
                                 }})
                                 .catch((err) => console.error("Error while computing the score:", err));
                         }}, 100)
@@ -428,7 +494,7 @@ def _get_game_presenter(
         turns_counter=0,
         current_attempt_turns_counter=0,
         fen=fen,
-        piece_role_by_square=piece_role_by_square,
+        piece_role_by_square=BoardRoles.from_piece_role_by_square(piece_role_by_square),
         moves=bot_first_move or "",
     )
 
@@ -483,6 +549,7 @@ def _mirror_board(*, fen: "FEN") -> str:
 
 def _solve_problem(*, fen: "FEN") -> str:
     # This is a no-op on the server, as we solve problems on the frontend side
+    # (the "Solve selected challenges" action uses our server-side solver)
     chess_board = chess.Board(fen)
     return cast("FEN", chess_board.fen())
 
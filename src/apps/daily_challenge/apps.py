@@ -0,0 +1,24 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+class DailyChallengeAppConfig(AppConfig):
+    name = "apps.daily_challenge"
+
+    def ready(self) -> None:
+        from .models import DailyChallenge
+
+        # Our workers keep the current challenge in memory:
+        # it has to be refreshed (in all of them) when an admin edits challenges.
+        for signal in (post_save, post_delete):
+            signal.connect(
+                _clear_current_daily_challenge_cache,
+                sender=DailyChallenge,
+                dispatch_uid="clear_current_daily_challenge_cache",
+            )
+
+
+def _clear_current_daily_challenge_cache(**kwargs) -> None:
+    from .business_logic import clear_current_daily_challenge_cache
+
+    clear_current_daily_challenge_cache()
@@ -0,0 +1,3 @@
+# Our benchmark harnesses drive the app through Django's test client and `mock`:
+# they're only imported by their management commands (and their tests), never by the
+# app's code.
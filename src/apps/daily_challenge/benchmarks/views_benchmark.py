@@ -0,0 +1,461 @@
+import contextlib
+import datetime as dt
+import functools
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import TYPE_CHECKING, Literal, NamedTuple
+from unittest import mock
+
+import msgspec
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from apps.chess.server_bot import get_server_bot
+from lib.django_helpers import get_git_revision
+
+from .. import views
+from ..models import DailyChallenge, DailyChallengeStatus
+from ..stats_counters_buffer import get_stats_counters_buffer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    from django.http import HttpResponse
+
+# An in-process benchmark of our views: recorded game scripts are replayed through
+# Django's test client, against a benchmark-only challenge created in a database
+# transaction that is rolled back at the end.
+# Unlike "scripts/load_testing/", it doesn't need a running server - and its JSON
+# reports can be compared between commits.
+
+
+class BenchmarkStep(NamedTuple):
+    view: "Callable[..., HttpResponse]"
+    method: Literal["get", "post"] = "get"
+    url_kwargs: dict[str, str] | None = None
+    data: dict[str, str] | None = None
+
+    @property
+    def view_name(self) -> str:
+        return self.view.__name__
+
+
+class GameScript(NamedTuple):
+    name: str
+    steps: tuple[BenchmarkStep, ...]
+    as_staff_user: bool = False
+    # Played with our server-side bot enabled - which refuses the bot moves chosen
+    # by the players' browsers, apart from the challenge's forced first one:
+    server_bot: bool = False
+
+
+class ViewBenchmarkStats(msgspec.Struct, kw_only=True):
+    requests_count: int
+    p50_ms: float
+    p95_ms: float
+    # Peak of the memory allocated while handling a request (median):
+    allocated_kib: float
+    # Maximum number of database queries made by a request:
+    db_queries_count: int
+    # Size of the "Cookie" request header, and of the "Set-Cookie" response ones
+    # (median, in bytes):
+    request_cookie_bytes: int = 0
+    response_cookie_bytes: int = 0
+
+
+class ViewsBenchmarkReport(msgspec.Struct, kw_only=True):
+    created_at: dt.datetime
+    git_revision: str | None
+    python_version: str
+    debug: bool
+    session_engine: str = ""
+    iterations: int
+    views: dict[str, ViewBenchmarkStats]
+
+    def to_json(self) -> bytes:
+        return msgspec.json.format(msgspec.json.encode(self))
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "ViewsBenchmarkReport":
+        return msgspec.json.decode(data, type=cls)
+
+
+def _select(square: str) -> BenchmarkStep:
+    return BenchmarkStep(views.htmx_game_select_piece, url_kwargs={"location": square})
+
+
+def _move(uci_move: str) -> BenchmarkStep:
+    return BenchmarkStep(
+        views.htmx_game_move_piece,
+        method="post",
+        url_kwargs={"from_": uci_move[:2], "to": uci_move[2:]},
+    )
+
+
+def _bot_move(uci_move: str) -> BenchmarkStep:
+    return BenchmarkStep(
+        views.htmx_game_bot_move,
+        method="post",
+        url_kwargs={"from_": uci_move[:2], "to": uci_move[2:]},
+    )
+
+
+def _post(view: "Callable[..., HttpResponse]") -> BenchmarkStep:
+    return BenchmarkStep(view, method="post")
+
+
+_URLS_NAMESPACE = "daily_challenge"
+
+# The benchmark challenge: we play the white side, and can win in 5 turns.
+_BENCHMARK_CHALLENGE_SOLUTION = "f7f8,a8a7,f8d6,a6a5,h2g1,b7b6,d6b6,a7a8,b6a7"
+_START = (BenchmarkStep(views.game_view), _bot_move("a7a6"))
+
+GAME_SCRIPTS: tuple[GameScript, ...] = (
+    GameScript(
+        "select_and_move",
+        (
+            *_START,
+            _select("f7"),
+            _select("b7"),  # one of the bot's pieces
+            BenchmarkStep(views.htmx_game_no_selection),
+            _select("f7"),
+            _move("f7f8"),
+            _bot_move("a8a7"),
+            BenchmarkStep(views.game_view),  # returning player
+        ),
+    ),
+    GameScript(
+        "undo",
+        (
+            *_START,
+            _move("f7f8"),
+            _bot_move("a8a7"),
+            _post(views.htmx_undo_last_move_ask_confirmation),
+            _post(views.htmx_undo_last_move_do),
+        ),
+    ),
+    GameScript(
+        "restart",
+        (
+            *_START,
+            _move("f7f8"),
+            _bot_move("a8a7"),
+            _post(views.htmx_restart_daily_challenge_ask_confirmation),
+            _post(views.htmx_restart_daily_challenge_do),
+            _bot_move("a7a6"),
+        ),
+    ),
+    GameScript(
+        "see_solution",
+        (
+            *_START,
+            _post(views.htmx_see_daily_challenge_solution_ask_confirmation),
+            _post(views.htmx_see_daily_challenge_solution_do),
+            *(
+                _post(views.htmx_see_daily_challenge_solution_play)
+                for _ in _BENCHMARK_CHALLENGE_SOLUTION.split(",")
+            ),
+        ),
+    ),
+    GameScript(
+        "win",
+        (
+            *_START,
+            *(
+                (_move if i % 2 == 0 else _bot_move)(move)
+                for i, move in enumerate(_BENCHMARK_CHALLENGE_SOLUTION.split(","))
+            ),
+            BenchmarkStep(views.htmx_daily_challenge_stats_modal),
+        ),
+    ),
+    GameScript(
+        "server_bot",
+        (
+            *_START,
+            _move("f7f8"),
+            _post(views.htmx_game_server_bot_move),
+        ),
+        server_bot=True,
+    ),
+    GameScript(
+        "modals",
+        (
+            *_START,
+            BenchmarkStep(views.htmx_daily_challenge_help_modal),
+            BenchmarkStep(views.htmx_daily_challenge_stats_modal),
+            BenchmarkStep(views.htmx_daily_challenge_user_prefs_modal),
+            BenchmarkStep(
+                views.htmx_daily_challenge_user_prefs_save,
+                method="post",
+                data={"game_speed": "2", "board_texture": "1"},
+            ),
+        ),
+    ),
+    GameScript(
+        "staff_debug",
+        (
+            *_START,
+            BenchmarkStep(views.debug_view_cookie),
+            BenchmarkStep(views.debug_reset_stats),
+            BenchmarkStep(views.debug_reset_today),
+        ),
+        as_staff_user=True,
+    ),
+)
+
+
+def run_views_benchmark(
+    *,
+    iterations: int = 20,
+    scripts: "Sequence[GameScript]" = GAME_SCRIPTS,
+    session_engine: str | None = None,
+) -> ViewsBenchmarkReport:
+    """
+    Plays each script `iterations` times to measure the views latencies (after a
+    warm-up round), then once more to measure their allocations, database queries
+    and cookies sizes.
+    The players' sessions use the `session_engine` Django session engine - defaults
+    to the `SESSION_ENGINE` setting.
+    ⚠️ It writes to the database - in a transaction that is rolled back at the end -
+    so it's meant to be used in development or CI, not in production.
+    """
+    durations_ms: defaultdict[str, list[float]] = defaultdict(list)
+    allocated_kib: defaultdict[str, list[float]] = defaultdict(list)
+    db_queries_counts: defaultdict[str, list[int]] = defaultdict(list)
+    request_cookie_bytes: defaultdict[str, list[int]] = defaultdict(list)
+    response_cookie_bytes: defaultdict[str, list[int]] = defaultdict(list)
+    session_engine = session_engine or settings.SESSION_ENGINE
+
+    with _benchmark_environment(session_engine=session_engine) as staff_user:
+        # Warm-up round: fills our per-process caches, like a worker that has been
+        # serving players for a while.
+        for script in scripts:
+            for _, play_step in _play_script(script, staff_user=staff_user):
+                play_step()
+
+        for _ in range(iterations):
+            for script in scripts:
+                for step, play_step in _play_script(script, staff_user=staff_user):
+                    start = time.perf_counter_ns()
+                    play_step()
+                    duration_ns = time.perf_counter_ns() - start
+                    durations_ms[step.view_name].append(duration_ns / 1_000_000)
+
+        # Profiling round: measuring allocations and queries slows everything down,
+        # so we don't do it while measuring latencies.
+        tracemalloc.start()
+        try:
+            for script in scripts:
+                for step, play_step in _play_script(script, staff_user=staff_user):
+                    tracemalloc.reset_peak()
+                    allocated_before, _ = tracemalloc.get_traced_memory()
+                    with CaptureQueriesContext(connection) as queries:
+                        response = play_step()
+                    _, allocated_peak = tracemalloc.get_traced_memory()
+                    allocated_kib[step.view_name].append(
+                        (allocated_peak - allocated_before) / 1024
+                    )
+                    db_queries_counts[step.view_name].append(len(queries))
+                    request_cookie_bytes[step.view_name].append(
+                        len(response.wsgi_request.META.get("HTTP_COOKIE", ""))
+                    )
+                    response_cookie_bytes[step.view_name].append(
+                        sum(
+                            len(f"Set-Cookie: {morsel.OutputString()}")
+                            for morsel in response.cookies.values()
+                        )
+                    )
+        finally:
+            tracemalloc.stop()
+
+    return ViewsBenchmarkReport(
+        created_at=dt.datetime.now(dt.UTC),
+        git_revision=get_git_revision(),
+        python_version=platform.python_version(),
+        debug=settings.DEBUG,
+        session_engine=session_engine,
+        iterations=iterations,
+        views={
+            view_name: ViewBenchmarkStats(
+                requests_count=len(durations_ms[view_name]),
+                p50_ms=round(statistics.median(durations_ms[view_name]), 3),
+                p95_ms=round(_percentile(durations_ms[view_name], 95), 3),
+                allocated_kib=round(statistics.median(allocated_kib[view_name]), 1),
+                db_queries_count=max(db_queries_counts[view_name]),
+                request_cookie_bytes=round(
+                    statistics.median(request_cookie_bytes[view_name])
+                ),
+                response_cookie_bytes=round(
+                    statistics.median(response_cookie_bytes[view_name])
+                ),
+            )
+            for view_name in sorted(allocated_kib)
+        },
+    )
+
+
+def compare_views_benchmark_reports(
+    previous: ViewsBenchmarkReport, current: ViewsBenchmarkReport
+) -> dict[str, float]:
+    """Returns the relative p50 latency change of each view present in both reports."""
+    return {
+        view_name: round(
+            (stats.p50_ms - previous.views[view_name].p50_ms)
+            / previous.views[view_name].p50_ms,
+            3,
+        )
+        for view_name, stats in current.views.items()
+        if view_name in previous.views and previous.views[view_name].p50_ms
+    }
+
+
+@contextlib.contextmanager
+def _benchmark_environment(*, session_engine: str) -> "Iterator[object]":
+    from .. import business_logic
+
+    with (
+        transaction.atomic(),
+        # (sessions stored in a SQLite file must not outlive the benchmark either)
+        tempfile.TemporaryDirectory() as sessions_dir,
+    ):
+        challenge = _create_benchmark_challenge()
+        staff_user = get_user_model().objects.create(
+            username="views-benchmark-staff-user", is_staff=True
+        )
+        with (
+            override_settings(
+                ALLOWED_HOSTS=["testserver"],
+                SESSION_ENGINE=session_engine,
+                SESSION_SQLITE_PATH=f"{sessions_dir}/sessions.sqlite3",
+                # The stats counters must not be flushed after the rollback:
+                DAILY_CHALLENGE_STATS_COUNTERS_BUFFER={"ENABLED": False},
+                CHESS_SERVER_BOT={**settings.CHESS_SERVER_BOT, "ENABLED": False},
+            ),
+            mock.patch.object(
+                business_logic, "get_current_daily_challenge", return_value=challenge
+            ),
+        ):
+            get_stats_counters_buffer.cache_clear()
+            get_server_bot.cache_clear()
+            try:
+                yield staff_user
+            finally:
+                get_stats_counters_buffer.cache_clear()
+                get_server_bot.cache_clear()
+        transaction.set_rollback(True)
+
+
+def _play_script(
+    script: GameScript, *, staff_user: object
+) -> "Iterator[tuple[BenchmarkStep, Callable[[], HttpResponse]]]":
+    # Each script is played by a new player:
+    client = Client()
+    if script.as_staff_user:
+        client.force_login(staff_user)
+
+    with contextlib.ExitStack() as stack:
+        if script.server_bot:
+            stack.enter_context(_server_bot_enabled())
+        yield from _play_steps(script, client=client)
+
+
+def _play_steps(
+    script: GameScript, *, client: Client
+) -> "Iterator[tuple[BenchmarkStep, Callable[[], HttpResponse]]]":
+    for step in script.steps:
+
+        def play_step(step: BenchmarkStep = step) -> "HttpResponse":
+            url = reverse(_url_name(step.view), kwargs=step.url_kwargs)
+            request_function = client.post if step.method == "post" else client.get
+            response = request_function(url, step.data)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f"Script '{script.name}': '{url}' returned a {response.status_code}"
+                )
+            return response
+
+        yield step, play_step
+
+
+@contextlib.contextmanager
+def _server_bot_enabled() -> "Iterator[None]":
+    # (we measure the server-side bot moves in the request thread - and as the bot
+    # is re-created for each play of the script, its moves are actually computed)
+    with override_settings(
+        CHESS_SERVER_BOT={**settings.CHESS_SERVER_BOT, "ENABLED": True, "WORKERS": 0}
+    ):
+        get_server_bot.cache_clear()
+        try:
+            yield
+        finally:
+            get_server_bot.cache_clear()
+
+
+@functools.cache
+def _url_name(view: "Callable[..., HttpResponse]") -> str:
+    _, app_resolver = get_resolver().namespace_dict[_URLS_NAMESPACE]
+    for url_pattern in app_resolver.url_patterns:
+        if url_pattern.callback is view:
+            return f"{_URLS_NAMESPACE}:{url_pattern.name}"
+    raise ValueError(f"View '{view.__name__}' is not routed")
+
+
+def _create_benchmark_challenge() -> DailyChallenge:
+    return DailyChallenge.objects.create(
+        lookup_key="views-benchmark",
+        source="views-benchmark",
+        status=DailyChallengeStatus.PUBLISHED,
+        fen="k7/1p3Q2/p6p/8/8/8/7B/K7 w - - 0 2",
+        piece_role_by_square={
+            "a8": "k",
+            "f7": "Q",
+            "b7": "p1",
+            "a6": "p2",
+            "h6": "p3",
+            "h2": "B1",
+            "a1": "K",
+        },
+        fen_before_bot_first_move="k7/pp3Q2/7p/8/8/8/7B/K7 b - - 0 1",
+        piece_role_by_square_before_bot_first_move={
+            "a8": "k",
+            "f7": "Q",
+            "b7": "p1",
+            "a7": "p2",
+            "h6": "p3",
+            "h2": "B1",
+            "a1": "K",
+        },
+        bot_first_move="a7a6",
+        intro_turn_speech_square="h2",
+        intro_turn_speech_text="",
+        starting_advantage=9_000,
+        solution=_BENCHMARK_CHALLENGE_SOLUTION,
+        solution_turns_count=5,
+        teams={
+            "w": [
+                {"role": "Q", "name": ["QUEEN", "1"], "faction": "humans"},
+                {"role": "B1", "name": ["BISHOP", "1"], "faction": "humans"},
+                {"role": "K", "name": ["KING", "1"], "faction": "humans"},
+            ],
+            "b": [
+                {"role": "k", "name": "", "faction": "undeads"},
+                {"role": "p1", "name": "", "faction": "undeads"},
+                {"role": "p2", "name": "", "faction": "undeads"},
+                {"role": "p3", "name": "", "faction": "undeads"},
+            ],
+        },
+    )
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
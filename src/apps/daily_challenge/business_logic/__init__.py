@@ -1,6 +1,12 @@
 # ruff: noqa: F401
+from ._build_challenge_move_graph import build_challenge_move_graph
 from ._compute_fields_before_bot_first_move import compute_fields_before_bot_first_move
-from ._get_current_daily_challenge import get_current_daily_challenge
+from ._get_challenge_move_graph import get_challenge_move_graph
+from ._get_current_daily_challenge import (
+    clear_current_daily_challenge_cache,
+    get_current_daily_challenge,
+    warm_up_current_daily_challenge_cache,
+)
 from ._get_speech_bubble import get_speech_bubble
 from ._has_player_won_today import has_player_won_today
 from ._has_player_won_yesterday import has_player_won_yesterday
@@ -18,3 +24,4 @@ from ._see_daily_challenge_solution import see_daily_challenge_solution
 from ._set_daily_challenge_teams_and_pieces_roles import (
     set_daily_challenge_teams_and_pieces_roles,
 )
+from ._solve_daily_challenges import solve_daily_challenges
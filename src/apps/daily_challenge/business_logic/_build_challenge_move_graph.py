@@ -0,0 +1,43 @@
+from typing import TYPE_CHECKING
+
+from apps.chess.helpers import uci_move_squares
+from apps.chess.move_graph import ChessMoveGraph
+from apps.chess.types import ChessInvalidMoveException
+
+if TYPE_CHECKING:
+    from apps.chess.types import FEN
+
+    from ..models import DailyChallenge
+
+# All the player's moves from the starting position, and all the bot's replies
+# to these moves, are pre-computed:
+_MOVE_GRAPH_DEPTH = 2
+
+
+def build_challenge_move_graph(challenge: "DailyChallenge") -> ChessMoveGraph:
+    """
+    Pre-computes the moves graph that players will explore from the challenge's
+    starting position. Positions we don't pre-compute here will be added lazily
+    to the graph when players reach them.
+    """
+    graph = ChessMoveGraph.build(fens=(challenge.fen,), depth=_MOVE_GRAPH_DEPTH)
+
+    # We also want the bot's first move...
+    if challenge.fen_before_bot_first_move:
+        graph.add_position(challenge.fen_before_bot_first_move)
+
+    # ...and the positions of the solution, which are played by the "see solution"
+    # mode (and by the best players, of course 🙂):
+    fen: "FEN" = challenge.fen
+    for move_uci in filter(None, challenge.solution.split(",")):
+        from_, to = uci_move_squares(move_uci)
+        try:
+            move_result = graph.move(fen=fen, from_=from_, to=to)
+        except ChessInvalidMoveException:
+            break  # the solution is validated elsewhere
+        if move_result["game_over"]:
+            break
+        fen = move_result["fen"]
+        graph.add_position(fen)
+
+    return graph
@@ -0,0 +1,38 @@
+from typing import TYPE_CHECKING
+
+from apps.chess.move_graph import ChessMoveGraph
+
+if TYPE_CHECKING:
+    import datetime as dt
+
+    from ..models import DailyChallenge
+
+_MAX_CACHED_GRAPHS = 4
+
+# Decoding a graph has a cost, so each worker keeps the graphs of the latest
+# challenges in memory - where they also get extended lazily as players explore them.
+# A pre-computed graph takes ~0.5MB in memory, and its lazily computed moves are capped
+# to ~1MB by `ChessMoveGraph.max_lazy_moves`: that's less than 6MB per worker.
+_graphs_by_challenge: "dict[tuple[int, dt.datetime], ChessMoveGraph]" = {}
+
+
+def get_challenge_move_graph(challenge: "DailyChallenge") -> ChessMoveGraph:
+    if challenge.pk is None:
+        # Unsaved challenge (i.e. admin preview): nothing to cache there.
+        return ChessMoveGraph()
+
+    cache_key = (challenge.pk, challenge.updated_at)
+    if (graph := _graphs_by_challenge.get(cache_key)) is not None:
+        return graph
+
+    graph = (
+        ChessMoveGraph.from_bytes(challenge.move_graph)
+        if challenge.move_graph
+        # Challenge published before we had move graphs: we'll build it lazily.
+        else ChessMoveGraph()
+    )
+    if len(_graphs_by_challenge) >= _MAX_CACHED_GRAPHS:
+        _graphs_by_challenge.clear()
+    _graphs_by_challenge[cache_key] = graph
+
+    return graph
@@ -1,6 +1,12 @@
+import datetime as dt
 import logging
-from typing import TYPE_CHECKING
+import os
+import tempfile
+import threading
+import uuid
+from typing import TYPE_CHECKING, NamedTuple
 
+from django.conf import settings
 from django.utils import timezone
 
 from ..models import DailyChallengeStatus
@@ -11,24 +17,117 @@ if TYPE_CHECKING:
 _logger = logging.getLogger("apps.daily_challenge")
 
 
+class _CachedCurrentDailyChallenge(NamedTuple):
+    challenge: "DailyChallenge"
+    expires_at: dt.datetime
+    version_stamp: tuple[int, int]
+
+
+# The current challenge only changes once a day (or when an admin edits it), so each
+# worker resolves it once per UTC day and keeps it in memory.
+# When challenges are edited, our `DailyChallenge` post_save/post_delete signals clear
+# this cache, and replace a "version stamp" file that all the processes of the machine
+# check (with a cheap `stat()`) before using their own copy.
+# (our SQLite database is local, so whatever edits the challenges runs on this machine)
+_current_challenge_cache: _CachedCurrentDailyChallenge | None = None
+_current_challenge_cache_lock = threading.Lock()
+
+
 def get_current_daily_challenge() -> "DailyChallenge":
+    global _current_challenge_cache
+
+    now = timezone.now()
+    version_stamp = _get_version_stamp()
+    if (
+        (cached := _current_challenge_cache) is not None
+        and now < cached.expires_at
+        and version_stamp == cached.version_stamp
+    ):
+        return cached.challenge
+
+    with _current_challenge_cache_lock:
+        today = now.astimezone(dt.UTC).date()
+        challenge = _fetch_daily_challenge_for_day(today)
+        _current_challenge_cache = _CachedCurrentDailyChallenge(
+            challenge=challenge,
+            # i.e. next midnight, UTC:
+            expires_at=dt.datetime.combine(
+                today + dt.timedelta(days=1), dt.time.min, tzinfo=dt.UTC
+            ),
+            # (read before the queries: if the challenges are edited while we're
+            # fetching this one, we'll fetch it again on the next call)
+            version_stamp=version_stamp,
+        )
+
+    return challenge
+
+
+def clear_current_daily_challenge_cache() -> None:
+    """
+    Clears the current challenge cache of this process, and bumps the version stamp
+    so that the other processes clear theirs too.
+    """
+    global _current_challenge_cache
+
+    with _current_challenge_cache_lock:
+        _current_challenge_cache = None
+
+    path = _get_version_stamp_path()
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w") as tmp_file:
+            tmp_file.write(str(timezone.now()))
+        # (an atomic replacement: the file gets a new inode)
+        os.replace(tmp_path, path)
+    except OSError:
+        _logger.exception(
+            "Could not bump the current daily challenge version stamp (%s).", path
+        )
+
+
+def warm_up_current_daily_challenge_cache() -> None:
+    """
+    Meant to be called when a worker boots, so that its first request doesn't have
+    to pay for the database queries.
+    """
+    try:
+        get_current_daily_challenge()
+    except Exception:
+        # Not a big deal: the 1st request will try again
+        _logger.exception("Could not warm up the current daily challenge cache.")
+
+
+def _get_version_stamp() -> tuple[int, int]:
+    try:
+        stat = os.stat(_get_version_stamp_path())
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_ino, stat.st_mtime_ns)
+
+
+def _get_version_stamp_path() -> str:
+    return settings.DAILY_CHALLENGE_VERSION_STAMP_PATH or os.path.join(
+        tempfile.gettempdir(), "zakuchess_daily_challenges.version"
+    )
+
+
+def _fetch_daily_challenge_for_day(day: dt.date) -> "DailyChallenge":
     from ..models import DailyChallenge
 
-    today = timezone.now().date()
-    today_as_strings = (
+    day_as_strings = (
         # We may have a challenge for this specific day of this specific year:
-        today.strftime("%Y-%m-%d"),
+        day.strftime("%Y-%m-%d"),
         # If not, we'll look for a challenge for this specific day of any year:
-        today.strftime("%m-%d"),
+        day.strftime("%m-%d"),
     )
 
-    for today_str in today_as_strings:
+    for day_str in day_as_strings:
         # N.B. On a non-SQLite database we would have tried to use a single query
         # to fetch both cases, but n+1 queries are not a problem with SQlite.
         try:
             return DailyChallenge.objects.get(
                 status=DailyChallengeStatus.PUBLISHED,
-                lookup_key=today_str,
+                lookup_key=day_str,
             )
         except DailyChallenge.DoesNotExist:
             pass
@@ -1,15 +1,14 @@
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING
 
 from apps.chess.business_logic import do_chess_move
 from apps.chess.helpers import get_active_player_side_from_fen
 from apps.chess.types import ChessInvalidStateException
 
-from ..models import PlayerGameOverState
+from ..models import PlayerGameOverState, PlayerGameState
 
 if TYPE_CHECKING:
-    from apps.chess.types import PieceRole, PieceSymbol, Square
-
-    from ..models import PlayerGameState
+    from apps.chess.move_graph import ChessMoveGraph
+    from apps.chess.types import PieceRole, Square
 
 
 def move_daily_challenge_piece(
@@ -18,11 +17,17 @@ def move_daily_challenge_piece(
     from_: "Square",
     to: "Square",
     is_my_side: bool,
+    move_graph: "ChessMoveGraph | None" = None,
 ) -> tuple["PlayerGameState", "PieceRole | None"]:
+    """
+    Plays the move on the given game state - which is updated in place, and returned
+    alongside the role of the piece that was captured, if any.
+    """
     fen = game_state.fen
     active_player_side = get_active_player_side_from_fen(fen)
     try:
-        move_result = do_chess_move(
+        # Most moves of a challenge can be answered by its pre-computed move graph:
+        move_result = (move_graph.move if move_graph else do_chess_move)(
             fen=fen,
             from_=from_,
             to=to,
@@ -30,23 +35,17 @@ def move_daily_challenge_piece(
     except ValueError as err:
         raise ChessInvalidStateException(f"Suspicious chess move: '{err}'") from err
 
-    piece_role_by_square = game_state.piece_role_by_square.copy()
-    if promotion := move_result["promotion"]:
-        # Let's promote that piece!
-        piece_promotion = cast(
-            "PieceSymbol", promotion.upper() if active_player_side == "w" else promotion
-        )
-        piece_role_by_square[from_] += piece_promotion  # type: ignore
-
-    captured_piece: "PieceRole | None" = None
-    if captured := move_result["captured"]:
-        assert move_result["is_capture"]
-        captured_piece = piece_role_by_square[captured]
-        del piece_role_by_square[captured]  # this square is now empty
+    # The board roles are updated in place: no need to copy them for each move
+    board_roles_move = game_state.piece_role_by_square.apply_move(
+        move_result, active_player_side=active_player_side
+    )
+    captured_piece = board_roles_move.captured_piece_role
 
-    for move_from, move_to in move_result["moves"]:
-        piece_role_by_square[move_to] = piece_role_by_square[move_from]
-        del piece_role_by_square[move_from]  # this square is now empty
+    # Let's keep track of what this move changed, so it can be undone:
+    _, previous_fen_suffix = fen.split(" ", 1)
+    undo_journal = game_state.undo_journal
+    undo_journal.append(f"{board_roles_move.encode()}|{previous_fen_suffix}")
+    del undo_journal[: -PlayerGameState.UNDO_JOURNAL_MAX_LENGTH]
 
     if game_over := move_result["game_over"]:
         game_over_state = (
@@ -57,16 +56,13 @@ def move_daily_challenge_piece(
     else:
         game_over_state = PlayerGameOverState.PLAYING
 
-    # Right, let's return the new game state!
-    new_game_state = game_state.replace(
-        fen=move_result["fen"],
-        piece_role_by_square=piece_role_by_square,
-        moves=f"{game_state.moves}{from_}{to}",
-        game_over=game_over_state,
-    )
+    # Right, let's update the game state!
+    game_state.fen = move_result["fen"]
+    game_state.moves = f"{game_state.moves}{from_}{to}"
+    game_state.game_over = game_over_state
 
     if is_my_side:
-        new_game_state.turns_counter += 1
-        new_game_state.current_attempt_turns_counter += 1
+        game_state.turns_counter += 1
+        game_state.current_attempt_turns_counter += 1
 
-    return new_game_state, captured_piece
+    return game_state, captured_piece
@@ -1,6 +1,8 @@
 import copy
 from typing import TYPE_CHECKING
 
+from apps.chess.board_roles import BoardRoles
+
 from ..models import DailyChallengeStats
 
 if TYPE_CHECKING:
@@ -25,10 +27,11 @@ def restart_daily_challenge(
     new_game_state.current_attempt_turns_counter = 0
     # Back to the initial state:
     new_game_state.fen = challenge.fen_before_bot_first_move
-    new_game_state.piece_role_by_square = (
+    new_game_state.piece_role_by_square = BoardRoles.from_piece_role_by_square(
         challenge.piece_role_by_square_before_bot_first_move
     )
     new_game_state.moves = ""
+    new_game_state.undo_journal = []
 
     # Server stats
     if not is_staff_user:
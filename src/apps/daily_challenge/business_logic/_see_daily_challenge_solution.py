@@ -1,6 +1,8 @@
 import copy
 from typing import TYPE_CHECKING
 
+from apps.chess.board_roles import BoardRoles
+
 from ..models import DailyChallengeStats
 from ._has_player_won_today import has_player_won_today
 
@@ -23,8 +25,11 @@ def see_daily_challenge_solution(
     new_game_state.solution_index = 0
     new_game_state.current_attempt_turns_counter = 0
     new_game_state.fen = challenge.fen
-    new_game_state.piece_role_by_square = challenge.piece_role_by_square
+    new_game_state.piece_role_by_square = BoardRoles.from_piece_role_by_square(
+        challenge.piece_role_by_square
+    )
     new_game_state.moves = ""
+    new_game_state.undo_journal = []
 
     # If we're seeing the solution without having won today first,
     # that's the end of our current streak 😔
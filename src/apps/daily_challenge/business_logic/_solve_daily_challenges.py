@@ -0,0 +1,108 @@
+import logging
+from typing import TYPE_CHECKING
+
+from django.core.exceptions import ValidationError
+
+from ..models import DailyChallenge, DailyChallengeStatus
+from ..solver import SolverTask, solve_challenges
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from apps.chess.server_bot import ServerBotEngine
+
+    from ..solver import ChallengeSolution
+
+_logger = logging.getLogger(__name__)
+
+_SOLUTIONS_SAVE_BATCH_SIZE = 20
+
+
+def solve_daily_challenges(
+    challenges: "Iterable[DailyChallenge]",
+    *,
+    engine: "ServerBotEngine",
+    workers: int,
+    time_budget: float,
+    move_time_budget: float,
+    on_solution: "Callable[[ChallengeSolution, list[DailyChallenge]], None] | None" = None,
+) -> list["ChallengeSolution"]:
+    """
+    Solves the challenges with our server-side solver, and saves the solutions we
+    found to the database as they come - so an interrupted run doesn't lose them.
+    The challenges that share the same starting position and depths are only
+    solved once.
+    Only pending challenges are solved: the solutions are saved in bulk, without
+    the checks and signals that published challenges need.
+    `on_solution` is called for each solution, with the challenges it applies to.
+    """
+    challenges_by_task: dict[tuple, list[DailyChallenge]] = {}
+    tasks: dict[int, SolverTask] = {}
+    for challenge in challenges:
+        if challenge.status != DailyChallengeStatus.PENDING:
+            _logger.warning(
+                "Challenge %s is not a pending one: not solving it", challenge.id
+            )
+            continue
+        task_key = (
+            challenge.fen,
+            challenge.bot_depth,
+            challenge.player_simulated_depth,
+        )
+        if task_key not in challenges_by_task:
+            tasks[challenge.id] = SolverTask(
+                challenge_id=challenge.id,
+                fen=challenge.fen,
+                bot_depth=challenge.bot_depth,
+                player_depth=challenge.player_simulated_depth,
+            )
+            challenges_by_task[task_key] = []
+        challenges_by_task[task_key].append(challenge)
+
+    solutions: list["ChallengeSolution"] = []
+    to_save: list[DailyChallenge] = []
+    for solution in solve_challenges(
+        list(tasks.values()),
+        workers=workers,
+        engine=engine,
+        time_budget=time_budget,
+        move_time_budget=move_time_budget,
+    ):
+        task = tasks[solution.challenge_id]
+        solved_challenges = challenges_by_task[
+            (task.fen, task.bot_depth, task.player_depth)
+        ]
+        solutions.append(solution)
+        if on_solution:
+            on_solution(solution, solved_challenges)
+        if not solution.is_solved:
+            continue
+
+        try:
+            DailyChallenge._meta.get_field("solution").run_validators(solution.solution)
+        except ValidationError as exc:
+            # (e.g. mates in one, which are too short for a daily challenge)
+            _logger.warning(
+                "Solution '%s' of challenge %s is not a valid one: %s",
+                solution.solution,
+                solution.challenge_id,
+                exc,
+            )
+            continue
+        for challenge in solved_challenges:
+            challenge.solution = solution.solution
+            challenge.solution_turns_count = solution.turns_count
+        to_save.extend(solved_challenges)
+        if len(to_save) >= _SOLUTIONS_SAVE_BATCH_SIZE:
+            _save_solutions(to_save)
+            to_save = []
+
+    _save_solutions(to_save)
+    return solutions
+
+
+def _save_solutions(challenges: list[DailyChallenge]) -> None:
+    if challenges:
+        DailyChallenge.objects.bulk_update(
+            challenges, ["solution", "solution_turns_count"]
+        )
@@ -2,9 +2,11 @@ import logging
 import textwrap
 from typing import TYPE_CHECKING
 
+from apps.chess.board_roles import BoardRoles, BoardRolesMove
 from apps.chess.helpers import uci_move_squares
 
-from ..models import DailyChallengeStats
+from ..models import DailyChallengeStats, PlayerGameOverState
+from ._get_challenge_move_graph import get_challenge_move_graph
 from ._move_daily_challenge_piece import move_daily_challenge_piece
 
 if TYPE_CHECKING:
@@ -24,9 +26,6 @@ def undo_last_move(
     game_state: "PlayerGameState",
     is_staff_user: bool = False,
 ) -> "PlayerGameState":
-    # A published challenge always has a `piece_role_by_square`:
-    assert challenge.piece_role_by_square
-
     moves = game_state.moves
     if len(moves) < _MOVES_STR_MIN_LENGTH:
         _logger.warning(
@@ -34,6 +33,50 @@ def undo_last_move(
         )
         return game_state
 
+    if len(game_state.undo_journal) >= 2:
+        _undo_last_turn_from_journal(game_state)
+    else:
+        # Cookies created before we had an undo journal:
+        _undo_last_turn_by_replaying_moves(challenge=challenge, game_state=game_state)
+
+    # Undoing the last move can only be done once per challenge:
+    game_state.undo_used = True
+
+    # Server stats
+    if not is_staff_user:
+        DailyChallengeStats.objects.increment_today_undos_count()
+
+    return game_state
+
+
+def _undo_last_turn_from_journal(game_state: "PlayerGameState") -> None:
+    # Reverting the last 2 half-moves is just a matter of restoring the squares they
+    # changed, as well as the previous FEN:
+    board_roles = game_state.piece_role_by_square
+    for _ in range(2):
+        encoded_move, previous_fen_suffix = game_state.undo_journal.pop().split("|")
+        board_roles.revert_move(BoardRolesMove.decode(encoded_move))
+    game_state.fen = f"{board_roles.board_fen()} {previous_fen_suffix}"
+    game_state.moves = game_state.moves[:-8]
+
+    # The rest of the game state gets the same values as the ones we would have had by
+    # replaying the moves (see below):
+    replayed_moves_count = (len(game_state.moves) - 4) // 4
+    replayed_turns_count = (replayed_moves_count + 1) // 2
+    game_state.current_attempt_turns_counter = replayed_turns_count
+    game_state.turns_counter += replayed_turns_count
+    if replayed_moves_count:
+        game_state.game_over = PlayerGameOverState.PLAYING
+
+
+def _undo_last_turn_by_replaying_moves(
+    *, challenge: "DailyChallenge", game_state: "PlayerGameState"
+) -> None:
+    # A published challenge always has a `piece_role_by_square`:
+    assert challenge.piece_role_by_square
+
+    moves = game_state.moves
+
     # We could undo the last 2 moves by "unstacking" the "moves" field, but by
     # un-applying moves like this with our `calculate_fen_before_move` function we would
     # lose track of the captures that were made during these moves.
@@ -42,15 +85,19 @@ def undo_last_move(
 
     # Back to the initial state:
     game_state.fen = challenge.fen
-    game_state.piece_role_by_square = challenge.piece_role_by_square
+    game_state.piece_role_by_square = BoardRoles.from_piece_role_by_square(
+        challenge.piece_role_by_square
+    )
     game_state.current_attempt_turns_counter = 0
     game_state.moves = moves[:4]  # we only keep the bot's 1st move there
+    game_state.undo_journal = []
 
     # And now, let's replay all the moves!
     # We create a list of UCI moves, without the last 2 ones (which take 8 chars) and
     # without the bot's 1st move (which takes the 1st 4 chars):
     moves_list: list[str] = textwrap.wrap(moves[4:-8], width=4)
 
+    move_graph = get_challenge_move_graph(challenge)
     is_my_side = True  # The human player always starts
     # Right, let's replay all the moves from that list now!
     for move_uci in moves_list:
@@ -58,17 +105,13 @@ def undo_last_move(
         # We cannot simply play each move using the `chess` library, because we need to
         # keep track of the pieces updates in the `piece_role_by_square` field - which
         # can be cumbersome in the case of castling, en passant, or promotion.
-        # So let's use our own `move_daily_challenge_piece` function instead:
-        game_state, _ = move_daily_challenge_piece(
-            game_state=game_state, from_=from_, to=to, is_my_side=is_my_side
+        # So let's use our own `move_daily_challenge_piece` function instead - which
+        # updates the game state in place:
+        move_daily_challenge_piece(
+            game_state=game_state,
+            from_=from_,
+            to=to,
+            is_my_side=is_my_side,
+            move_graph=move_graph,
         )
         is_my_side = not is_my_side
-
-    # Undoing the last move can only be done once per challenge:
-    game_state.undo_used = True
-
-    # Server stats
-    if not is_staff_user:
-        DailyChallengeStats.objects.increment_today_undos_count()
-
-    return game_state
@@ -0,0 +1,247 @@
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from functools import cache
+from typing import TYPE_CHECKING, NamedTuple
+
+import msgspec
+from django.conf import settings
+
+from apps.chess.components.chess_board import (
+    chess_available_targets,
+    chess_last_move,
+    chess_pieces,
+)
+
+from .misc_ui.daily_challenge_bar import daily_challenge_bar
+from .misc_ui.status_bar import status_bar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from dominate.tags import dom_tag
+
+    from apps.chess.types import Square
+
+    from ..presenters import DailyChallengeGamePresenter
+
+    KeyFieldsFunction = Callable[[DailyChallengeGamePresenter], tuple]
+
+# Everyone plays the same daily challenge, so the same board states (and therefore
+# the same HTML fragments) are rendered again and again for all our players.
+# We cache these rendered fragments, keyed by the presenter fields each component
+# reads.
+# ⚠️ When one of these components starts reading a new field of the presenter, that
+# field must be added to its `_*_key_fields()` function below!
+
+_KEY_ENCODER = msgspec.msgpack.Encoder()
+
+
+class FragmentsRenderCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class FragmentsRenderCache:
+    """
+    A per-process, bounded, LRU-evicted cache of rendered HTML fragments.
+    Hits and misses are also counted per component.
+    """
+
+    def __init__(self, *, max_size: int = 2_000):
+        self.max_size = max_size
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits: Counter[str] = Counter()
+        self._misses: Counter[str] = Counter()
+        self._evictions = 0
+
+    def get_or_render(
+        self, *, component: str, key_fields: tuple, render: "Callable[[], str]"
+    ) -> str:
+        key = self.make_key(component=component, key_fields=key_fields)
+        with self._lock:
+            if (html := self._data.get(key)) is not None:
+                self._data.move_to_end(key)
+                self._hits[component] += 1
+                return html
+            self._misses[component] += 1
+
+        # (rendering happens outside the lock: the worst case scenario is that 2
+        # threads render the same fragment at the same time)
+        html = render()
+        with self._lock:
+            self._data[key] = html
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+        return html
+
+    @staticmethod
+    def make_key(*, component: str, key_fields: tuple) -> str:
+        digest = hashlib.blake2b(
+            _KEY_ENCODER.encode(key_fields), digest_size=16
+        ).hexdigest()
+        return f"{component}:{digest}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._hits.clear()
+            self._misses.clear()
+            self._evictions = 0
+
+    def stats(self) -> FragmentsRenderCacheStats:
+        return FragmentsRenderCacheStats(
+            hits=self._hits.total(),
+            misses=self._misses.total(),
+            evictions=self._evictions,
+            size=len(self._data),
+        )
+
+    def stats_by_component(self) -> dict[str, tuple[int, int]]:
+        """Returns the (hits, misses) counters of each component."""
+        return {
+            component: (self._hits[component], self._misses[component])
+            for component in sorted(self._hits.keys() | self._misses.keys())
+        }
+
+
+@cache
+def get_fragments_render_cache() -> FragmentsRenderCache | None:
+    """Returns None if the fragments are not cached."""
+    config = settings.DAILY_CHALLENGE_FRAGMENTS_RENDER_CACHE
+    if not config["ENABLED"]:
+        return None
+    return FragmentsRenderCache(max_size=config["MAX_SIZE"])
+
+
+def render_fragment(
+    component: "Callable[..., dom_tag]",
+    *,
+    game_presenter: "DailyChallengeGamePresenter",
+    board_id: str,
+    **extra_attrs: str,
+) -> str:
+    """
+    Renders one of the components of `_KEY_FIELDS_FUNCTIONS` to HTML,
+    or returns the HTML we rendered earlier for the same inputs.
+    """
+    pretty = settings.DEBUG
+
+    def render() -> str:
+        return component(
+            game_presenter=game_presenter, board_id=board_id, **extra_attrs
+        ).render(pretty=pretty)
+
+    if (render_cache := get_fragments_render_cache()) is None:
+        return render()
+
+    key_fields_function = _KEY_FIELDS_FUNCTIONS[component]
+    return render_cache.get_or_render(
+        component=component.__name__,
+        key_fields=(
+            board_id,
+            pretty,
+            sorted(extra_attrs.items()),
+            *key_fields_function(game_presenter),
+        ),
+        render=render,
+    )
+
+
+# The FEN is part of most of these keys: everything the chess board can tell us
+# (active player, check, game over, legal moves...) is derived from it.
+
+
+def _chess_pieces_key_fields(game_presenter: "DailyChallengeGamePresenter") -> tuple:
+    return (
+        game_presenter.fen,
+        game_presenter.game_state.piece_role_by_square.encode(),
+        game_presenter.game_phase,
+        game_presenter.solution_index is not None,
+        game_presenter.is_player_turn,
+        game_presenter.is_bot_turn,
+        _selected_piece_square(game_presenter),
+        game_presenter.player_side_to_highlight_all_pieces_for,
+        sorted(game_presenter.factions.items()),
+        game_presenter.user_prefs.game_speed,
+        game_presenter.forced_bot_move,
+        game_presenter.bot_depth,
+        game_presenter.client_side_piece_selection,
+        game_presenter.server_side_bot,
+    )
+
+
+def _chess_available_targets_key_fields(
+    game_presenter: "DailyChallengeGamePresenter",
+) -> tuple:
+    return (
+        game_presenter.fen,
+        _selected_piece_square(game_presenter),
+    )
+
+
+def _chess_last_move_key_fields(
+    game_presenter: "DailyChallengeGamePresenter",
+) -> tuple:
+    return (game_presenter.last_move,)
+
+
+def _daily_challenge_bar_key_fields(
+    game_presenter: "DailyChallengeGamePresenter",
+) -> tuple:
+    game_state = game_presenter.game_state
+    return (
+        game_presenter.is_preview,
+        game_presenter.is_game_over,
+        game_presenter.challenge_attempts_counter,
+        game_state.current_attempt_turns_counter,
+        game_state.undo_used,
+        game_state.game_over,
+        game_state.solution_index,
+    )
+
+
+def _status_bar_key_fields(game_presenter: "DailyChallengeGamePresenter") -> tuple:
+    game_phase = game_presenter.game_phase
+    selected_piece_fields = None
+    if (selected_piece := game_presenter.selected_piece) is not None and (
+        game_phase in ("waiting_for_player_target_choice", "opponent_piece_selected")
+    ):
+        selected_piece_fields = (
+            selected_piece.square,
+            selected_piece.piece_role,
+            selected_piece.team_member.get("name", ""),
+        )
+    return (
+        game_presenter.solution_index is not None,
+        game_presenter.is_intro_turn,
+        game_phase,
+        game_presenter.challenge_solution_turns_count,
+        sorted(game_presenter.factions.items()),
+        game_presenter.challenge_total_turns_counter,
+        game_presenter.challenge_current_attempt_turns_counter,
+        game_presenter.challenge_attempts_counter,
+        selected_piece_fields,
+    )
+
+
+def _selected_piece_square(
+    game_presenter: "DailyChallengeGamePresenter",
+) -> "Square | None":
+    return (
+        game_presenter.selected_piece.square if game_presenter.selected_piece else None
+    )
+
+
+_KEY_FIELDS_FUNCTIONS: "dict[Callable[..., dom_tag], KeyFieldsFunction]" = {
+    chess_pieces: _chess_pieces_key_fields,
+    chess_available_targets: _chess_available_targets_key_fields,
+    chess_last_move: _chess_last_move_key_fields,
+    daily_challenge_bar: _daily_challenge_bar_key_fields,
+    status_bar: _status_bar_key_fields,
+}
@@ -20,6 +20,7 @@ from apps.chess.components.misc_ui import (
 )
 from apps.webui.components.layout import page
 
+from ..fragments_render_cache import render_fragment
 from ..misc_ui.daily_challenge_bar import daily_challenge_bar
 from ..misc_ui.status_bar import status_bar
 from ..misc_ui.svg_icons import ICON_SVG_COG, ICON_SVG_HELP, ICON_SVG_STATS
@@ -67,53 +68,90 @@ def daily_challenge_moving_parts_fragment(
     request: "HttpRequest",
     board_id: str,
 ) -> str:
+    # The board components are rendered through our fragments render cache:
+    cached_fragments = (
+        render_fragment(chess_pieces, game_presenter=game_presenter, board_id=board_id),
+        render_fragment(
+            chess_available_targets,
+            game_presenter=game_presenter,
+            board_id=board_id,
+            data_hx_swap_oob="outerHTML",
+        ),
+        (
+            render_fragment(
+                chess_last_move,
+                game_presenter=game_presenter,
+                board_id=board_id,
+                data_hx_swap_oob="outerHTML",
+            )
+            if game_presenter.refresh_last_move
+            else div("").render(pretty=settings.DEBUG)
+        ),
+        render_fragment(
+            daily_challenge_bar,
+            game_presenter=game_presenter,
+            board_id=board_id,
+            data_hx_swap_oob="outerHTML",
+        ),
+        render_fragment(
+            status_bar,
+            game_presenter=game_presenter,
+            board_id=board_id,
+            data_hx_swap_oob="outerHTML",
+        ),
+    )
     return "\n".join(
         (
-            dom_tag.render(pretty=settings.DEBUG)
-            for dom_tag in (
-                chess_pieces(
-                    game_presenter=game_presenter,
-                    board_id=board_id,
-                ),
-                chess_available_targets(
-                    game_presenter=game_presenter,
-                    board_id=board_id,
-                    data_hx_swap_oob="outerHTML",
-                ),
-                (
-                    chess_last_move(
-                        game_presenter=game_presenter,
-                        board_id=board_id,
-                        data_hx_swap_oob="outerHTML",
-                    )
-                    if game_presenter.refresh_last_move
-                    else div("")
-                ),
-                daily_challenge_bar(
-                    game_presenter=game_presenter,
-                    board_id=board_id,
-                    data_hx_swap_oob="outerHTML",
-                ),
-                status_bar(
+            *cached_fragments,
+            *(
+                dom_tag.render(pretty=settings.DEBUG)
+                for dom_tag in (
+                    div(
+                        speech_bubble_container(
+                            game_presenter=game_presenter,
+                            board_id=board_id,
+                        ),
+                        id=f"chess-speech-container-{board_id}",
+                        data_hx_swap_oob="innerHTML",
+                    ),
+                    *(
+                        [reset_chess_engine_worker()]
+                        if game_presenter.challenge_current_attempt_turns_counter == 0
+                        else []
+                    ),
+                    *([_open_stats_modal()] if game_presenter.just_won else []),
+                )
+            ),
+        )
+    )
+
+
+def daily_challenge_selection_status_fragment(
+    *,
+    game_presenter: "DailyChallengeGamePresenter",
+    board_id: str,
+) -> str:
+    """
+    The parts of `daily_challenge_moving_parts_fragment` that "chess-main.ts" doesn't
+    render itself when a piece is selected client-side: the status bar (with the
+    selected character's info) and the speech bubble.
+    """
+    return "\n".join(
+        (
+            render_fragment(
+                status_bar,
+                game_presenter=game_presenter,
+                board_id=board_id,
+                data_hx_swap_oob="outerHTML",
+            ),
+            div(
+                speech_bubble_container(
                     game_presenter=game_presenter,
                     board_id=board_id,
-                    data_hx_swap_oob="outerHTML",
-                ),
-                div(
-                    speech_bubble_container(
-                        game_presenter=game_presenter,
-                        board_id=board_id,
-                    ),
-                    id=f"chess-speech-container-{board_id}",
-                    data_hx_swap_oob="innerHTML",
                 ),
-                *(
-                    [reset_chess_engine_worker()]
-                    if game_presenter.challenge_current_attempt_turns_counter == 0
-                    else []
-                ),
-                *([_open_stats_modal()] if game_presenter.just_won else []),
-            )
+                id=f"chess-speech-container-{board_id}",
+                data_hx_swap_oob="innerHTML",
+            ).render(pretty=settings.DEBUG),
         )
     )
 
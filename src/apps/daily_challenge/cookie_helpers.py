@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, NamedTuple
 from django.utils.timezone import now
 from msgspec import MsgspecError
 
+from apps.chess.board_roles import BoardRoles
 from apps.chess.models import UserPrefs
 
 from .models import PlayerGameState, PlayerSessionContent, PlayerStats
@@ -50,7 +51,9 @@ def get_or_create_daily_challenge_state_for_player(
             turns_counter=0,
             current_attempt_turns_counter=0,
             fen=challenge.fen,
-            piece_role_by_square=challenge.piece_role_by_square,
+            piece_role_by_square=BoardRoles.from_piece_role_by_square(
+                challenge.piece_role_by_square
+            ),
             is_returning_player=is_returning_player,
             moves="",
             solution_index=None,
@@ -112,6 +115,18 @@ def get_user_prefs_from_request(request: "HttpRequest") -> UserPrefs:
         return new_content()
 
 
+def get_player_state_version(request: "HttpRequest") -> tuple[str, str]:
+    """
+    Returns the player's session content and user prefs, as they are encoded in the
+    session and cookies: they change whenever the player's state does, and are much
+    cheaper to compare than their decoded versions.
+    """
+    return (
+        request.session.get(_PLAYER_CONTENT_SESSION_KEY, ""),
+        request.COOKIES.get(_USER_PREFS_COOKIE_NAME, ""),
+    )
+
+
 def save_daily_challenge_state_in_session(
     *, request: "HttpRequest", game_state: PlayerGameState, player_stats: PlayerStats
 ) -> None:
@@ -165,4 +180,11 @@ def _store_player_session_content(
     request: "HttpRequest", session_content: PlayerSessionContent
 ) -> None:
     cookie_content = session_content.to_cookie_content()
-    request.session[_PLAYER_CONTENT_SESSION_KEY] = cookie_content
+    session = request.session
+    # Our session is a signed cookie: writing to it means signing it again and sending
+    # it back in a "Set-Cookie" header, which we can skip when the player's state
+    # didn't change. (our encoding is deterministic, so comparing the encoded contents
+    # is enough - and it's cheaper than any digest of the decoded ones)
+    if session.get(_PLAYER_CONTENT_SESSION_KEY) == cookie_content:
+        return
+    session[_PLAYER_CONTENT_SESSION_KEY] = cookie_content
@@ -0,0 +1,112 @@
+import contextlib
+import io
+import shutil
+import signal
+import subprocess
+from typing import TYPE_CHECKING, NamedTuple
+
+import chess
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+
+    from apps.chess.types import FEN
+
+# Helpers for the import of the Lichess puzzles database, downloaded from
+# 'https://database.lichess.org/lichess_db_puzzle.csv.zst'.
+# N.B. This module runs in our worker processes: it must stay free of Django-related
+# stuff.
+
+
+class PuzzlesFileError(Exception):
+    pass
+
+
+class BotFirstMoveAndResultingFen(NamedTuple):
+    first_move: str
+    fen: str
+
+
+@contextlib.contextmanager
+def open_puzzles_csv(path: "Path") -> "Iterator[io.TextIOBase]":
+    """
+    Opens a CSV file of Lichess puzzles for reading.
+    Files with a ".zst" extension are decompressed on the fly by the `zstd` command,
+    so the millions of rows of the full Lichess dump are streamed rather than loaded
+    in memory - or decompressed to the disk first.
+    """
+    if path.suffix != ".zst":
+        with path.open(newline="", encoding="utf-8") as csv_file:
+            yield csv_file
+        return
+
+    if (zstd_path := shutil.which("zstd")) is None:
+        raise PuzzlesFileError(
+            f"The 'zstd' command is needed to read '{path}' - "
+            "install it, or decompress the file first."
+        )
+    with subprocess.Popen(
+        (zstd_path, "--decompress", "--stdout", "--quiet", "--", str(path)),
+        stdout=subprocess.PIPE,
+    ) as process:
+        assert process.stdout is not None
+        try:
+            yield io.TextIOWrapper(process.stdout, encoding="utf-8", newline="")
+        finally:
+            # (we may stop reading before the end of the file)
+            if process.poll() is None:
+                process.terminate()
+        if process.wait() not in (0, -signal.SIGTERM):
+            raise PuzzlesFileError(f"Could not decompress '{path}'")
+
+
+def get_bot_first_move_and_resulting_fen(
+    csv_row: dict,
+) -> BotFirstMoveAndResultingFen:
+    fen_before_bot_first_move = csv_row["FEN"]
+    bot_first_move_uci = csv_row["Moves"][0:4]
+
+    # The Lichess puzzles FEN is always the one *before* the bot's move,
+    # so we're going to have to adapt this to our own models.
+    board = chess.Board(fen_before_bot_first_move)
+
+    # Quick and dirty way to detect if white is to move from the FEN:
+    have_to_mirror_board = " w " in fen_before_bot_first_move
+
+    if have_to_mirror_board:
+        # If this is the white to play, we're playing black.
+        # (the FEN is always the one before the bot's move)
+        # As we always play white in the Zakuchess daily challenge, for simplicity,
+        # we have to mirror the board when that's the case.
+        board.apply_mirror()
+
+    # Ok, let's calculate the FEN after the bot's move:
+    if have_to_mirror_board:
+        # If we mirrored the board, we have to mirror the move too:
+        bot_first_move = chess.Move.from_uci(bot_first_move_uci)
+        bot_first_move_uci = "".join(
+            chess.square_name(chess.square_mirror(sq))
+            for sq in (bot_first_move.from_square, bot_first_move.to_square)
+        )
+
+    board.push(chess.Move.from_uci(bot_first_move_uci))
+    starting_fen_after_bot_first_move = board.fen()
+
+    return BotFirstMoveAndResultingFen(
+        first_move=bot_first_move_uci,
+        fen=starting_fen_after_bot_first_move,
+    )
+
+
+def get_bot_first_moves_and_resulting_fens(
+    fens_and_moves: "Sequence[tuple[FEN, str]]",
+) -> list[BotFirstMoveAndResultingFen]:
+    """
+    Same as `get_bot_first_move_and_resulting_fen`, for a chunk of puzzles - so that
+    our worker processes are sent chunks of work rather than single rows.
+    """
+    return [
+        get_bot_first_move_and_resulting_fen({"FEN": fen, "Moves": moves})
+        for fen, moves in fens_and_moves
+    ]
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand
+
+from apps.daily_challenge.benchmarks.views_benchmark import (
+    ViewsBenchmarkReport,
+    compare_views_benchmark_reports,
+    run_views_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks our daily challenge views in-process, by replaying recorded "
+        "game scripts through Django's test client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="How many times each game script is played.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Path of the JSON file the report will be written to.",
+        )
+        parser.add_argument(
+            "--compare-with",
+            type=Path,
+            help="Path of the JSON report of a previous run, to compare latencies with.",
+        )
+        parser.add_argument(
+            "--session-engine",
+            help=(
+                "Django session engine used by the players - defaults to the "
+                "SESSION_ENGINE setting. "
+                "e.g. 'apps.daily_challenge.sqlite_sessions'"
+            ),
+        )
+
+    def handle(
+        self,
+        *args,
+        iterations: int,
+        output: Path | None,
+        compare_with: Path | None,
+        session_engine: str | None,
+        **options,
+    ):
+        previous_report = (
+            ViewsBenchmarkReport.from_json(compare_with.read_bytes())
+            if compare_with
+            else None
+        )
+
+        report = run_views_benchmark(
+            iterations=iterations, session_engine=session_engine
+        )
+
+        p50_changes = (
+            compare_views_benchmark_reports(previous_report, report)
+            if previous_report
+            else {}
+        )
+        header = (
+            f"{'view':<52} {'requests':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'KiB':>8} {'queries':>7} {'cookie B':>8} {'set-cookie B':>12}"
+        )
+        if previous_report:
+            header += f" {'p50 vs ' + (previous_report.git_revision or '?'):>16}"
+        self.stdout.write(f"Session engine: {report.session_engine}")
+        self.stdout.write(header)
+        for view_name, stats in report.views.items():
+            line = (
+                f"{view_name:<52} {stats.requests_count:>8} {stats.p50_ms:>8.2f} "
+                f"{stats.p95_ms:>8.2f} {stats.allocated_kib:>8.1f} "
+                f"{stats.db_queries_count:>7} {stats.request_cookie_bytes:>8} "
+                f"{stats.response_cookie_bytes:>12}"
+            )
+            if (p50_change := p50_changes.get(view_name)) is not None:
+                line += " " + self._style_change(f"{p50_change:>+16.1%}", p50_change)
+            self.stdout.write(line)
+
+        if output:
+            output.write_bytes(report.to_json())
+            self.stdout.write(f"Report written to {self.style.SUCCESS(str(output))}.")
+
+    def _style_change(self, change: str, p50_change: float) -> str:
+        # Less than 5% is likely to be noise:
+        if p50_change > 0.05:
+            return self.style.ERROR(change)
+        if p50_change < -0.05:
+            return self.style.SUCCESS(change)
+        return change
@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, cast
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db.models import Q
+
+from apps.chess.business_logic import compute_games_scores
+from apps.daily_challenge.models import DailyChallenge, DailyChallengeStatus
+
+if TYPE_CHECKING:
+    from apps.chess.business_logic import GameScoreEngine
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the missing `starting_advantage` of our pending DailyChallenges, "
+        "in batches. Can be interrupted and run again: it resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--engine",
+            choices=("auto", "uci", "andoma"),
+            default="auto",
+            help=(
+                "'uci' uses the STOCKFISH_PATH engine, 'andoma' our bundled Python "
+                "engine. 'auto' picks 'uci' when its binary can be found."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="How many positions are analysed in parallel.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="How many DailyChallenges are scored and updated at once.",
+        )
+        parser.add_argument(
+            "--andoma-depth",
+            type=int,
+            default=3,
+            help="Depth of the andoma engine searches.",
+        )
+        parser.add_argument(
+            "--stop-after",
+            type=int,
+            help="Stop after having scored N DailyChallenges.",
+        )
+        parser.add_argument(
+            "--rescore-zeros",
+            action="store_true",
+            help=(
+                "Also score the pending DailyChallenges with a 0 advantage - that's "
+                "how mates used to be stored."
+            ),
+        )
+
+    def handle(
+        self,
+        *args,
+        engine: str,
+        workers: int,
+        batch_size: int,
+        andoma_depth: int,
+        stop_after: int | None,
+        rescore_zeros: bool,
+        verbosity: int,
+        **options,
+    ):
+        if engine == "auto":
+            engine = "uci" if _uci_engine_is_available() else "andoma"
+        score_engine = cast("GameScoreEngine", engine)
+        if verbosity >= 1:
+            self.stdout.write(f"Scoring DailyChallenges with the '{engine}' engine.")
+
+        # Each batch is written to the database before we move to the next one,
+        # so these are the DailyChallenges that are still left to score:
+        to_score_filter = Q(starting_advantage__isnull=True)
+        if rescore_zeros:
+            to_score_filter |= Q(starting_advantage=0)
+        challenges_to_score = DailyChallenge.objects.filter(
+            to_score_filter, status=DailyChallengeStatus.PENDING
+        ).order_by("id")
+
+        scored_count = 0
+        # (a position can legitimately get a 0 score again: we don't rely on the
+        # scored DailyChallenges leaving our queryset to move forward)
+        last_scored_id = 0
+        executor_context = (
+            ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            if score_engine == "andoma"
+            else nullcontext()
+        )
+        with executor_context as executor:
+            while stop_after is None or scored_count < stop_after:
+                limit = batch_size
+                if stop_after is not None:
+                    limit = min(limit, stop_after - scored_count)
+                next_challenges = challenges_to_score.filter(id__gt=last_scored_id)
+                batch = list(next_challenges.only("id", "fen")[:limit])
+                if not batch:
+                    break
+
+                scores = compute_games_scores(
+                    [challenge.fen for challenge in batch],
+                    engine=score_engine,
+                    workers=workers,
+                    andoma_depth=andoma_depth,
+                    executor=executor,
+                )
+                for challenge, score in zip(batch, scores, strict=True):
+                    challenge.starting_advantage = score
+                DailyChallenge.objects.bulk_update(batch, ["starting_advantage"])
+                last_scored_id = batch[-1].id
+
+                scored_count += len(batch)
+                if verbosity >= 2:
+                    self.stdout.write(f"Scored {scored_count} DailyChallenges.")
+
+        self.stdout.write(f"Scored {self.style.SUCCESS(scored_count)} DailyChallenges.")
+
+
+def _uci_engine_is_available() -> bool:
+    command = settings.STOCKFISH_PATH
+    if isinstance(command, (list, tuple)):
+        command = command[0]
+    return shutil.which(command) is not None
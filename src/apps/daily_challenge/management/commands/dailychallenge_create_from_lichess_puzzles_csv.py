@@ -1,33 +1,83 @@
+import contextlib
 import csv
+import itertools
+import multiprocessing
+import os
 import re
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import NamedTuple
+from typing import TYPE_CHECKING
 
-import chess
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
 from django.db.models.functions import Substr
 
+from apps.daily_challenge.lichess_puzzles import (
+    PuzzlesFileError,
+    get_bot_first_moves_and_resulting_fens,
+    open_puzzles_csv,
+)
 from apps.daily_challenge.models import DailyChallenge
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from apps.chess.types import FEN
+    from apps.daily_challenge.lichess_puzzles import BotFirstMoveAndResultingFen
+
 THEMES_TO_IGNORE = {
     "oneMove",
     "mateIn1",
     "mateIn2",
 }
 
+# A rough upper bound of the memory used by each puzzle we hold, from its CSV row to
+# its `DailyChallenge` instance waiting to be inserted - in bytes.
+_PUZZLE_MEMORY_ESTIMATE = 4_096
+
 
 class Command(BaseCommand):
+    help = (
+        "Creates DailyChallenges from the Lichess puzzles database. The '.csv.zst' "
+        "file can be used as is: it's decompressed on the fly."
+    )
+
     def add_arguments(self, parser):
         parser.add_argument(
             "csv_file_path",
             type=existing_path,
-            help="input CSV file, as downloaded from 'https://database.lichess.org/lichess_db_puzzle.csv.zst'.",
+            help=(
+                "input CSV file, as downloaded from "
+                "'https://database.lichess.org/lichess_db_puzzle.csv.zst' "
+                "- decompressed or not."
+            ),
         )
         parser.add_argument(
             "--batch-size",
             type=int,
-            default=10,  # low batch size to avoid OOM on low-end Fly.io plan
-            help="DailyChallenges creation batch size.",
+            default=500,
+            help="DailyChallenges creation batch size - one transaction per batch.",
+        )
+        parser.add_argument(
+            "--memory-budget",
+            type=int,
+            default=64,
+            help=(
+                "Approximate memory budget of the puzzles being processed, in MB: "
+                "it limits how many batches can be in flight at once "
+                "(the default one is fine for our low-end Fly.io plan)."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help=(
+                "How many processes compute the puzzles' FENs. "
+                "With 0 they're computed by the command's process."
+            ),
         )
         parser.add_argument(
             "--min-popularity",
@@ -53,6 +103,8 @@ class Command(BaseCommand):
         *args,
         csv_file_path: Path,
         batch_size: int,
+        memory_budget: int,
+        workers: int,
         min_popularity: int,
         rating_min_max: tuple[int, int],
         stop_after: int | None,
@@ -66,113 +118,147 @@ class Command(BaseCommand):
             )
         )
         if verbosity >= 2:
-            print(f"already_imported_ids: {already_imported_ids}")
+            self.stdout.write(f"{len(already_imported_ids)} puzzles already imported.")
 
-        created_count = 0
-        current_batch: list[DailyChallenge] = []
-        with csv_file_path.open(newline="") as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:  # type: dict[str,str]
-                themes: set[str] = set(row.get("Themes", "").split())
-                if themes & THEMES_TO_IGNORE:
-                    if verbosity >= 2:
-                        self.stdout.write("Skipping puzzle with ignored theme")
-                    continue
-                if (popularity := int(row["Popularity"])) < min_popularity:
-                    if verbosity >= 2:
-                        self.stdout.write(
-                            f"Skipping puzzle with Popularity {popularity}"
-                        )
-                    continue
-                if (rating := int(row["Rating"])) < rating_min or rating > rating_max:
-                    if verbosity >= 2:
-                        self.stdout.write(f"Skipping puzzle with Rating {rating}")
-                    continue
-
-                puzzle_id = row["PuzzleId"]
-                if puzzle_id in already_imported_ids:
-                    if verbosity >= 2:
-                        self.stdout.write(
-                            f"Skipping already imported puzzle '{puzzle_id}'"
-                        )
-                    continue
+        max_puzzles_in_flight = max(
+            1, memory_budget * 1024 * 1024 // _PUZZLE_MEMORY_ESTIMATE
+        )
+        if batch_size > max_puzzles_in_flight:
+            batch_size = max_puzzles_in_flight
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Batch size reduced to {batch_size}, to fit the memory budget."
+                )
+            )
+        max_batches_in_flight = max(1, max_puzzles_in_flight // batch_size)
 
-                bot_first_move, fen = get_bot_first_move_and_resulting_fen(row)
-                if verbosity >= 2:
-                    self.stdout.write(
-                        f"Creating DailyChallenge for puzzle '{puzzle_id}' with Popularity {popularity}, rating {rating}."
-                    )
+        skipped_counts: Counter[str] = Counter()
+        rows_count = 0
+        created_count = 0
+        start = time.monotonic()
 
-                current_batch.append(
-                    DailyChallenge(
-                        source=f"lichess-{puzzle_id}",
-                        fen=fen,
-                        bot_first_move=bot_first_move,
-                    )
+        def filtered_puzzles(
+            csv_rows: "Iterator[list[str]]",
+        ) -> "Iterator[tuple[str, FEN, str]]":
+            # Only cheap checks on the CSV columns here: the (much more expensive)
+            # chess stuff is only done for the puzzles that passed them.
+            nonlocal rows_count
+            if (header := next(csv_rows, None)) is None:
+                return
+            id_col, fen_col, moves_col, rating_col, popularity_col, themes_col = (
+                header.index(column)
+                for column in (
+                    "PuzzleId",
+                    "FEN",
+                    "Moves",
+                    "Rating",
+                    "Popularity",
+                    "Themes",
                 )
+            )
+            for row in csv_rows:
+                rows_count += 1
+                if not rating_min <= int(row[rating_col]) <= rating_max:
+                    skipped_counts["rating"] += 1
+                elif int(row[popularity_col]) < min_popularity:
+                    skipped_counts["popularity"] += 1
+                elif not THEMES_TO_IGNORE.isdisjoint(row[themes_col].split()):
+                    skipped_counts["themes"] += 1
+                elif row[id_col] in already_imported_ids:
+                    skipped_counts["already_imported"] += 1
+                else:
+                    yield row[id_col], row[fen_col], row[moves_col]
 
-                if len(current_batch) == batch_size:
-                    DailyChallenge.objects.bulk_create(current_batch)
-                    if verbosity >= 2:
-                        self.stdout.write(f"Created batch of {batch_size} puzzles.")
-                    current_batch = []
+        def create_batch(
+            puzzle_ids: list[str],
+            fens_future: "Future[list[BotFirstMoveAndResultingFen]]",
+        ) -> None:
+            nonlocal created_count
+            challenges = [
+                DailyChallenge(
+                    source=f"lichess-{puzzle_id}",
+                    fen=fen,
+                    bot_first_move=bot_first_move,
+                )
+                for puzzle_id, (bot_first_move, fen) in zip(
+                    puzzle_ids, fens_future.result(), strict=True
+                )
+            ]
+            with transaction.atomic():
+                DailyChallenge.objects.bulk_create(challenges)
+            created_count += len(challenges)
+            if verbosity >= 2:
+                self.stdout.write(
+                    f"Created {created_count} DailyChallenges "
+                    f"({rows_count} rows read, {_rate(rows_count, start)} rows/s)."
+                )
 
-                created_count += 1
-                if stop_after is not None and created_count == stop_after:
-                    self.stdout.write(f"Stopping after {created_count} puzzles.")
-                    break
+        try:
+            with (
+                open_puzzles_csv(csv_file_path) as csv_file,
+                _executor(workers) as executor,
+            ):
+                puzzles = filtered_puzzles(csv.reader(csv_file))
+                if stop_after is not None:
+                    puzzles = itertools.islice(puzzles, stop_after)
 
-        if current_batch:
-            DailyChallenge.objects.bulk_create(current_batch)
-            if verbosity >= 2:
-                self.stdout.write(f"Created batch of {batch_size} puzzles.")
+                # The FENs of the next batches are computed by our workers while we're
+                # reading the CSV and inserting the previous batches:
+                batches_in_flight: "deque[tuple[list[str], Future[list[BotFirstMoveAndResultingFen]]]]" = deque()
+                while batch := list(itertools.islice(puzzles, batch_size)):
+                    puzzle_ids = [puzzle_id for puzzle_id, _, _ in batch]
+                    fens_and_moves = [(fen, moves) for _, fen, moves in batch]
+                    batches_in_flight.append(
+                        (
+                            puzzle_ids,
+                            executor.submit(
+                                get_bot_first_moves_and_resulting_fens, fens_and_moves
+                            )
+                            if executor
+                            else _done_future(
+                                get_bot_first_moves_and_resulting_fens(fens_and_moves)
+                            ),
+                        )
+                    )
+                    if len(batches_in_flight) >= max_batches_in_flight:
+                        create_batch(*batches_in_flight.popleft())
+                while batches_in_flight:
+                    create_batch(*batches_in_flight.popleft())
+        except PuzzlesFileError as exc:
+            raise CommandError(str(exc)) from exc
 
+        if stop_after is not None and created_count == stop_after:
+            self.stdout.write(f"Stopped after {created_count} puzzles.")
         self.stdout.write(
-            f"Imported {self.style.SUCCESS(created_count)} Lichess puzzles."
+            f"Imported {self.style.SUCCESS(created_count)} Lichess puzzles, "
+            f"from {rows_count} rows read in {time.monotonic() - start:.1f}s "
+            f"({_rate(rows_count, start)} rows/s). "
+            "Skipped: "
+            + ", ".join(
+                f"{reason}: {skipped_counts[reason]}"
+                for reason in ("rating", "popularity", "themes", "already_imported")
+            )
         )
 
 
-def get_bot_first_move_and_resulting_fen(
-    csv_row: dict,
-) -> "BotFirstMoveAndResultingFen":
-    fen_before_bot_first_move = csv_row["FEN"]
-    bot_first_move_uci = csv_row["Moves"][0:4]
-
-    # The Lichess puzzles FEN is always the one *before* the bot's move,
-    # so we're going to have to adapt this to our own models.
-    board = chess.Board(fen_before_bot_first_move)
-
-    # Quick and dirty way to detect if white is to move from the FEN:
-    have_to_mirror_board = " w " in fen_before_bot_first_move
-
-    if have_to_mirror_board:
-        # If this is the white to play, we're playing black.
-        # (the FEN is always the one before the bot's move)
-        # As we always play white in the Zakuchess daily challenge, for simplicity,
-        # we have to mirror the board when that's the case.
-        board.apply_mirror()
-
-    # Ok, let's calculate the FEN after the bot's move:
-    if have_to_mirror_board:
-        # If we mirrored the board, we have to mirror the move too:
-        bot_first_move = chess.Move.from_uci(bot_first_move_uci)
-        bot_first_move_uci = "".join(
-            chess.square_name(chess.square_mirror(sq))
-            for sq in (bot_first_move.from_square, bot_first_move.to_square)
-        )
+def _executor(workers: int) -> "ProcessPoolExecutor | contextlib.nullcontext[None]":
+    if workers < 1:
+        return contextlib.nullcontext()
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
 
-    board.push(chess.Move.from_uci(bot_first_move_uci))
-    starting_fen_after_bot_first_move = board.fen()
 
-    return BotFirstMoveAndResultingFen(
-        first_move=bot_first_move_uci,
-        fen=starting_fen_after_bot_first_move,
-    )
+def _done_future(
+    result: "list[BotFirstMoveAndResultingFen]",
+) -> "Future[list[BotFirstMoveAndResultingFen]]":
+    future: "Future[list[BotFirstMoveAndResultingFen]]" = Future()
+    future.set_result(result)
+    return future
 
 
-class BotFirstMoveAndResultingFen(NamedTuple):
-    first_move: str
-    fen: str
+def _rate(rows_count: int, start: float) -> int:
+    return round(rows_count / max(time.monotonic() - start, 1e-6))
 
 
 def existing_path(value: str) -> Path:
@@ -0,0 +1,121 @@
+import os
+from collections import Counter
+from typing import TYPE_CHECKING, cast
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from apps.daily_challenge.business_logic import solve_daily_challenges
+from apps.daily_challenge.models import DailyChallenge, DailyChallengeStatus
+
+if TYPE_CHECKING:
+    from apps.chess.server_bot import ServerBotEngine
+    from apps.daily_challenge.solver import ChallengeSolution
+
+
+class Command(BaseCommand):
+    help = (
+        "Solves our pending DailyChallenges that don't have a solution yet, with our "
+        "bundled chess engines playing both sides. Found solutions are saved as "
+        "they come, so it can be interrupted and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--engine",
+            choices=("andoma", "sunfish"),
+            default=settings.CHESS_SERVER_BOT["ENGINE"],
+            help="The engine playing both sides - defaults to the server bot's one.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="How many challenges are solved in parallel.",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=60.0,
+            help="Time budget of each challenge's solution, in seconds.",
+        )
+        parser.add_argument(
+            "--move-time-budget",
+            type=float,
+            default=5.0,
+            help="Time budget of each move, in seconds.",
+        )
+        parser.add_argument(
+            "--resolve",
+            action="store_true",
+            help="Also solve the pending challenges that already have a solution.",
+        )
+        parser.add_argument(
+            "--stop-after",
+            type=int,
+            help="Only solve the N first challenges.",
+        )
+
+    def handle(
+        self,
+        *args,
+        engine: str,
+        workers: int,
+        time_budget: float,
+        move_time_budget: float,
+        resolve: bool,
+        stop_after: int | None,
+        verbosity: int,
+        **options,
+    ):
+        challenges = DailyChallenge.objects.filter(
+            status=DailyChallengeStatus.PENDING
+        ).order_by("id")
+        if not resolve:
+            challenges = challenges.filter(solution="")
+        challenges = challenges.only(
+            "id", "source", "status", "fen", "bot_depth", "player_simulated_depth"
+        )
+        if stop_after is not None:
+            challenges = challenges[:stop_after]
+        challenges_list = list(challenges)
+
+        self.stdout.write(
+            f"Solving {len(challenges_list)} DailyChallenges with {engine}, "
+            f"{workers} workers."
+        )
+        processed_count = 0
+
+        def on_solution(
+            solution: "ChallengeSolution", solved_challenges: list[DailyChallenge]
+        ) -> None:
+            nonlocal processed_count
+            processed_count += len(solved_challenges)
+            if verbosity < 2:
+                return
+            outcome = (
+                self.style.SUCCESS(f"solved in {solution.turns_count} turns")
+                if solution.is_solved
+                else self.style.WARNING(solution.outcome)
+            )
+            self.stdout.write(
+                f"[{processed_count}/{len(challenges_list)}] "
+                f"{', '.join(str(c.source or c.id) for c in solved_challenges)}: "
+                f"{outcome} ({solution.elapsed:.1f}s)"
+            )
+
+        solutions = solve_daily_challenges(
+            challenges_list,
+            engine=cast("ServerBotEngine", engine),
+            workers=workers,
+            time_budget=time_budget,
+            move_time_budget=move_time_budget,
+            on_solution=on_solution,
+        )
+
+        outcomes = Counter(solution.outcome for solution in solutions)
+        self.stdout.write(
+            f"Solved {self.style.SUCCESS(outcomes['solved'])} positions out of "
+            f"{len(solutions)}. "
+            + ", ".join(f"{outcome}: {count}" for outcome, count in outcomes.items())
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-17 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("daily_challenge", "0015_dailychallengestats_returning_players_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailychallenge",
+            name="move_graph",
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -1,7 +1,8 @@
+import base64
 import datetime as dt
 import enum
 import math
-from typing import TYPE_CHECKING, ClassVar, Literal, Self, TypeAlias
+from typing import TYPE_CHECKING, ClassVar, Literal, Self, TypeAlias, cast
 
 import chess
 import msgspec
@@ -12,9 +13,9 @@ from django.db import IntegrityError, models
 from django.db.models import F
 from django.utils.timezone import now
 
+from apps.chess.board_roles import BoardRoles
 from apps.chess.types import (  # we need real imports on these because they're used by msgspec models
     FEN,
-    PieceRoleBySquare,
     PlayerSide,
 )
 from lib.django_helpers import literal_to_django_choices
@@ -22,7 +23,9 @@ from lib.django_helpers import literal_to_django_choices
 from .consts import BOT_SIDE, FACTIONS, PLAYER_SIDE
 
 if TYPE_CHECKING:
-    from apps.chess.types import Factions, GameTeams, Square
+    from collections.abc import Mapping
+
+    from apps.chess.types import Factions, GameTeams, PieceRoleBySquare, Square
 
 
 GameID: TypeAlias = str
@@ -122,6 +125,9 @@ class DailyChallenge(models.Model):
     solution_turns_count: int = models.PositiveSmallIntegerField(
         null=True, editable=False
     )
+    # The pre-computed graph of the positions players will explore from the
+    # starting position - see `ChessMoveGraph`:
+    move_graph: bytes | None = models.BinaryField(null=True, editable=False)
 
     def __str__(self) -> str:
         return f"{self.id}: {self.fen}"
@@ -161,7 +167,8 @@ class DailyChallenge(models.Model):
             errors["bot_first_move"] = err_msg
         if not self.intro_turn_speech_square:
             errors["intro_turn_speech_square"] = err_msg
-        if not self.starting_advantage:
+        # (0 is a legit advantage: it's a balanced position)
+        if self.starting_advantage is None:
             errors["starting_advantage"] = err_msg
         if (
             not self.solution
@@ -177,6 +184,7 @@ class DailyChallenge(models.Model):
         self, chess_board: chess.Board
     ) -> None:
         from apps.daily_challenge.business_logic import (
+            build_challenge_move_graph,
             compute_fields_before_bot_first_move,
             set_daily_challenge_teams_and_pieces_roles,
         )
@@ -208,6 +216,9 @@ class DailyChallenge(models.Model):
                 }
             )
 
+        # Last but not least, pre-compute the moves players will explore:
+        self.move_graph = build_challenge_move_graph(self).to_bytes()
+
 
 class DailyChallengeStatsManager(models.Manager):
     def increment_today_created_count(self) -> None:
@@ -260,9 +271,23 @@ class DailyChallengeStatsManager(models.Manager):
         # We won't check if today's game stats were created again:
         cache.set(cache_key, True, _STATS_FOR_TODAY_EXISTS_CACHE["DURATION"])
 
+    def increment_counters(
+        self, *, day: "dt.date", increments: "Mapping[str, int]"
+    ) -> None:
+        """Increments several counters of a given day, with a single UPDATE query."""
+        self.filter(day=day).update(
+            **{field_name: F(field_name) + n for field_name, n in increments.items()}
+        )
+
     def _increment_counter(self, field_name: str) -> None:
+        from .stats_counters_buffer import get_stats_counters_buffer
+
         self.touch_today()
-        self.filter(day=self._today()).update(**{field_name: F(field_name) + 1})
+        if buffer := get_stats_counters_buffer():
+            # Will be written to the database later, alongside other increments:
+            buffer.increment(day=self._today(), field_name=field_name)
+        else:
+            self.increment_counters(day=self._today(), increments={field_name: 1})
 
     @staticmethod
     def _today() -> "dt.date":
@@ -323,6 +348,8 @@ class PlayerGameOverState(enum.IntEnum):
 class PlayerGameState(
     msgspec.Struct,
     kw_only=True,  # type: ignore[call-arg]
+    # Fields that still have their default value don't need to be in the cookie:
+    omit_defaults=True,  # type: ignore[call-arg]
     rename={
         # Let's make the cookie content a bit shorter, with shorter field names
         "attempts_counter": "ac",
@@ -336,6 +363,7 @@ class PlayerGameState(
         "game_over": "go",
         "victory_turns_count": "vtc",
         "solution_index": "sol",
+        "undo_journal": "uj",
     },
 ):
     """
@@ -352,7 +380,8 @@ class PlayerGameState(
     # the number of turns for the current attempt:
     current_attempt_turns_counter: int
     fen: FEN
-    piece_role_by_square: PieceRoleBySquare
+    # Encoded as a 64-chars string - see `BoardRoles.encode()`:
+    piece_role_by_square: BoardRoles
     is_returning_player: bool = False
     # Each move is 4 more chars added there (UCI notation).
     # These are the moves *of the current attempt* only.
@@ -362,6 +391,12 @@ class PlayerGameState(
     victory_turns_count: int | None = None
     # is a half-move index when the player gave up to see the solution:
     solution_index: int | None = None
+    # What the latest half-moves changed, so they can be undone without having to
+    # replay the whole attempt. Each entry is an encoded `BoardRolesMove`, followed
+    # by a "|" and the fields of the previous FEN that come after the pieces placement.
+    undo_journal: list[str] = msgspec.field(default_factory=list)
+
+    UNDO_JOURNAL_MAX_LENGTH: ClassVar[int] = 2  # i.e. the last turn
 
     def replace(self, **kwargs) -> Self:
         return msgspec.structs.replace(self, **kwargs)
@@ -427,15 +462,220 @@ class PlayerSessionContent(
 ):
     """
     This is the whole content of the session cookie for the player.
+
+    It's written with the compact binary encoding of `_PlayerSessionContentV2`, but
+    the JSON cookies of the version 1 can still be decoded: they're upgraded the next
+    time they're saved.
     """
 
-    encoding_version: int = 1
+    COOKIE_ENCODING_VERSION: ClassVar[int] = 2
+
+    # The version of the encoding this content was decoded from:
+    encoding_version: int = COOKIE_ENCODING_VERSION
     games: dict[GameID, PlayerGameState]
     stats: PlayerStats
 
-    def to_cookie_content(self) -> str:
-        return msgspec.json.encode(self).decode()
+    def to_cookie_content(
+        self, *, encoding_version: int = COOKIE_ENCODING_VERSION
+    ) -> str:
+        if encoding_version == 1:
+            return _COOKIE_CONTENT_ENCODER.encode(
+                msgspec.structs.replace(self, encoding_version=1)
+            ).decode()
+        return _COOKIE_CONTENT_V2_PREFIX + base64.urlsafe_b64encode(
+            _COOKIE_CONTENT_V2_ENCODER.encode(
+                _PlayerSessionContentV2.from_content(self)
+            )
+        ).decode("ascii")
 
     @classmethod
     def from_cookie_content(cls, cookie_content: str) -> Self:
-        return msgspec.json.decode(cookie_content.encode(), type=cls)
+        if not cookie_content.startswith(_COOKIE_CONTENT_V2_PREFIX):
+            content = msgspec.json.decode(
+                cookie_content.encode(), type=cls, dec_hook=_cookie_content_dec_hook
+            )
+            content.encoding_version = 1
+            return content
+        try:
+            return cast(
+                Self,
+                _COOKIE_CONTENT_V2_DECODER.decode(
+                    base64.urlsafe_b64decode(
+                        cookie_content[len(_COOKIE_CONTENT_V2_PREFIX) :]
+                    )
+                ).to_content(),
+            )
+        except (ValueError, IndexError) as exc:
+            # (let's raise the same exception as when the JSON cookies are invalid)
+            raise msgspec.DecodeError(f"Invalid cookie content: {exc}") from exc
+
+
+def _cookie_content_enc_hook(obj: object) -> object:
+    if isinstance(obj, BoardRoles):
+        return obj.encode()
+    raise NotImplementedError(f"Objects of type {type(obj)} are not supported")
+
+
+def _cookie_content_dec_hook(type_: type, obj: object) -> object:
+    if type_ is BoardRoles:
+        if isinstance(obj, str):
+            return BoardRoles.decode(obj)
+        if isinstance(obj, dict):
+            # Cookies created before we had `BoardRoles` store a `PieceRoleBySquare`
+            # dict: they'll get the new encoding the next time they're saved.
+            try:
+                return BoardRoles.from_piece_role_by_square(obj)
+            except KeyError as exc:
+                raise ValueError(f"Invalid piece role by square: {obj}") from exc
+    raise NotImplementedError(f"Objects of type {type_} are not supported")
+
+
+_COOKIE_CONTENT_ENCODER = msgspec.json.Encoder(enc_hook=_cookie_content_enc_hook)
+
+
+# The version 2 of our cookie content encoding is a msgpack one, written by the
+# following structs - which are encoded as arrays, so field names don't take room.
+# The board roles and the moves are packed as bytes, and the pieces placement part of
+# the FEN is not stored, as it can be inferred from the board roles.
+# msgpack is binary, so it's encoded in Base64 - which, unlike JSON, doesn't have to
+# be escaped when it's stored in Django's JSON session.
+# ⚠️ Fields can only be appended at the end of these structs, with default values.
+
+_COOKIE_CONTENT_V2_PREFIX = "2:"
+_SQUARE_INDEXES = {square: index for index, square in enumerate(chess.SQUARE_NAMES)}
+
+
+class _PlayerGameStateV2(msgspec.Struct, array_like=True):  # type: ignore[call-arg]
+    attempts_counter: int
+    turns_counter: int
+    current_attempt_turns_counter: int
+    # Only the FEN fields that come after the pieces placement - unless the latter
+    # doesn't match the board roles, in which case this is the full FEN:
+    fen: str
+    piece_roles: bytes  # see `BoardRoles.pack()`
+    moves: bytes  # 2 square indexes per move
+    is_returning_player: bool
+    undo_used: bool
+    game_over: int
+    victory_turns_count: int | None
+    solution_index: int | None
+    undo_journal: list[str]
+
+    @classmethod
+    def from_game_state(cls, game_state: PlayerGameState) -> Self:
+        board_fen, fen_suffix = game_state.fen.split(" ", 1)
+        moves = game_state.moves
+        return cls(
+            attempts_counter=game_state.attempts_counter,
+            turns_counter=game_state.turns_counter,
+            current_attempt_turns_counter=game_state.current_attempt_turns_counter,
+            fen=(
+                fen_suffix
+                if board_fen == game_state.piece_role_by_square.board_fen()
+                else game_state.fen
+            ),
+            piece_roles=game_state.piece_role_by_square.pack(),
+            moves=bytes(
+                [_SQUARE_INDEXES[moves[i : i + 2]] for i in range(0, len(moves), 2)]
+            ),
+            is_returning_player=game_state.is_returning_player,
+            undo_used=game_state.undo_used,
+            game_over=game_state.game_over,
+            victory_turns_count=game_state.victory_turns_count,
+            solution_index=game_state.solution_index,
+            undo_journal=game_state.undo_journal,
+        )
+
+    def to_game_state(self) -> PlayerGameState:
+        piece_role_by_square = BoardRoles.unpack(self.piece_roles)
+        return PlayerGameState(
+            attempts_counter=self.attempts_counter,
+            turns_counter=self.turns_counter,
+            current_attempt_turns_counter=self.current_attempt_turns_counter,
+            fen=cast(
+                FEN,
+                self.fen
+                if "/" in self.fen
+                else f"{piece_role_by_square.board_fen()} {self.fen}",
+            ),
+            piece_role_by_square=piece_role_by_square,
+            is_returning_player=self.is_returning_player,
+            moves="".join(chess.SQUARE_NAMES[index] for index in self.moves),
+            undo_used=self.undo_used,
+            game_over=PlayerGameOverState(self.game_over),
+            victory_turns_count=self.victory_turns_count,
+            solution_index=self.solution_index,
+            undo_journal=self.undo_journal,
+        )
+
+
+class _PlayerStatsV2(msgspec.Struct, array_like=True):  # type: ignore[call-arg]
+    games_count: int
+    win_count: int
+    current_streak: int
+    max_streak: int
+    # Dates are stored as their proleptic Gregorian ordinal:
+    last_played: int | None
+    last_won: int | None
+    # The counts of the `WinsDistributionSlice`s, in order:
+    wins_distribution: list[int]
+
+    @classmethod
+    def from_stats(cls, stats: PlayerStats) -> Self:
+        return cls(
+            games_count=stats.games_count,
+            win_count=stats.win_count,
+            current_streak=stats.current_streak,
+            max_streak=stats.max_streak,
+            last_played=stats.last_played.toordinal() if stats.last_played else None,
+            last_won=stats.last_won.toordinal() if stats.last_won else None,
+            wins_distribution=[
+                count for _, count in sorted(stats.wins_distribution.items())
+            ],
+        )
+
+    def to_stats(self) -> PlayerStats:
+        return PlayerStats(
+            games_count=self.games_count,
+            win_count=self.win_count,
+            current_streak=self.current_streak,
+            max_streak=self.max_streak,
+            last_played=(
+                dt.date.fromordinal(self.last_played) if self.last_played else None
+            ),
+            last_won=dt.date.fromordinal(self.last_won) if self.last_won else None,
+            wins_distribution=cast(
+                WinsDistribution, dict(enumerate(self.wins_distribution, start=1))
+            ),
+        )
+
+
+class _PlayerSessionContentV2(msgspec.Struct, array_like=True):  # type: ignore[call-arg]
+    encoding_version: int
+    games: dict[GameID, _PlayerGameStateV2]
+    stats: _PlayerStatsV2
+
+    @classmethod
+    def from_content(cls, content: PlayerSessionContent) -> Self:
+        return cls(
+            encoding_version=2,
+            games={
+                game_id: _PlayerGameStateV2.from_game_state(game_state)
+                for game_id, game_state in content.games.items()
+            },
+            stats=_PlayerStatsV2.from_stats(content.stats),
+        )
+
+    def to_content(self) -> PlayerSessionContent:
+        return PlayerSessionContent(
+            encoding_version=self.encoding_version,
+            games={
+                game_id: game_state.to_game_state()
+                for game_id, game_state in self.games.items()
+            },
+            stats=self.stats.to_stats(),
+        )
+
+
+_COOKIE_CONTENT_V2_ENCODER = msgspec.msgpack.Encoder()
+_COOKIE_CONTENT_V2_DECODER = msgspec.msgpack.Decoder(_PlayerSessionContentV2)
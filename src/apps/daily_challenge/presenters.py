@@ -2,10 +2,12 @@ from functools import cached_property
 from typing import TYPE_CHECKING
 from urllib.parse import urlencode
 
+from django.conf import settings
 from django.urls import reverse
 
 from apps.chess.helpers import uci_move_squares
 from apps.chess.presenters import GamePresenter, GamePresenterUrls
+from apps.chess.server_bot import get_server_bot
 
 from .business_logic import get_speech_bubble
 
@@ -118,6 +120,14 @@ class DailyChallengeGamePresenter(GamePresenter):
         # for the delayed HTMX request to play the bot's move.
         return self.is_player_turn and not self.is_game_over
 
+    @property
+    def server_side_bot(self) -> bool:
+        return get_server_bot() is not None
+
+    @property
+    def client_side_piece_selection(self) -> bool:
+        return settings.DAILY_CHALLENGE_CLIENT_SIDE_PIECE_SELECTION
+
     @cached_property
     def is_player_turn(self) -> bool:
         return self.active_player_side != self._challenge.bot_side
@@ -221,6 +231,24 @@ class DailyChallengeGamePresenterUrls(GamePresenterUrls):
             )
         )
 
+    def htmx_game_move_piece_url_pattern(self, *, board_id: str) -> str:
+        return "".join(
+            (
+                # Same placeholders as our bot moves' URL pattern:
+                reverse(
+                    "daily_challenge:htmx_game_move_piece",
+                    kwargs={
+                        "from_": "a1",
+                        "to": "a2",
+                    },
+                )
+                .replace("a1", "<from>")
+                .replace("a2", "<to>"),
+                "?",
+                urlencode({"board_id": board_id}),
+            )
+        )
+
     def htmx_game_play_bot_move_url(self, *, board_id: str) -> str:
         return "".join(
             (
@@ -241,6 +269,15 @@ class DailyChallengeGamePresenterUrls(GamePresenterUrls):
             )
         )
 
+    def htmx_game_play_server_bot_move_url(self, *, board_id: str) -> str:
+        return "".join(
+            (
+                reverse("daily_challenge:htmx_game_server_bot_move"),
+                "?",
+                urlencode({"board_id": board_id}),
+            )
+        )
+
     def htmx_game_play_solution_move_url(self, *, board_id: str) -> str:
         return "".join(
             (
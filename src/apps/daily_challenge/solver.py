@@ -0,0 +1,196 @@
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+import chess
+
+from apps.chess.server_bot import compute_bot_move
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from apps.chess.server_bot import ServerBotEngine
+    from apps.chess.types import FEN
+
+    SolutionOutcome = Literal[
+        "solved", "player_lost", "draw", "too_many_turns", "out_of_time"
+    ]
+
+# The "solve!" command of the Django Admin plays the challenges in the browser, with
+# Stockfish WASM. This is the server-side alternative: our bundled Python engines play
+# both sides, the bot at its `bot_depth` and the player at `player_simulated_depth`,
+# until the bot is checkmated.
+# N.B. This module runs in our worker processes: it must stay free of Django-related
+# stuff.
+
+# Same as in "admin_game_preview.js": we want the daily challenges to be short enough.
+SOLUTION_TURNS_COUNT_MAX = 15
+
+# The positions we already computed a move for, by (engine, FEN, depth): puzzles
+# imported from the same source often share positions, and re-solving a challenge
+# after having tweaked its depths replays the same ones.
+_MOVES_CACHE_MAX_SIZE = 20_000
+_moves_cache: OrderedDict[tuple["ServerBotEngine", "FEN", int], str] = OrderedDict()
+
+
+class SolverTask(NamedTuple):
+    challenge_id: int
+    fen: "FEN"
+    bot_depth: int
+    player_depth: int
+
+
+class ChallengeSolution(NamedTuple):
+    challenge_id: int
+    outcome: "SolutionOutcome"
+    moves: tuple[str, ...]
+    elapsed: float  # seconds
+
+    @property
+    def is_solved(self) -> bool:
+        return self.outcome == "solved"
+
+    @property
+    def solution(self) -> str:
+        """A comma-separated list of UCI moves, as `DailyChallenge.solution` wants it."""
+        return ",".join(self.moves)
+
+    @property
+    def turns_count(self) -> int:
+        """The number of moves of the player - who plays first."""
+        return (len(self.moves) + 1) // 2
+
+
+def solve_challenge(
+    task: SolverTask,
+    *,
+    engine: "ServerBotEngine" = "andoma",
+    time_budget: float = 60.0,
+    move_time_budget: float = 5.0,
+    nodes_budget: int = 1_000_000,
+) -> ChallengeSolution:
+    """
+    Plays the challenge from its starting position, where it's the player's turn.
+    `time_budget` is the budget of the whole solution, `move_time_budget` the one of
+    each move - both in seconds. The engines stop their search at the deepest depth
+    they completed within their budget, so they should be generous enough for the
+    searches to reach the requested depths.
+    """
+    start = time.monotonic()
+    deadline = start + time_budget
+    board = chess.Board(task.fen)
+    moves: list[str] = []
+
+    def solution(outcome: "SolutionOutcome") -> ChallengeSolution:
+        return ChallengeSolution(
+            challenge_id=task.challenge_id,
+            outcome=outcome,
+            moves=tuple(moves),
+            elapsed=time.monotonic() - start,
+        )
+
+    while True:
+        if (outcome := board.outcome(claim_draw=True)) is not None:
+            if outcome.winner is None:
+                return solution("draw")
+            return solution(
+                "solved" if outcome.winner == chess.WHITE else "player_lost"
+            )
+        is_player_turn = board.turn == chess.WHITE
+        if is_player_turn and len(moves) // 2 >= SOLUTION_TURNS_COUNT_MAX:
+            return solution("too_many_turns")
+        if (remaining_time := deadline - time.monotonic()) <= 0:
+            return solution("out_of_time")
+
+        move = _get_move(
+            engine=engine,
+            fen=board.fen(),
+            depth=task.player_depth if is_player_turn else task.bot_depth,
+            time_budget=min(move_time_budget, remaining_time),
+            nodes_budget=nodes_budget,
+            # (a move searched with what was left of the solution's budget may be a
+            # shallower one: let's not serve it to the next solutions)
+            cache_move=remaining_time >= move_time_budget,
+        )
+        _push_uci_move(board, move)
+        moves.append(move)
+
+
+def solve_challenges(
+    tasks: "Sequence[SolverTask]",
+    *,
+    workers: int,
+    engine: "ServerBotEngine" = "andoma",
+    time_budget: float = 60.0,
+    move_time_budget: float = 5.0,
+    nodes_budget: int = 1_000_000,
+) -> "Iterator[ChallengeSolution]":
+    """
+    Solves the challenges in a pool of `workers` processes, yielding the solutions
+    as soon as they're found - i.e. not in the order of `tasks`.
+    With 0 `workers`, they are solved one after the other in the calling thread.
+    """
+    solve = partial(
+        solve_challenge,
+        engine=engine,
+        time_budget=time_budget,
+        move_time_budget=move_time_budget,
+        nodes_budget=nodes_budget,
+    )
+    if workers < 1:
+        yield from map(solve, tasks)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [executor.submit(solve, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _get_move(
+    *,
+    engine: "ServerBotEngine",
+    fen: "FEN",
+    depth: int,
+    time_budget: float,
+    nodes_budget: int,
+    cache_move: bool = True,
+) -> str:
+    key = (engine, fen, depth)
+    if (move := _moves_cache.get(key)) is not None:
+        _moves_cache.move_to_end(key)
+        return move
+
+    move = compute_bot_move(
+        engine=engine,
+        fen=fen,
+        depth=depth,
+        time_budget=time_budget,
+        nodes_budget=nodes_budget,
+    )
+    if not cache_move:
+        return move
+    _moves_cache[key] = move
+    while len(_moves_cache) > _MOVES_CACHE_MAX_SIZE:
+        _moves_cache.popitem(last=False)
+    return move
+
+
+def _push_uci_move(board: chess.Board, move_uci: str) -> None:
+    # Our moves don't mention promotions: like in the game, pawns become queens.
+    move = chess.Move.from_uci(move_uci)
+    piece = board.piece_at(move.from_square)
+    if (
+        piece is not None
+        and piece.piece_type == chess.PAWN
+        and chess.square_rank(move.to_square) in (0, 7)
+    ):
+        move.promotion = chess.QUEEN
+    if move not in board.legal_moves:
+        raise ValueError(f"Illegal move '{move_uci}' for FEN '{board.fen()}'")
+    board.push(move)
@@ -0,0 +1,157 @@
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+from functools import cache
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.contrib.sessions.backends import signed_cookies
+from django.contrib.sessions.backends.base import CreateError, SessionBase, UpdateError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# A Django session engine - see `SESSION_ENGINE` - that keeps the sessions in a local
+# SQLite file, so that the players' cookie only holds a short opaque session key.
+# With the default "signed_cookies" engine, the whole player state travels with each
+# request and response, and has to be signed and verified every time.
+#
+# The sessions expire after `SESSION_COOKIE_AGE` seconds without being saved, like
+# the signed cookies do; the `clearsessions` Django command deletes the expired ones.
+# The players who still have a signed cookie keep their state: it's moved to the
+# SQLite file, under a new session key, the first time we load their session.
+
+
+class SessionStore(SessionBase):
+    def load(self) -> dict:
+        if self.session_key is not None and _is_signed_cookie(self.session_key):
+            return self._load_from_signed_cookie()
+
+        with _get_sessions_database(settings.SESSION_SQLITE_PATH).transaction() as db:
+            row = db.execute(
+                "SELECT data FROM sessions WHERE key = ? AND expires_at > ?",
+                (self.session_key, int(time.time())),
+            ).fetchone()
+        if row is None:
+            # Unknown or expired: the player will get a new session key
+            self._session_key = None
+            return {}
+        try:
+            return self.serializer().loads(row[0])
+        except ValueError:
+            self._session_key = None
+            return {}
+
+    def exists(self, session_key: str) -> bool:
+        with _get_sessions_database(settings.SESSION_SQLITE_PATH).transaction() as db:
+            row = db.execute(
+                "SELECT 1 FROM sessions WHERE key = ?", (session_key,)
+            ).fetchone()
+        return row is not None
+
+    def create(self) -> None:
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue  # key collision: let's try another one
+            self.modified = True
+            return
+
+    def save(self, must_create: bool = False) -> None:
+        if self.session_key is None:
+            return self.create()
+        data = self.serializer().dumps(self._get_session(no_load=must_create))
+        expires_at = int(time.time()) + self.get_expiry_age()
+        with _get_sessions_database(settings.SESSION_SQLITE_PATH).transaction() as db:
+            if must_create:
+                try:
+                    db.execute(
+                        "INSERT INTO sessions (key, data, expires_at) VALUES (?, ?, ?)",
+                        (self.session_key, data, expires_at),
+                    )
+                except sqlite3.IntegrityError as exc:
+                    raise CreateError from exc
+            else:
+                cursor = db.execute(
+                    "UPDATE sessions SET data = ?, expires_at = ? WHERE key = ?",
+                    (data, expires_at, self.session_key),
+                )
+                if cursor.rowcount == 0:
+                    # (deleted by another request in the meantime)
+                    raise UpdateError
+
+    def delete(self, session_key: str | None = None) -> None:
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        with _get_sessions_database(settings.SESSION_SQLITE_PATH).transaction() as db:
+            db.execute("DELETE FROM sessions WHERE key = ?", (session_key,))
+
+    @classmethod
+    def clear_expired(cls) -> None:
+        with _get_sessions_database(settings.SESSION_SQLITE_PATH).transaction() as db:
+            db.execute(
+                "DELETE FROM sessions WHERE expires_at <= ?", (int(time.time()),)
+            )
+
+    def _load_from_signed_cookie(self) -> dict:
+        session_data = signed_cookies.SessionStore(self.session_key).load()
+        # The session will be saved in our SQLite file under a new key, and the
+        # player will get a short cookie in exchange of their signed one:
+        self._session_key = None
+        self.modified = bool(session_data)
+        return session_data
+
+
+class _SessionsDatabase:
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS sessions (
+            key TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            expires_at INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._connection_pid: int | None = None
+
+    @contextlib.contextmanager
+    def transaction(self) -> "Iterator[sqlite3.Connection]":
+        with self._lock, self._connect() as connection:
+            yield connection
+
+    def _connect(self) -> sqlite3.Connection:
+        # Same as our `SQLiteMoveResultsCache`: SQLite connections must not be shared
+        # across a `fork()`, so we (re)open the connection lazily in each process.
+        if self._connection is None or self._connection_pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=5, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in self._SCHEMA:
+                connection.execute(statement)
+            connection.isolation_level = "DEFERRED"
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+
+@cache
+def _get_sessions_database(path: str) -> _SessionsDatabase:
+    return _SessionsDatabase(path)
+
+
+def _is_signed_cookie(session_key: str) -> bool:
+    # Our session keys are made of lowercase letters and digits, while the
+    # "signed_cookies" engine's ones have ":"-separated timestamp and signature.
+    return ":" in session_key
@@ -0,0 +1,133 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from functools import cache
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.db import connections
+
+if TYPE_CHECKING:
+    import datetime as dt
+    from collections.abc import Callable
+
+    FlushFunction = Callable[[dt.date, dict[str, int]], None]
+
+_logger = logging.getLogger(__name__)
+
+# Each player action increments a DailyChallengeStats counter: rather than having
+# each of them hit SQLite's write lock, our workers aggregate these increments in
+# memory and write them in batches.
+
+
+class StatsCountersBuffer:
+    """
+    Aggregates counters increments in memory, and flushes them (with a single call
+    to `flush_function` per day) when one of these happens:
+    - `flush_threshold` increments are pending
+    - every `flush_interval` seconds, from a background thread
+    - when the process exits: a Gunicorn worker recycled because of `--max-requests`
+      (or stopped gracefully) exits via `sys.exit()`, which runs `atexit` handlers.
+    """
+
+    def __init__(
+        self,
+        *,
+        flush_function: "FlushFunction",
+        flush_interval: float = 10.0,
+        flush_threshold: int = 50,
+    ):
+        self.flush_function = flush_function
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: defaultdict[dt.date, Counter[str]] = defaultdict(Counter)
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer_thread: threading.Thread | None = None
+        self._timer_thread_pid: int | None = None
+        self._closed = threading.Event()
+        atexit.register(self.close)
+
+    def increment(self, *, day: "dt.date", field_name: str, increment: int = 1) -> None:
+        with self._lock:
+            self._pending[day][field_name] += increment
+            self._pending_count += increment
+            should_flush = self._pending_count >= self.flush_threshold
+
+        if should_flush:
+            self.flush()
+        else:
+            self._start_timer_thread_if_needed()
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    def flush(self) -> None:
+        # Flushes don't overlap, so the counters of a given day are always written
+        # in the order they were incremented:
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, defaultdict(Counter)
+                self._pending_count = 0
+
+            for day, increments in sorted(pending.items()):
+                try:
+                    self.flush_function(day, dict(increments))
+                except Exception:
+                    _logger.exception(
+                        "Could not flush stats counters for %s; will retry later.", day
+                    )
+                    # Let's not lose these increments:
+                    with self._lock:
+                        self._pending[day].update(increments)
+                        self._pending_count += increments.total()
+
+    def close(self) -> None:
+        self._closed.set()
+        self.flush()
+
+    def _start_timer_thread_if_needed(self) -> None:
+        # (threads don't survive a `fork()`, so each process has its own)
+        if self._timer_thread_pid == os.getpid() or self._closed.is_set():
+            return
+        with self._lock:
+            if self._timer_thread_pid == os.getpid():
+                return
+            self._timer_thread = threading.Thread(
+                target=self._timer_loop, name="stats-counters-flush", daemon=True
+            )
+            self._timer_thread_pid = os.getpid()
+        self._timer_thread.start()
+
+    def _timer_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            if not self._pending_count:
+                continue
+            try:
+                self.flush()
+            finally:
+                # This thread has its own database connection: let's not keep it open
+                connections.close_all()
+
+
+def _flush_to_database(day: "dt.date", increments: dict[str, int]) -> None:
+    from .models import DailyChallengeStats
+
+    DailyChallengeStats.objects.increment_counters(day=day, increments=increments)
+
+
+@cache
+def get_stats_counters_buffer() -> StatsCountersBuffer | None:
+    """Returns None if the stats counters are not buffered."""
+    config = settings.DAILY_CHALLENGE_STATS_COUNTERS_BUFFER
+    if not config["ENABLED"]:
+        return None
+    return StatsCountersBuffer(
+        flush_function=_flush_to_database,
+        flush_interval=config["FLUSH_INTERVAL"],
+        flush_threshold=config["FLUSH_THRESHOLD"],
+    )
@@ -0,0 +1,112 @@
+from typing import TYPE_CHECKING
+
+import pytest
+import time_machine
+
+from ...business_logic import (
+    get_current_daily_challenge,
+    warm_up_current_daily_challenge_cache,
+)
+from ...models import DailyChallenge, DailyChallengeStatus
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_django import DjangoAssertNumQueries
+
+
+@pytest.fixture
+def challenges(challenge_minimalist: DailyChallenge) -> dict[str, DailyChallenge]:
+    def clone(lookup_key: str) -> DailyChallenge:
+        challenge = DailyChallenge.objects.get(pk=challenge_minimalist.pk)
+        challenge.pk = None
+        challenge.lookup_key = lookup_key
+        challenge.source = f"test-{lookup_key}"
+        challenge.save()
+        return challenge
+
+    return {
+        # (our migrations already created a fallback challenge)
+        "fallback": DailyChallenge.objects.get(lookup_key="fallback"),
+        "2024-01-01": clone("2024-01-01"),
+        "01-02": clone("01-02"),
+    }
+
+
+@pytest.mark.django_db
+def test_current_daily_challenge_is_resolved_once_per_day(
+    challenges: dict[str, DailyChallenge],
+    django_assert_num_queries: "DjangoAssertNumQueries",
+):
+    with time_machine.travel("2024-01-01 23:59:59Z", tick=False) as traveller:
+        with django_assert_num_queries(1):
+            assert get_current_daily_challenge() == challenges["2024-01-01"]
+        with django_assert_num_queries(0):
+            assert get_current_daily_challenge() == challenges["2024-01-01"]
+
+        # Midnight, UTC: it's time to fetch the new day's challenge
+        traveller.shift(1)
+        with django_assert_num_queries(2):
+            assert get_current_daily_challenge() == challenges["01-02"]
+        with django_assert_num_queries(0):
+            assert get_current_daily_challenge() == challenges["01-02"]
+
+        traveller.shift(24 * 3600)
+        with django_assert_num_queries(3):
+            assert get_current_daily_challenge() == challenges["fallback"]
+
+
+@pytest.mark.django_db
+def test_current_daily_challenge_cache_is_cleared_when_challenges_change(
+    challenges: dict[str, DailyChallenge],
+    django_assert_num_queries: "DjangoAssertNumQueries",
+):
+    with time_machine.travel("2024-01-02 12:00:00Z", tick=False):
+        warm_up_current_daily_challenge_cache()
+        with django_assert_num_queries(0):
+            assert get_current_daily_challenge() == challenges["01-02"]
+
+        # An admin unpublishes today's challenge:
+        challenges["01-02"].status = DailyChallengeStatus.PENDING  # type: ignore[assignment]
+        challenges["01-02"].save()
+        assert get_current_daily_challenge() == challenges["fallback"]
+
+        # ...and then publishes another one:
+        challenge_for_today = challenges.pop("2024-01-01")
+        challenge_for_today.lookup_key = "2024-01-02"
+        challenge_for_today.save()
+        assert get_current_daily_challenge() == challenge_for_today
+
+        # Deletions are taken into account too:
+        challenge_for_today.delete()
+        assert get_current_daily_challenge() == challenges["fallback"]
+
+
+@pytest.mark.django_db
+def test_current_daily_challenge_cache_is_cleared_by_other_processes(
+    challenges: dict[str, DailyChallenge],
+    django_assert_num_queries: "DjangoAssertNumQueries",
+    settings,
+    tmp_path: "Path",
+):
+    version_stamp_path = tmp_path / "daily_challenges.version"
+    settings.DAILY_CHALLENGE_VERSION_STAMP_PATH = str(version_stamp_path)
+
+    with time_machine.travel("2024-01-02 12:00:00Z", tick=False):
+        warm_up_current_daily_challenge_cache()
+
+        # Another process unpublishes today's challenge...
+        DailyChallenge.objects.filter(pk=challenges["01-02"].pk).update(
+            status=DailyChallengeStatus.PENDING
+        )
+        # (this process doesn't know about it yet)
+        with django_assert_num_queries(0):
+            assert get_current_daily_challenge() == challenges["01-02"]
+
+        # ...and bumps the version stamp, like our post_save signal does:
+        other_process_stamp_path = tmp_path / "other_process.tmp"
+        other_process_stamp_path.write_text("2024-01-02 12:00:00")
+        other_process_stamp_path.replace(version_stamp_path)
+        assert get_current_daily_challenge() == challenges["fallback"]
+        with django_assert_num_queries(0):
+            assert get_current_daily_challenge() == challenges["fallback"]
@@ -0,0 +1,112 @@
+import textwrap
+
+import msgspec
+import pytest
+
+from apps.chess.board_roles import BoardRoles
+from apps.chess.helpers import uci_move_squares
+
+from ...business_logic import (
+    move_daily_challenge_piece,
+    set_daily_challenge_teams_and_pieces_roles,
+)
+from ...business_logic._undo_last_move import (
+    _undo_last_turn_by_replaying_moves,
+    undo_last_move,
+)
+from ...models import DailyChallenge, PlayerGameState
+
+# A position where both sides can castle, capture en passant and promote pawns:
+#   a b c d e f g h
+# 8 r . . . k . . r
+# 7 . . . . . . P .
+# 6 . . . . . . . .
+# 5 . . . p P . . .
+# 4 . . . . . . . .
+# 3 . . . . . . . .
+# 2 . p . . . . . .
+# 1 R . . . K . . R
+_FEN = "r3k2r/6P1/8/3pP3/8/8/1p6/R3K2R w KQkq d6 0 2"
+_BOT_FIRST_MOVE = "d7d5"
+
+_MOVES = (
+    "e5d6",  # en passant
+    "e8c8",  # castling, "b" side
+    "e1g1",  # castling, "w" side
+    "b2a1",  # promotion with a capture, "b" side
+    "g7h8",  # promotion with a capture, "w" side
+    "c8b7",
+    "h8d8",  # capture
+    "a1a2",
+)
+
+
+@pytest.fixture
+def challenge() -> DailyChallenge:
+    teams, piece_role_by_square = set_daily_challenge_teams_and_pieces_roles(fen=_FEN)
+    return DailyChallenge(
+        fen=_FEN, teams=teams, piece_role_by_square=piece_role_by_square
+    )
+
+
+def _play_moves(challenge: DailyChallenge, moves: str) -> PlayerGameState:
+    assert challenge.piece_role_by_square
+    game_state = PlayerGameState(
+        attempts_counter=0,
+        turns_counter=0,
+        current_attempt_turns_counter=0,
+        fen=challenge.fen,
+        piece_role_by_square=BoardRoles.from_piece_role_by_square(
+            challenge.piece_role_by_square
+        ),
+        moves=_BOT_FIRST_MOVE,
+    )
+    for i, move_uci in enumerate(textwrap.wrap(moves, width=4)):
+        from_, to = uci_move_squares(move_uci)
+        move_daily_challenge_piece(
+            game_state=game_state, from_=from_, to=to, is_my_side=i % 2 == 0
+        )
+    return game_state
+
+
+@pytest.mark.parametrize("turns_count", range(1, len(_MOVES) // 2 + 1))
+def test_undo_from_journal_matches_undo_by_replaying_moves(
+    challenge: DailyChallenge, turns_count: int
+):
+    moves = "".join(_MOVES[: turns_count * 2])
+
+    game_state_undone_from_journal = undo_last_move(
+        challenge=challenge,
+        game_state=_play_moves(challenge, moves),
+        is_staff_user=True,
+    )
+    game_state_undone_by_replay = _play_moves(challenge, moves)
+    _undo_last_turn_by_replaying_moves(
+        challenge=challenge, game_state=game_state_undone_by_replay
+    )
+    game_state_undone_by_replay.undo_used = True
+
+    # The undo journals don't have the same content, but the rest must be identical:
+    assert msgspec.structs.replace(
+        game_state_undone_from_journal, undo_journal=[]
+    ) == msgspec.structs.replace(game_state_undone_by_replay, undo_journal=[])
+    # ...and we're back to the state we had one turn earlier:
+    game_state_one_turn_earlier = _play_moves(challenge, moves[:-8])
+    assert game_state_undone_from_journal.fen == game_state_one_turn_earlier.fen
+    assert (
+        game_state_undone_from_journal.piece_role_by_square
+        == game_state_one_turn_earlier.piece_role_by_square
+    )
+
+
+def test_undo_without_journal_replays_moves(challenge: DailyChallenge):
+    moves = "".join(_MOVES[:4])
+    game_state = _play_moves(challenge, moves)
+    # i.e. a cookie created before we had an undo journal:
+    game_state.undo_journal = []
+
+    undo_last_move(challenge=challenge, game_state=game_state, is_staff_user=True)
+
+    assert game_state.fen == _play_moves(challenge, moves[:-8]).fen
+    assert game_state.moves == f"{_BOT_FIRST_MOVE}{moves[:-8]}"
+    assert game_state.undo_used
@@ -1,5 +1,9 @@
+from typing import TYPE_CHECKING, TypedDict
+
 import pytest
 
+from apps.chess.board_roles import BoardRoles
+
 from ..models import (
     DailyChallenge,
     DailyChallengeStatus,
@@ -7,7 +11,16 @@ from ..models import (
     PlayerGameState,
 )
 
-_MINIMALIST_GAME = {
+if TYPE_CHECKING:
+    from apps.chess.types import FEN, PieceRoleBySquare
+
+
+class _GameData(TypedDict):
+    fen: "FEN"
+    piece_role_by_square: "PieceRoleBySquare"
+
+
+_MINIMALIST_GAME: _GameData = {
     "fen": "k7/pp3Q2/7p/8/8/8/7B/K7 w - - 0 2",
     "piece_role_by_square": {
         "a8": "k",
@@ -21,6 +34,24 @@ _MINIMALIST_GAME = {
 }
 
 
+@pytest.fixture(autouse=True)
+def cleared_current_daily_challenge_cache():
+    from ..business_logic import clear_current_daily_challenge_cache
+
+    # The database is rolled back after each test, but our per-process cache isn't:
+    clear_current_daily_challenge_cache()
+    yield
+    clear_current_daily_challenge_cache()
+
+
+@pytest.fixture(autouse=True)
+def cleared_fragments_render_cache():
+    from ..components.fragments_render_cache import get_fragments_render_cache
+
+    if (render_cache := get_fragments_render_cache()) is not None:
+        render_cache.clear()
+
+
 @pytest.fixture
 def cleared_django_cache():
     from django.core.cache import cache
@@ -125,8 +156,10 @@ def player_game_state_minimalist() -> PlayerGameState:
         attempts_counter=0,
         turns_counter=0,
         current_attempt_turns_counter=0,
-        fen=_MINIMALIST_GAME["fen"],  # type: ignore
-        piece_role_by_square=_MINIMALIST_GAME["piece_role_by_square"],  # type: ignore
+        fen=_MINIMALIST_GAME["fen"],
+        piece_role_by_square=BoardRoles.from_piece_role_by_square(
+            _MINIMALIST_GAME["piece_role_by_square"]
+        ),
         moves="",
         game_over=PlayerGameOverState.PLAYING,
     )
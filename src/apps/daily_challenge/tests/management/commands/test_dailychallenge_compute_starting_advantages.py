@@ -0,0 +1,133 @@
+import sys
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from apps.chess.consts import MATE_SCORE
+from apps.chess.uci_engine_pool import get_uci_engine_pool
+from apps.daily_challenge.models import DailyChallenge, DailyChallengeStatus
+
+_FAKE_UCI_ENGINE_COMMAND = [
+    sys.executable,
+    str(Path(__file__).parents[4] / "chess" / "tests" / "fake_uci_engine.py"),
+]
+
+# The white player has an extra rook on this one:
+_WHITE_ADVANTAGE_FEN = "4k3/8/8/8/8/8/8/R3K3 w - - 0 1"
+
+
+@pytest.fixture
+def fake_uci_engine(settings):
+    settings.STOCKFISH_PATH = _FAKE_UCI_ENGINE_COMMAND
+    get_uci_engine_pool.cache_clear()
+    yield
+    get_uci_engine_pool().close()
+    get_uci_engine_pool.cache_clear()
+
+
+def _create_challenges() -> list[DailyChallenge]:
+    # (our migrations create a pending "fallback" challenge: let's get rid of it)
+    DailyChallenge.objects.all().delete()
+    return [
+        DailyChallenge.objects.create(source="to-score-1", fen=_WHITE_ADVANTAGE_FEN),
+        DailyChallenge.objects.create(source="to-score-2", fen=_WHITE_ADVANTAGE_FEN),
+        DailyChallenge.objects.create(source="to-score-3", fen=_WHITE_ADVANTAGE_FEN),
+        DailyChallenge.objects.create(
+            source="already-scored", fen=_WHITE_ADVANTAGE_FEN, starting_advantage=12
+        ),
+        DailyChallenge.objects.create(
+            source="published",
+            fen=_WHITE_ADVANTAGE_FEN,
+            status=DailyChallengeStatus.PUBLISHED,
+        ),
+    ]
+
+
+def _starting_advantages() -> dict[str, int | None]:
+    return dict(DailyChallenge.objects.values_list("source", "starting_advantage"))
+
+
+@pytest.mark.django_db
+def test_scores_pending_challenges_with_an_uci_engine(fake_uci_engine):
+    _create_challenges()
+
+    stdout = StringIO()
+    call_command(
+        "dailychallenge_compute_starting_advantages",
+        "--engine=uci",
+        "--workers=2",
+        "--batch-size=2",
+        stdout=stdout,
+    )
+
+    assert _starting_advantages() == {
+        "to-score-1": 500,
+        "to-score-2": 500,
+        "to-score-3": 500,
+        "already-scored": 12,
+        "published": None,
+    }
+    assert "Scored 3 DailyChallenges" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_can_be_resumed(fake_uci_engine):
+    _create_challenges()
+
+    call_command(
+        "dailychallenge_compute_starting_advantages",
+        "--engine=uci",
+        "--stop-after=1",
+        stdout=StringIO(),
+    )
+    assert _starting_advantages()["to-score-1"] == 500
+    assert _starting_advantages()["to-score-2"] is None
+
+    stdout = StringIO()
+    call_command(
+        "dailychallenge_compute_starting_advantages", "--engine=uci", stdout=stdout
+    )
+    assert _starting_advantages()["to-score-3"] == 500
+    assert "Scored 2 DailyChallenges" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_scores_pending_challenges_with_andoma():
+    _create_challenges()
+
+    call_command(
+        "dailychallenge_compute_starting_advantages",
+        "--engine=andoma",
+        "--andoma-depth=1",
+        "--workers=1",
+        stdout=StringIO(),
+    )
+
+    starting_advantages = _starting_advantages()
+    for source in ("to-score-1", "to-score-2", "to-score-3"):
+        # (andoma's evaluation also takes the pieces' positions into account)
+        assert 400 < starting_advantages[source] < 600
+    assert starting_advantages["published"] is None
+
+
+@pytest.mark.django_db
+def test_mates_get_a_bounded_score():
+    _create_challenges()
+    DailyChallenge.objects.filter(source="already-scored").update(
+        # White mates in 1 - that used to be stored as a 0 advantage:
+        fen="k7/8/1K6/8/8/8/8/6Q1 w - - 0 1",
+        starting_advantage=0,
+    )
+
+    call_command(
+        "dailychallenge_compute_starting_advantages",
+        "--engine=andoma",
+        "--andoma-depth=2",
+        "--workers=1",
+        "--rescore-zeros",
+        stdout=StringIO(),
+    )
+
+    assert _starting_advantages()["already-scored"] == MATE_SCORE - 1
@@ -1,9 +1,19 @@
+import shutil
+import subprocess
+from io import StringIO
+from typing import TYPE_CHECKING
+
 import pytest
+from django.core.management import call_command
 
-from apps.daily_challenge.management.commands.dailychallenge_create_from_lichess_puzzles_csv import (
+from apps.daily_challenge.lichess_puzzles import (
     BotFirstMoveAndResultingFen,
     get_bot_first_move_and_resulting_fen,
 )
+from apps.daily_challenge.models import DailyChallenge
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 @pytest.mark.parametrize(
@@ -38,3 +48,93 @@ def test_get_bot_first_move_and_resulting_fen(
     lichess_csv_row = {"FEN": lichess_puzzle_fen, "Moves": lichess_puzzle_moves}
     result = get_bot_first_move_and_resulting_fen(lichess_csv_row)
     assert result == expected_result
+
+
+_LICHESS_PUZZLES_CSV = """\
+PuzzleId,FEN,Moves,Rating,RatingDeviation,Popularity,NbPlays,Themes,GameUrl,OpeningTags
+00001,8/3b2kp/8/8/p1pp4/P7/K4R1b/2B5 b - - 1 39,h2g3 f2g2 g7f6 g2g3,1000,75,95,500,crushing endgame,https://lichess.org/x,
+00002,r1r3k1/4qpbp/1B2p1p1/p2b4/8/PP2PN2/4QPPP/2R2RK1 w - - 1 21,b6c5 c8c5 c1c5 e7c5,950,75,92,500,advantage middlegame,https://lichess.org/y,
+00003,8/3b2kp/8/8/p1pp4/P7/K4R1b/2B5 b - - 1 39,h2g3 f2g2,1000,75,95,500,mateIn1 short,https://lichess.org/z,
+00004,8/3b2kp/8/8/p1pp4/P7/K4R1b/2B5 b - - 1 39,h2g3 f2g2 g7f6 g2g3,1500,75,95,500,crushing,https://lichess.org/z,
+00005,8/3b2kp/8/8/p1pp4/P7/K4R1b/2B5 b - - 1 39,h2g3 f2g2 g7f6 g2g3,1000,75,50,500,crushing,https://lichess.org/z,
+00006,8/3b2kp/8/8/p1pp4/P7/K4R1b/2B5 b - - 1 39,h2g3 f2g2 g7f6 g2g3,1000,75,95,500,crushing,https://lichess.org/z,
+"""
+
+
+@pytest.fixture
+def lichess_puzzles_csv(tmp_path: "Path") -> "Path":
+    csv_path = tmp_path / "lichess_db_puzzle.csv"
+    csv_path.write_text(_LICHESS_PUZZLES_CSV)
+    return csv_path
+
+
+@pytest.fixture
+def lichess_puzzles_csv_zst(lichess_puzzles_csv: "Path") -> "Path":
+    if shutil.which("zstd") is None:
+        pytest.skip("The 'zstd' command is not available")
+    subprocess.run(("zstd", "--quiet", str(lichess_puzzles_csv)), check=True)
+    return lichess_puzzles_csv.with_suffix(".csv.zst")
+
+
+def _imported_puzzles() -> dict[str, tuple[str, str | None]]:
+    return {
+        source: (fen, bot_first_move)
+        for source, fen, bot_first_move in DailyChallenge.objects.filter(
+            source__startswith="lichess-"
+        ).values_list("source", "fen", "bot_first_move")
+    }
+
+
+@pytest.mark.parametrize(
+    ("file_fixture", "workers"),
+    (
+        ("lichess_puzzles_csv", 0),
+        ("lichess_puzzles_csv_zst", 0),
+        ("lichess_puzzles_csv_zst", 1),
+    ),
+)
+@pytest.mark.django_db
+def test_dailychallenge_create_from_lichess_puzzles_csv(
+    request, file_fixture: str, workers: int
+):
+    csv_path: Path = request.getfixturevalue(file_fixture)
+    DailyChallenge.objects.create(source="lichess-00006", fen="8/8/8/8/8/8/8/8 w - -")
+
+    stdout = StringIO()
+    call_command(
+        "dailychallenge_create_from_lichess_puzzles_csv",
+        str(csv_path),
+        f"--workers={workers}",
+        "--batch-size=1",
+        stdout=stdout,
+    )
+
+    assert _imported_puzzles() == {
+        "lichess-00001": (
+            "8/3b2kp/8/8/p1pp4/P5b1/K4R2/2B5 w - - 2 40",
+            "h2g3",
+        ),
+        "lichess-00002": (
+            "2r2rk1/4qppp/pp2pn2/8/P1bB4/4P1P1/4QPBP/R1R3K1 w - - 2 22",
+            "b3c4",
+        ),
+        "lichess-00006": ("8/8/8/8/8/8/8/8 w - -", None),
+    }
+    output = stdout.getvalue()
+    assert "from 6 rows read" in output
+    assert "rating: 1, popularity: 1, themes: 1, already_imported: 1" in output
+
+
+@pytest.mark.django_db
+def test_dailychallenge_create_from_lichess_puzzles_csv_stop_after(
+    lichess_puzzles_csv_zst: "Path",
+):
+    call_command(
+        "dailychallenge_create_from_lichess_puzzles_csv",
+        str(lichess_puzzles_csv_zst),
+        "--workers=0",
+        "--stop-after=1",
+        stdout=StringIO(),
+    )
+
+    assert list(_imported_puzzles()) == ["lichess-00001"]
@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from apps.daily_challenge.business_logic import solve_daily_challenges
+from apps.daily_challenge.models import DailyChallenge, DailyChallengeStatus
+
+_QUICK_CHALLENGE_FEN = "k7/1p3Q2/p6p/8/8/8/7B/K7 w - - 0 1"
+
+
+@pytest.mark.django_db
+def test_solves_pending_challenges():
+    # (our migrations create a pending "fallback" challenge: let's get rid of it)
+    DailyChallenge.objects.all().delete()
+    for i in range(2):
+        DailyChallenge.objects.create(
+            source=f"to-solve-{i}", fen=_QUICK_CHALLENGE_FEN, player_simulated_depth=3
+        )
+    DailyChallenge.objects.create(
+        source="already-solved",
+        fen=_QUICK_CHALLENGE_FEN,
+        solution="f7f8,a8a7,f8d6",
+        solution_turns_count=2,
+    )
+    DailyChallenge.objects.create(
+        source="published",
+        fen=_QUICK_CHALLENGE_FEN,
+        status=DailyChallengeStatus.PUBLISHED,
+    )
+
+    stdout = StringIO()
+    call_command(
+        "dailychallenge_solve",
+        "--engine=sunfish",
+        "--workers=0",
+        "--verbosity=2",
+        stdout=stdout,
+    )
+
+    solutions = dict(DailyChallenge.objects.values_list("source", "solution"))
+    assert solutions["to-solve-0"] != ""
+    assert solutions["to-solve-0"] == solutions["to-solve-1"]
+    assert solutions["already-solved"] == "f7f8,a8a7,f8d6"
+    assert solutions["published"] == ""
+
+    to_solve = DailyChallenge.objects.get(source="to-solve-0")
+    assert to_solve.solution_turns_count == to_solve.solution.count(",") // 2 + 1
+    # Both challenges share the same position and depths: it was only solved once.
+    assert "[2/2] to-solve-0, to-solve-1: solved in" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_published_challenges_are_not_solved():
+    published = DailyChallenge.objects.create(
+        source="published",
+        fen=_QUICK_CHALLENGE_FEN,
+        status=DailyChallengeStatus.PUBLISHED,
+        player_simulated_depth=3,
+    )
+
+    solutions = solve_daily_challenges(
+        [published],
+        engine="sunfish",
+        workers=0,
+        time_budget=10.0,
+        move_time_budget=2.0,
+    )
+
+    assert solutions == []
+    published.refresh_from_db()
+    assert published.solution == ""
@@ -0,0 +1,263 @@
+import json
+from html.parser import HTMLParser
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import pytest
+import time_machine
+from django.test import Client
+
+from apps.chess.board_roles import BoardRoles
+from apps.chess.components.chess_board import (
+    chess_board,
+    chess_piece,
+    chess_piece_html,
+    chess_pieces,
+)
+from apps.chess.models import UserPrefs, UserPrefsGameSpeed
+
+from ..models import PlayerGameOverState, PlayerGameState
+from ..presenters import DailyChallengeGamePresenter
+
+if TYPE_CHECKING:
+    from apps.chess.types import PieceRoleBySquare
+
+    from ..models import DailyChallenge
+
+# Our "*_html()" fast path functions must render exactly the same HTML than
+# dominate: the non-pretty rendering of our dominate components is our golden output.
+
+_GAME_OVER_FEN = "k4Q2/pp6/7p/8/8/8/7B/K7 b - - 1 2"
+_GAME_OVER_PIECE_ROLE_BY_SQUARE: "PieceRoleBySquare" = {
+    "a8": "k",
+    "f8": "Q",
+    "b7": "p1",
+    "a7": "p2",
+    "h6": "p3",
+    "h2": "B1",
+    "a1": "K",
+}
+
+_GAME_STATES: dict[str, dict] = {
+    "player_turn": {},
+    "white_piece_selected": {"selected_piece_square": "f7"},
+    "black_piece_selected": {"selected_piece_square": "b7"},
+    "bot_intro_turn": {"is_bot_move": True},
+    "fast_game_speed": {
+        "selected_piece_square": "h2",
+        "user_prefs": UserPrefs(game_speed=UserPrefsGameSpeed.FAST),
+    },
+    "see_solution_mode": {"solution_index": 0},
+    "game_over": {
+        "fen": _GAME_OVER_FEN,
+        "piece_role_by_square": _GAME_OVER_PIECE_ROLE_BY_SQUARE,
+        "game_over": PlayerGameOverState.WON,
+    },
+    "game_over_in_solution_mode": {
+        "fen": _GAME_OVER_FEN,
+        "piece_role_by_square": _GAME_OVER_PIECE_ROLE_BY_SQUARE,
+        "solution_index": 1,
+    },
+}
+
+
+def _game_presenter(
+    challenge: "DailyChallenge",
+    *,
+    fen: str | None = None,
+    piece_role_by_square: "PieceRoleBySquare | None" = None,
+    solution_index: int | None = None,
+    game_over: PlayerGameOverState = PlayerGameOverState.PLAYING,
+    **presenter_kwargs,
+) -> DailyChallengeGamePresenter:
+    game_state = PlayerGameState(
+        attempts_counter=0,
+        turns_counter=0,
+        current_attempt_turns_counter=0,
+        fen=fen or challenge.fen,
+        piece_role_by_square=BoardRoles.from_piece_role_by_square(
+            piece_role_by_square or challenge.piece_role_by_square  # type: ignore
+        ),
+        moves="",
+        game_over=game_over,
+        solution_index=solution_index,
+    )
+    return DailyChallengeGamePresenter(
+        challenge=challenge,
+        game_state=game_state,
+        refresh_last_move=False,
+        is_htmx_request=True,
+        **presenter_kwargs,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("game_state_name", _GAME_STATES.keys())
+@pytest.mark.parametrize("board_id", ("main", 'weird"<board>&id'))
+def test_chess_piece_html_fast_path_golden_output(
+    challenge_minimalist: "DailyChallenge", game_state_name: str, board_id: str
+):
+    game_presenter = _game_presenter(
+        challenge_minimalist, **_GAME_STATES[game_state_name]
+    )
+
+    for square, piece_role in game_presenter.piece_role_by_square.items():
+        expected_html = chess_piece(
+            game_presenter=game_presenter,
+            square=square,
+            piece_role=piece_role,
+            board_id=board_id,
+        ).render(pretty=False)
+        # (let's do it twice, so we check the cached compiled templates too)
+        for _ in range(2):
+            assert (
+                chess_piece_html(
+                    game_presenter=game_presenter,
+                    square=square,
+                    piece_role=piece_role,
+                    board_id=board_id,
+                )
+                == expected_html
+            )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("game_state_name", _GAME_STATES.keys())
+def test_chess_board_components_fast_path_golden_output(
+    settings,
+    challenge_minimalist: "DailyChallenge",
+    game_state_name: str,
+):
+    def render_board_components() -> list[str]:
+        game_presenter = _game_presenter(
+            challenge_minimalist, **_GAME_STATES[game_state_name]
+        )
+        return [
+            component(game_presenter=game_presenter, board_id="main").render(
+                pretty=False
+            )
+            for component in (chess_board, chess_pieces)
+        ]
+
+    # The fast path is only used when we're not in DEBUG mode:
+    settings.DEBUG = True
+    expected_html = render_board_components()
+    settings.DEBUG = False
+    assert render_board_components() == expected_html
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("is_returning_player", (False, True))
+@mock.patch("apps.webui.components.layout.get_token", return_value="[csrf-token]")
+@mock.patch(
+    "apps.daily_challenge.components.fragments_render_cache.get_fragments_render_cache",
+    return_value=None,
+)
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@time_machine.travel("2024-01-01")
+def test_daily_challenge_page_fast_path_golden_output(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    get_fragments_render_cache_mock: mock.MagicMock,
+    get_token_mock: mock.MagicMock,
+    # Test dependencies
+    settings,
+    challenge_minimalist: "DailyChallenge",
+    is_returning_player: bool,
+):
+    # The fast path HTML is injected in full pages too, which `page()` renders with
+    # dominate's non-pretty mode when we're not in DEBUG mode: the whole page must
+    # stay byte-identical to the one rendered without the fast path.
+    get_current_challenge_mock.return_value = challenge_minimalist
+    settings.DEBUG = False
+
+    def render_page() -> bytes:
+        client = Client()
+        if is_returning_player:
+            client.get("/")
+        response = client.get("/")
+        assert response.status_code == HTTPStatus.OK
+        return response.content
+
+    with mock.patch(
+        "apps.chess.components.chess_board._use_html_fast_path", return_value=False
+    ):
+        expected_html = render_page()
+    html = render_page()
+
+    assert b'id="chess-board-squares-main"' in html
+    assert html == expected_html
+
+
+@pytest.mark.django_db
+def test_chess_pieces_ship_the_legal_targets_for_client_side_selection(
+    settings, challenge_minimalist: "DailyChallenge"
+):
+    settings.DAILY_CHALLENGE_CLIENT_SIDE_PIECE_SELECTION = True
+
+    game_presenter = _game_presenter(challenge_minimalist)
+    assert game_presenter.game_phase == "waiting_for_player_selection"
+    html = chess_pieces(game_presenter=game_presenter, board_id="main").render()
+    data_holder = _client_side_selection_data(html)
+    assert data_holder is not None
+
+    targets_by_square = json.loads(data_holder["data-targets-by-square"])
+    # Both sides' pieces get their targets, just like the server-rendered selection:
+    assert targets_by_square.keys() == {"f7", "h2", "a1", "a7", "b7", "h6"}
+    for square, targets in targets_by_square.items():
+        selected_piece_presenter = _game_presenter(
+            challenge_minimalist, selected_piece_square=square
+        ).selected_piece
+        assert selected_piece_presenter is not None
+        assert {
+            targets[i : i + 2] for i in range(0, len(targets), 2)
+        } == selected_piece_presenter.available_targets
+
+    assert data_holder["data-move-piece-url"] == (
+        "/htmx/pieces/<from>/move/<to>/?board_id=main"
+    )
+    assert data_holder["data-active-player-side"] == "w"
+    assert data_holder["data-no-selection-url"] == "/htmx/no-selection/?board_id=main"
+    active_marker, opponent_marker = json.loads(data_holder["data-target-markers"])
+    assert 'data-hx-post=""' in active_marker
+    assert "data-hx-post" not in opponent_marker
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("client_side_piece_selection", "game_state_name"),
+    (
+        (False, "player_turn"),
+        (True, "white_piece_selected"),
+        (True, "see_solution_mode"),
+        (True, "game_over"),
+    ),
+)
+def test_chess_pieces_use_the_server_side_selection_otherwise(
+    settings,
+    challenge_minimalist: "DailyChallenge",
+    client_side_piece_selection: bool,
+    game_state_name: str,
+):
+    settings.DAILY_CHALLENGE_CLIENT_SIDE_PIECE_SELECTION = client_side_piece_selection
+
+    game_presenter = _game_presenter(
+        challenge_minimalist, **_GAME_STATES[game_state_name]
+    )
+    html = chess_pieces(game_presenter=game_presenter, board_id="main").render()
+    assert _client_side_selection_data(html) is None
+
+
+def _client_side_selection_data(html: str) -> dict[str, str] | None:
+    class DataHolderParser(HTMLParser):
+        attributes: dict[str, str] | None = None
+
+        def handle_starttag(self, tag, attrs):
+            attributes = {name: value or "" for name, value in attrs}
+            if attributes.get("id") == "chess-board-client-side-selection-main":
+                self.attributes = attributes
+
+    parser = DataHolderParser()
+    parser.feed(html)
+    return parser.attributes
@@ -0,0 +1,127 @@
+from typing import TYPE_CHECKING
+
+import pytest
+import time_machine
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+
+from apps.chess.board_roles import BoardRoles
+
+from ..cookie_helpers import (
+    get_player_session_content_from_request,
+    save_daily_challenge_state_in_session,
+)
+from ..models import PlayerGameState, PlayerSessionContent, PlayerStats
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+    from django.test import RequestFactory
+
+
+def _game_state() -> PlayerGameState:
+    return PlayerGameState(
+        attempts_counter=1,
+        turns_counter=1,
+        current_attempt_turns_counter=1,
+        fen="k7/pp3Q2/7p/8/8/8/7B/K7 w - - 0 2",
+        piece_role_by_square=BoardRoles.from_piece_role_by_square(
+            {"a8": "k", "f7": "Q", "b7": "p1", "h2": "B1", "a1": "K"}
+        ),
+        moves="f2f7",
+        solution_index=None,
+    )
+
+
+def _request_with_session(
+    rf: "RequestFactory", session_content: PlayerSessionContent | None
+) -> "HttpRequest":
+    session_key = None
+    if session_content is not None:
+        session = SessionStore()
+        session["pc"] = session_content.to_cookie_content()
+        session_key = session._get_session_key()  # type: ignore[attr-defined]
+
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    request.session = SessionStore(session_key=session_key)
+    return request
+
+
+@time_machine.travel("2024-01-01")
+def test_save_daily_challenge_state_in_session_skips_unchanged_states(rf):
+    request = _request_with_session(
+        rf,
+        PlayerSessionContent(
+            games={"2024-01-01": _game_state()}, stats=PlayerStats(games_count=1)
+        ),
+    )
+
+    session_content = get_player_session_content_from_request(request)
+    save_daily_challenge_state_in_session(
+        request=request,
+        game_state=session_content.games["2024-01-01"],
+        player_stats=session_content.stats,
+    )
+    # Nothing changed: the session cookie doesn't have to be signed and sent again
+    assert request.session.modified is False
+
+    session_content.stats.current_streak = 1
+    save_daily_challenge_state_in_session(
+        request=request,
+        game_state=session_content.games["2024-01-01"],
+        player_stats=session_content.stats,
+    )
+    assert request.session.modified is True
+    assert get_player_session_content_from_request(request).stats.current_streak == 1
+
+
+@pytest.mark.parametrize(
+    "session_content",
+    (
+        pytest.param(None, id="new_player"),
+        pytest.param(
+            PlayerSessionContent(
+                games={"2023-12-31": _game_state()}, stats=PlayerStats(games_count=1)
+            ),
+            id="yesterday_game",
+        ),
+    ),
+)
+@time_machine.travel("2024-01-01")
+def test_save_daily_challenge_state_in_session_saves_changed_states(
+    rf, session_content: PlayerSessionContent | None
+):
+    request = _request_with_session(rf, session_content)
+
+    save_daily_challenge_state_in_session(
+        request=request,
+        game_state=_game_state(),
+        player_stats=get_player_session_content_from_request(request).stats,
+    )
+
+    assert request.session.modified is True
+    assert list(get_player_session_content_from_request(request).games) == [
+        "2024-01-01"
+    ]
+
+
+@time_machine.travel("2024-01-01")
+def test_save_daily_challenge_state_in_session_upgrades_legacy_encodings(rf):
+    session_content = PlayerSessionContent(
+        games={"2024-01-01": _game_state()}, stats=PlayerStats(games_count=1)
+    )
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    request.session = SessionStore()
+    request.session["pc"] = session_content.to_cookie_content(encoding_version=1)
+    request.session.modified = False
+
+    save_daily_challenge_state_in_session(
+        request=request,
+        game_state=session_content.games["2024-01-01"],
+        player_stats=session_content.stats,
+    )
+
+    # Same state, but our legacy encoding is replaced with the current one:
+    assert request.session.modified is True
+    assert request.session["pc"].startswith("2:")
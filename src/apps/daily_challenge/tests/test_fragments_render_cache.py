@@ -0,0 +1,150 @@
+from typing import TYPE_CHECKING
+
+import pytest
+from django.conf import settings
+
+from apps.chess.components.chess_board import (
+    chess_available_targets,
+    chess_last_move,
+    chess_pieces,
+)
+
+from ..components.fragments_render_cache import (
+    FragmentsRenderCache,
+    FragmentsRenderCacheStats,
+    get_fragments_render_cache,
+    render_fragment,
+)
+from ..components.misc_ui.daily_challenge_bar import daily_challenge_bar
+from ..components.misc_ui.status_bar import status_bar
+from ..presenters import DailyChallengeGamePresenter
+
+if TYPE_CHECKING:
+    from apps.chess.types import Square
+
+    from ..models import DailyChallenge, PlayerGameState
+
+_COMPONENTS = (
+    chess_pieces,
+    chess_available_targets,
+    chess_last_move,
+    daily_challenge_bar,
+    status_bar,
+)
+
+
+@pytest.fixture
+def render_cache() -> FragmentsRenderCache:
+    render_cache = get_fragments_render_cache()
+    assert render_cache is not None
+    return render_cache
+
+
+def _game_presenter(
+    challenge: "DailyChallenge",
+    game_state: "PlayerGameState",
+    selected_piece_square: "Square | None" = None,
+) -> DailyChallengeGamePresenter:
+    return DailyChallengeGamePresenter(
+        challenge=challenge,
+        game_state=game_state,
+        refresh_last_move=True,
+        is_htmx_request=True,
+        selected_piece_square=selected_piece_square,
+    )
+
+
+@pytest.mark.django_db
+def test_cached_fragments_are_the_same_as_rendered_ones(
+    render_cache: FragmentsRenderCache,
+    challenge_minimalist: "DailyChallenge",
+    player_game_state_minimalist: "PlayerGameState",
+):
+    def render_all(game_presenter: DailyChallengeGamePresenter) -> list[str]:
+        return [
+            render_fragment(
+                component,
+                game_presenter=game_presenter,
+                board_id="main",
+                data_hx_swap_oob="outerHTML",
+            )
+            for component in _COMPONENTS
+        ]
+
+    first_player_fragments = render_all(
+        _game_presenter(challenge_minimalist, player_game_state_minimalist, "f7")
+    )
+    # Another player, in the same situation:
+    second_player_fragments = render_all(
+        _game_presenter(challenge_minimalist, player_game_state_minimalist, "f7")
+    )
+
+    game_presenter = _game_presenter(
+        challenge_minimalist, player_game_state_minimalist, "f7"
+    )
+    expected_fragments = [
+        component(
+            game_presenter=game_presenter,
+            board_id="main",
+            data_hx_swap_oob="outerHTML",
+        ).render(pretty=settings.DEBUG)
+        for component in _COMPONENTS
+    ]
+    assert first_player_fragments == expected_fragments
+    assert second_player_fragments == expected_fragments
+    assert render_cache.stats() == FragmentsRenderCacheStats(
+        hits=5, misses=5, evictions=0, size=5
+    )
+
+
+@pytest.mark.django_db
+def test_fragments_are_cached_by_the_fields_they_read(
+    render_cache: FragmentsRenderCache,
+    challenge_minimalist: "DailyChallenge",
+    player_game_state_minimalist: "PlayerGameState",
+):
+    for selected_piece_square in ("f7", "h2"):
+        game_presenter = _game_presenter(
+            challenge_minimalist, player_game_state_minimalist, selected_piece_square
+        )
+        for component in _COMPONENTS:
+            render_fragment(component, game_presenter=game_presenter, board_id="main")
+
+    # The selected piece is not displayed by the last move marker or the challenge bar:
+    assert render_cache.stats_by_component() == {
+        "chess_available_targets": (0, 2),
+        "chess_last_move": (1, 1),
+        "chess_pieces": (0, 2),
+        "daily_challenge_bar": (1, 1),
+        "status_bar": (0, 2),
+    }
+
+    # Fragments rendered for another board are not shared:
+    render_fragment(chess_last_move, game_presenter=game_presenter, board_id="other")
+    assert render_cache.stats_by_component()["chess_last_move"] == (1, 2)
+
+
+def test_fragments_render_cache_evicts_least_recently_used_entries() -> None:
+    render_cache = FragmentsRenderCache(max_size=2)
+    rendered: list[str] = []
+
+    def render(fragment: str) -> str:
+        def do_render() -> str:
+            rendered.append(fragment)
+            return f"<div>{fragment}</div>"
+
+        return render_cache.get_or_render(
+            component="test", key_fields=(fragment,), render=do_render
+        )
+
+    render("a")
+    render("b")
+    assert render("a") == "<div>a</div>"  # "a" is now the most recently used entry
+    render("c")  # the cache is full: "b" gets evicted
+    render("a")  # still a hit
+    render("b")  # ...but that one has to be rendered again
+
+    assert rendered == ["a", "b", "c", "b"]
+    assert render_cache.stats() == FragmentsRenderCacheStats(
+        hits=2, misses=4, evictions=2, size=2
+    )
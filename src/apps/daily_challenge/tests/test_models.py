@@ -1,10 +1,22 @@
+import datetime as dt
 from contextlib import nullcontext as noraise
 from typing import TYPE_CHECKING
 
+import msgspec
 import pytest
+from django.contrib.sessions.backends.signed_cookies import SessionStore
 from django.core.exceptions import ValidationError
 
-from ..models import DailyChallengeStatus
+from apps.chess.board_roles import BoardRoles
+from apps.chess.move_graph import ChessMoveGraph
+
+from ..models import (
+    DailyChallengeStatus,
+    PlayerGameOverState,
+    PlayerGameState,
+    PlayerSessionContent,
+    PlayerStats,
+)
 
 if TYPE_CHECKING:
     from contextlib import AbstractContextManager
@@ -38,3 +50,174 @@ def test_solution_turns_counter_computation(
         challenge_minimalist.clean()
     if expected_moves_count:
         assert challenge_minimalist.solution_turns_count == expected_moves_count
+
+
+@pytest.mark.django_db
+def test_move_graph_is_built_for_published_challenges(
+    challenge_minimalist: "DailyChallenge",
+):
+    challenge_minimalist.solution = "f7f8,a8a7,f8d6"
+    challenge_minimalist.status = DailyChallengeStatus.PUBLISHED  # type: ignore
+    challenge_minimalist.clean()
+    challenge_minimalist.save()
+    challenge_minimalist.refresh_from_db()
+
+    assert challenge_minimalist.move_graph
+    graph = ChessMoveGraph.from_bytes(challenge_minimalist.move_graph)
+    assert challenge_minimalist.fen in graph
+    assert challenge_minimalist.fen_before_bot_first_move
+    assert challenge_minimalist.fen_before_bot_first_move in graph
+    assert graph.move(fen=challenge_minimalist.fen, from_="f7", to="f8")["game_over"]
+
+
+def test_player_session_content_decodes_legacy_piece_role_by_square():
+    legacy_cookie_content = (
+        '{"g":{"2024-01-01":{"ac":0,"tc":0,"catc":0,'
+        '"f":"1k6/pp3Q2/7p/8/8/8/7B/K7 b - - 0 1",'
+        '"prbs":{"f7":"Q","b7":"p1","b8":"k","a1":"K"},"m":""}},"s":{}}'
+    )
+
+    session_content = PlayerSessionContent.from_cookie_content(legacy_cookie_content)
+
+    game_state = session_content.games["2024-01-01"]
+    assert isinstance(game_state.piece_role_by_square, BoardRoles)
+    assert game_state.piece_role_by_square == {
+        "f7": "Q",
+        "b7": "p1",
+        "b8": "k",
+        "a1": "K",
+    }
+    assert session_content.encoding_version == 1
+    # With the JSON encoding, the board roles now use their compact encoding:
+    assert (
+        '"prbs":"m................................................y...l...K......"'
+        in session_content.to_cookie_content(encoding_version=1)
+    )
+    # ...but once saved again, the cookie uses the binary encoding:
+    upgraded_cookie_content = session_content.to_cookie_content()
+    assert upgraded_cookie_content.startswith("2:")
+    upgraded_session_content = PlayerSessionContent.from_cookie_content(
+        upgraded_cookie_content
+    )
+    assert upgraded_session_content.encoding_version == 2
+    assert upgraded_session_content.games == session_content.games
+
+
+def _session_content_mid_game() -> PlayerSessionContent:
+    game_state = PlayerGameState(
+        attempts_counter=2,
+        turns_counter=7,
+        current_attempt_turns_counter=3,
+        fen="k7/1p3Q2/p6p/8/8/8/7B/K7 w - - 2 4",
+        piece_role_by_square=BoardRoles.from_piece_role_by_square(
+            {
+                "a8": "k",
+                "b7": "p1",
+                "f7": "Q",
+                "a6": "p2",
+                "h6": "p3",
+                "h2": "B1",
+                "a1": "K",
+            }
+        ),
+        is_returning_player=True,
+        moves="a7a6f7f8a8a7f8f7b8a8",
+        undo_used=True,
+        game_over=PlayerGameOverState.PLAYING,
+        solution_index=None,
+        undo_journal=["RsS.|b - - 1 3", "UvV.|w - - 2 4"],
+    )
+    return PlayerSessionContent(
+        games={"2024-01-02": game_state},
+        stats=PlayerStats(
+            games_count=12,
+            win_count=9,
+            current_streak=3,
+            max_streak=5,
+            last_played=dt.date(2024, 1, 2),
+            last_won=dt.date(2024, 1, 1),
+            wins_distribution={1: 4, 2: 2, 3: 1, 4: 0, 5: 2},
+        ),
+    )
+
+
+@pytest.mark.parametrize("encoding_version", (1, 2))
+def test_player_session_content_round_trip(encoding_version: int):
+    session_content = _session_content_mid_game()
+
+    decoded = PlayerSessionContent.from_cookie_content(
+        session_content.to_cookie_content(encoding_version=encoding_version)
+    )
+
+    assert decoded.encoding_version == encoding_version
+    assert decoded.games == session_content.games
+    assert decoded.stats == session_content.stats
+
+
+def test_player_session_content_v2_keeps_fens_that_dont_match_the_board_roles():
+    session_content = _session_content_mid_game()
+    game_state = session_content.games["2024-01-02"]
+    game_state.fen = "8/8/8/8/8/8/8/K6k w - - 0 1"
+
+    decoded = PlayerSessionContent.from_cookie_content(
+        session_content.to_cookie_content()
+    )
+
+    assert decoded.games["2024-01-02"].fen == "8/8/8/8/8/8/8/K6k w - - 0 1"
+
+
+@pytest.mark.parametrize("cookie_content", ("2:not-base85!", "2:" + "0" * 20, "2:"))
+def test_player_session_content_v2_invalid_content(cookie_content: str):
+    with pytest.raises(msgspec.MsgspecError):
+        PlayerSessionContent.from_cookie_content(cookie_content)
+
+
+# Our session is stored in a signed cookie - see `SESSION_ENGINE` -, which is what
+# our views have to encode and decode for each request:
+
+
+def _to_session_cookie(
+    session_content: PlayerSessionContent, *, encoding_version: int
+) -> str:
+    session = SessionStore()
+    session["pc"] = session_content.to_cookie_content(encoding_version=encoding_version)
+    return session._get_session_key()  # type: ignore[attr-defined]
+
+
+def _from_session_cookie(session_cookie: str) -> PlayerSessionContent:
+    return PlayerSessionContent.from_cookie_content(
+        SessionStore(session_key=session_cookie)["pc"]
+    )
+
+
+def test_player_session_content_v2_cookies_are_smaller():
+    session_content = _session_content_mid_game()
+
+    v1_cookie = _to_session_cookie(session_content, encoding_version=1)
+    v2_cookie = _to_session_cookie(session_content, encoding_version=2)
+
+    assert len(v2_cookie) < len(v1_cookie) * 0.75
+    assert _from_session_cookie(v2_cookie).games == session_content.games
+
+
+# N.B. These use pytest-benchmark: `pytest --benchmark-only --benchmark-json=...`
+# can track them between commits.
+
+
+@pytest.mark.parametrize("encoding_version", (1, 2))
+def test_benchmark_session_cookie_encoding(benchmark, encoding_version: int):
+    session_cookie = benchmark(
+        _to_session_cookie,
+        _session_content_mid_game(),
+        encoding_version=encoding_version,
+    )
+    benchmark.extra_info["session_cookie_bytes"] = len(session_cookie)
+
+
+@pytest.mark.parametrize("encoding_version", (1, 2))
+def test_benchmark_session_cookie_decoding(benchmark, encoding_version: int):
+    session_cookie = _to_session_cookie(
+        _session_content_mid_game(), encoding_version=encoding_version
+    )
+    session_content = benchmark(_from_session_cookie, session_cookie)
+    assert session_content.encoding_version == encoding_version
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from unittest import mock
+
+import pytest
+
+from .. import solver
+from ..solver import SolverTask, solve_challenge, solve_challenges
+
+# Same position as the "challenge_quick" one: the bot's king is stuck in its corner.
+_QUICK_CHALLENGE_FEN = "k7/1p3Q2/p6p/8/8/8/7B/K7 w - - 0 1"
+
+
+@pytest.mark.parametrize("engine", ("andoma", "sunfish"))
+def test_solve_challenge(engine):
+    solution = solve_challenge(
+        SolverTask(
+            challenge_id=1, fen=_QUICK_CHALLENGE_FEN, bot_depth=1, player_depth=3
+        ),
+        engine=engine,
+    )
+
+    assert solution.is_solved
+    assert solution.challenge_id == 1
+    # The player plays first, and last:
+    assert len(solution.moves) % 2 == 1
+    assert solution.turns_count == (len(solution.moves) + 1) // 2
+    assert solution.solution == ",".join(solution.moves)
+
+
+def test_solve_challenge_detects_draws():
+    # Only kings left on the board:
+    solution = solve_challenge(
+        SolverTask(
+            challenge_id=1,
+            fen="k7/8/8/8/8/8/8/K7 w - - 0 1",
+            bot_depth=1,
+            player_depth=1,
+        )
+    )
+    assert solution.outcome == "draw"
+    assert solution.moves == ()
+
+
+def test_solve_challenge_time_budget():
+    solution = solve_challenge(
+        SolverTask(
+            challenge_id=1, fen=_QUICK_CHALLENGE_FEN, bot_depth=1, player_depth=3
+        ),
+        time_budget=0,
+    )
+    assert solution.outcome == "out_of_time"
+
+
+@mock.patch.object(solver, "_moves_cache", new_callable=OrderedDict)
+def test_solve_challenge_only_caches_moves_searched_with_their_full_budget(
+    moves_cache_mock: OrderedDict,
+):
+    task = SolverTask(
+        challenge_id=1, fen=_QUICK_CHALLENGE_FEN, bot_depth=1, player_depth=3
+    )
+    with mock.patch.object(solver.time, "monotonic", side_effect=range(100)):
+        # (1 "second" per clock check: the moves only get the remaining second)
+        solution = solve_challenge(task, time_budget=3, move_time_budget=5)
+    assert solution.outcome == "out_of_time"
+    assert len(solution.moves) > 0
+    assert len(moves_cache_mock) == 0
+
+    solution = solve_challenge(task)
+    assert solution.is_solved
+    assert len(moves_cache_mock) == len(solution.moves)
+
+
+def test_solve_challenges_in_worker_processes():
+    tasks = [
+        SolverTask(
+            challenge_id=i, fen=_QUICK_CHALLENGE_FEN, bot_depth=1, player_depth=2
+        )
+        for i in range(1, 4)
+    ]
+    solutions = list(solve_challenges(tasks, workers=2, engine="sunfish"))
+
+    assert sorted(solution.challenge_id for solution in solutions) == [1, 2, 3]
+    # The engines are deterministic:
+    assert len({solution.moves for solution in solutions}) == 1
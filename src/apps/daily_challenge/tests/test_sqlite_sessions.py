@@ -0,0 +1,121 @@
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import pytest
+import time_machine
+from django.test import Client
+
+from ..sqlite_sessions import SessionStore
+from ._helpers import get_session_content
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from ..models import DailyChallenge
+
+_SQLITE_SESSIONS_ENGINE = "apps.daily_challenge.sqlite_sessions"
+_SIGNED_COOKIES_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
+
+@pytest.fixture
+def sqlite_sessions(settings, tmp_path: "Path"):
+    settings.SESSION_ENGINE = _SQLITE_SESSIONS_ENGINE
+    settings.SESSION_SQLITE_PATH = str(tmp_path / "sessions.sqlite3")
+
+
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@time_machine.travel("2024-01-01")
+@pytest.mark.django_db
+def test_player_state_is_kept_server_side(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    sqlite_sessions,
+):
+    get_current_challenge_mock.return_value = challenge_minimalist
+    client = Client()
+
+    response = client.get("/")
+    assert response.status_code == HTTPStatus.OK
+    session_key = response.cookies["sessionid"].value
+    # The player only gets an opaque session key:
+    assert len(session_key) == 32
+
+    session_content = get_session_content(client)
+    assert list(session_content.games) == ["2024-01-01"]
+
+    # The game state is loaded from our SQLite file, and isn't sent back to the player
+    response = client.get("/")
+    assert response.status_code == HTTPStatus.OK
+    assert "sessionid" not in response.cookies
+    assert get_session_content(client) == session_content
+
+
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@time_machine.travel("2024-01-01")
+@pytest.mark.django_db
+def test_signed_cookies_sessions_are_migrated(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    settings,
+    tmp_path: "Path",
+):
+    get_current_challenge_mock.return_value = challenge_minimalist
+
+    settings.SESSION_ENGINE = _SIGNED_COOKIES_ENGINE
+    signed_cookies_client = Client()
+    signed_cookies_client.get("/")
+    signed_cookie = signed_cookies_client.cookies["sessionid"].value
+    session_content = get_session_content(signed_cookies_client)
+
+    settings.SESSION_ENGINE = _SQLITE_SESSIONS_ENGINE
+    settings.SESSION_SQLITE_PATH = str(tmp_path / "sessions.sqlite3")
+    client = Client()
+    client.cookies["sessionid"] = signed_cookie
+
+    response = client.get("/")
+    assert response.status_code == HTTPStatus.OK
+    # The player's signed cookie has been exchanged for a session key...
+    assert len(response.cookies["sessionid"].value) == 32
+    # ...and they kept their state:
+    assert get_session_content(client) == session_content
+
+
+@pytest.mark.usefixtures("sqlite_sessions")
+def test_sessions_expire(settings):
+    settings.SESSION_COOKIE_AGE = 3600
+
+    with time_machine.travel("2024-01-01 00:00"):
+        session = SessionStore()
+        session["pc"] = "some-content"
+        session.save()
+        session_key = session.session_key
+        assert session_key is not None
+
+    with time_machine.travel("2024-01-01 00:59"):
+        assert SessionStore(session_key)["pc"] == "some-content"
+
+    with time_machine.travel("2024-01-01 01:01"):
+        expired_session = SessionStore(session_key)
+        assert "pc" not in expired_session
+        # The player will get a new session key:
+        assert expired_session.session_key is None
+
+        # The expired session is still there, until we clear them:
+        assert SessionStore().exists(session_key)
+        SessionStore.clear_expired()
+        assert not SessionStore().exists(session_key)
+
+
+@pytest.mark.usefixtures("sqlite_sessions")
+def test_unknown_session_keys_are_not_reused():
+    session = SessionStore("not-a-known-session-key")
+    session["pc"] = "some-content"
+    session.save()
+
+    assert session.session_key != "not-a-known-session-key"
+    assert SessionStore(session.session_key)["pc"] == "some-content"
@@ -0,0 +1,176 @@
+import datetime as dt
+import threading
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import pytest
+import time_machine
+from django.core.cache import cache
+
+from ..models import DailyChallengeStats
+from ..stats_counters_buffer import StatsCountersBuffer, _flush_to_database
+
+if TYPE_CHECKING:
+    from pytest_django import DjangoAssertNumQueries
+
+    from ..models import DailyChallenge
+
+_PLAYER_ACTIONS = (
+    "increment_today_created_count",
+    "increment_today_attempts_count",
+    "increment_today_turns_count",
+    "increment_today_turns_count",
+    "increment_today_undos_count",
+    "increment_today_turns_count",
+    "increment_today_restarts_count",
+    "increment_today_attempts_count",
+    "increment_today_see_solution_count",
+    "increment_today_wins_count",
+    "increment_played_challenges_count",
+    "increment_today_returning_players_count",
+    "increment_today_turns_count",
+)
+_COUNTERS = (
+    "created_count",
+    "played_challenges_count",
+    "attempts_count",
+    "returning_players_count",
+    "turns_count",
+    "restarts_count",
+    "undos_count",
+    "wins_count",
+    "see_solution_count",
+)
+
+
+def _play_actions() -> None:
+    for action in _PLAYER_ACTIONS:
+        getattr(DailyChallengeStats.objects, action)()
+
+
+def _today_counters() -> dict[str, int]:
+    return DailyChallengeStats.objects.filter(day=dt.date(2024, 1, 1)).values(
+        *_COUNTERS
+    )[0]
+
+
+@pytest.mark.parametrize("flush_threshold", (1, 4, 100))
+@time_machine.travel("2024-01-01 12:00:00Z", tick=False)
+@pytest.mark.django_db
+def test_buffered_counters_totals_match_the_unbuffered_ones(
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    cleared_django_default_cache,
+    # Test parameters
+    flush_threshold: int,
+):
+    with mock.patch(
+        "apps.daily_challenge.business_logic.get_current_daily_challenge",
+        return_value=challenge_minimalist,
+    ):
+        # Unbuffered path:
+        _play_actions()
+        unbuffered_counters = _today_counters()
+        DailyChallengeStats.objects.all().delete()
+        cache.clear()  # so that `touch_today()` re-creates today's stats
+
+        # Buffered path:
+        buffer = StatsCountersBuffer(
+            flush_function=_flush_to_database,
+            flush_threshold=flush_threshold,
+            flush_interval=3600,
+        )
+        with mock.patch(
+            "apps.daily_challenge.stats_counters_buffer.get_stats_counters_buffer",
+            return_value=buffer,
+        ):
+            _play_actions()
+        buffer.close()  # i.e. the worker exits
+
+    assert _today_counters() == unbuffered_counters
+    assert sum(unbuffered_counters.values()) == len(_PLAYER_ACTIONS)
+
+
+def test_buffer_flushes_when_the_threshold_is_reached():
+    flush_function = mock.Mock()
+    buffer = StatsCountersBuffer(
+        flush_function=flush_function, flush_threshold=3, flush_interval=3600
+    )
+    day_1, day_2 = dt.date(2024, 1, 1), dt.date(2024, 1, 2)
+
+    buffer.increment(day=day_1, field_name="turns_count")
+    buffer.increment(day=day_1, field_name="turns_count")
+    assert flush_function.call_count == 0
+    assert buffer.pending_count == 2
+
+    buffer.increment(day=day_2, field_name="wins_count")
+    # One call per day:
+    assert flush_function.call_args_list == [
+        mock.call(day_1, {"turns_count": 2}),
+        mock.call(day_2, {"wins_count": 1}),
+    ]
+    assert buffer.pending_count == 0
+
+    buffer.close()
+
+
+def test_buffer_flushes_on_a_timer():
+    flushed = threading.Event()
+    flush_function = mock.Mock(side_effect=lambda *args: flushed.set())
+    buffer = StatsCountersBuffer(
+        flush_function=flush_function, flush_threshold=100, flush_interval=0.01
+    )
+
+    with mock.patch("apps.daily_challenge.stats_counters_buffer.connections"):
+        buffer.increment(day=dt.date(2024, 1, 1), field_name="undos_count")
+        assert flushed.wait(timeout=5)
+
+    flush_function.assert_called_once_with(dt.date(2024, 1, 1), {"undos_count": 1})
+    buffer.close()
+
+
+def test_buffer_keeps_increments_when_a_flush_fails():
+    flush_function = mock.Mock(side_effect=[RuntimeError("database is locked"), None])
+    buffer = StatsCountersBuffer(
+        flush_function=flush_function, flush_threshold=100, flush_interval=3600
+    )
+    day = dt.date(2024, 1, 1)
+
+    buffer.increment(day=day, field_name="turns_count")
+    buffer.flush()
+    assert buffer.pending_count == 1
+
+    buffer.increment(day=day, field_name="turns_count")
+    buffer.close()
+    assert buffer.pending_count == 0
+    assert flush_function.call_args_list[-1] == mock.call(day, {"turns_count": 2})
+
+
+@time_machine.travel("2024-01-01 12:00:00Z", tick=False)
+@pytest.mark.django_db
+def test_buffered_counters_are_flushed_with_a_single_query_per_day(
+    challenge_minimalist: "DailyChallenge",
+    django_assert_num_queries: "DjangoAssertNumQueries",
+):
+    DailyChallengeStats.objects.create(
+        day=dt.date(2024, 1, 1), challenge=challenge_minimalist
+    )
+    buffer = StatsCountersBuffer(
+        flush_function=_flush_to_database, flush_threshold=100, flush_interval=3600
+    )
+    for field_name in ("turns_count", "turns_count", "wins_count", "undos_count"):
+        buffer.increment(day=dt.date(2024, 1, 1), field_name=field_name)
+
+    with django_assert_num_queries(1):
+        buffer.close()
+
+    counters = _today_counters()
+    assert (
+        counters["turns_count"],
+        counters["wins_count"],
+        counters["undos_count"],
+    ) == (
+        2,
+        1,
+        1,
+    )
@@ -1,3 +1,4 @@
+import contextlib
 from http import HTTPStatus
 from typing import TYPE_CHECKING
 from unittest import mock
@@ -5,12 +6,16 @@ from unittest import mock
 import pytest
 import time_machine
 
+from apps.chess.board_roles import BoardRoles
+from apps.chess.server_bot import get_server_bot
+
 from ..models import (
     PlayerGameOverState,
     PlayerGameState,
     PlayerSessionContent,
     PlayerStats,
 )
+from ..view_helpers import get_game_context_usage, reset_game_context_usage
 from ._helpers import (
     assert_response_waiting_for_bot_move,
     get_session_content,
@@ -44,11 +49,9 @@ def test_game_smoke_test(
     assert response.status_code == HTTPStatus.OK
     assert "csrftoken" in response.cookies
     session_cookie_value = response.cookies["sessionid"].value
-    assert 300 < len(session_cookie_value) < 330
-    assert session_cookie_value.startswith(
-        # This part of the signed+compressed session data is deterministic:
-        ".eJx"
-    )
+    assert 150 < len(session_cookie_value) < 190
+    # Our session cookie content uses our compact encoding:
+    assert client.session["pc"].startswith("2:")
 
     # As we're waiting for the bot to play its 1st turn, we should not be able to
     # select any of our pieces:
@@ -57,22 +60,24 @@ def test_game_smoke_test(
     # Ok, let's assert some stuff regarding the session cookie content:
     session_content = get_session_content(client)
     session_content_expected = PlayerSessionContent(
-        encoding_version=1,
+        encoding_version=2,
         games={
             "2024-01-01": PlayerGameState(
                 attempts_counter=0,
                 turns_counter=0,
                 current_attempt_turns_counter=0,
                 fen="1k6/pp3Q2/7p/8/8/8/7B/K7 b - - 0 1",
-                piece_role_by_square={
-                    "f7": "Q",
-                    "b7": "p1",
-                    "a7": "p2",
-                    "h6": "p3",
-                    "h2": "B1",
-                    "a1": "K",
-                    "b8": "k",
-                },
+                piece_role_by_square=BoardRoles.from_piece_role_by_square(
+                    {
+                        "f7": "Q",
+                        "b7": "p1",
+                        "a7": "p2",
+                        "h6": "p3",
+                        "h2": "B1",
+                        "a1": "K",
+                        "b8": "k",
+                    }
+                ),
                 moves="",
                 game_over=PlayerGameOverState.PLAYING,
             )
@@ -90,6 +95,14 @@ def test_game_smoke_test(
     assert session_content == session_content_expected
 
 
+@pytest.fixture
+def server_bot_enabled(settings):
+    settings.CHESS_SERVER_BOT = {**settings.CHESS_SERVER_BOT, "ENABLED": True}
+    get_server_bot.cache_clear()
+    yield
+    get_server_bot.cache_clear()
+
+
 @pytest.mark.parametrize(
     ("location", "expected_status_code"),
     (
@@ -164,6 +177,41 @@ def test_htmx_game_select_piece_returned_html(
         assert other_team_member_name not in response_html
 
 
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@pytest.mark.django_db
+def test_htmx_game_selection_status_for_client_side_selection(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    client: "DjangoClient",
+):
+    get_current_challenge_mock.return_value = challenge_minimalist
+
+    response = client.get("/")
+    assert_response_waiting_for_bot_move(response)
+    play_bot_move(client, challenge_minimalist.bot_first_move)  # type: ignore[arg-type]
+
+    # Pieces selected client-side only get the status bar and the speech bubble
+    # of the selection:
+    response = client.get("/htmx/pieces/f7/select/?board_id=main&parts=status")
+    assert response.status_code == HTTPStatus.OK
+    response_html = response.content.decode()
+    assert "QUEEN 1" in response_html
+    assert 'id="chess-board-status-bar-main"' in response_html
+    assert 'id="chess-speech-container-main"' in response_html
+    assert 'id="chess-board-pieces-main"' not in response_html
+    assert 'id="chess-board-available-targets-main"' not in response_html
+
+    # ...and so do their de-selection:
+    response = client.get("/htmx/no-selection/?board_id=main&parts=status")
+    assert response.status_code == HTTPStatus.OK
+    response_html = response.content.decode()
+    assert 'id="chess-board-status-bar-main"' in response_html
+    assert "QUEEN 1" not in response_html
+    assert 'id="chess-board-pieces-main"' not in response_html
+
+
 @pytest.mark.parametrize(
     ("input_", "expected_status_code"),
     (
@@ -346,3 +394,174 @@ def test_help_modal_smoke_test(
     assert "How to play" in response_content
     assert "restart" in response_content
     assert "characters" in response_content
+
+
+@pytest.mark.parametrize(
+    ("url", "view_name", "expected_loaded_parts"),
+    (
+        (
+            "/htmx/daily-challenge/modals/user-prefs/",
+            "htmx_daily_challenge_user_prefs_modal",
+            {"user_prefs"},
+        ),
+        (
+            "/htmx/daily-challenge/modals/stats/",
+            "htmx_daily_challenge_stats_modal",
+            {"challenge", "game_state"},
+        ),
+        (
+            "/htmx/daily-challenge/modals/help/",
+            "htmx_daily_challenge_help_modal",
+            {"challenge", "game_state", "user_prefs"},
+        ),
+    ),
+)
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@pytest.mark.django_db
+def test_game_context_parts_are_loaded_lazily(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    client: "DjangoClient",
+    # Test parameters
+    url: str,
+    view_name: str,
+    expected_loaded_parts: set[str],
+):
+    get_current_challenge_mock.return_value = challenge_minimalist
+    reset_game_context_usage()
+
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+
+    usage = get_game_context_usage()[view_name]
+    assert usage.calls_count == 1
+    assert set(usage.loads_count.keys()) == expected_loaded_parts
+    assert set(usage.load_durations.keys()) == expected_loaded_parts
+    # The current challenge is fetched only if the View needs it:
+    assert get_current_challenge_mock.called == ("challenge" in expected_loaded_parts)
+
+
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@pytest.mark.django_db
+def test_htmx_game_server_bot_move(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    client: "DjangoClient",
+    server_bot_enabled: None,
+):
+    get_current_challenge_mock.return_value = challenge_minimalist
+
+    response = client.get("/")
+    # The bot's very first move is not computed: it's part of the challenge.
+    assert_response_waiting_for_bot_move(response)
+    # ...and it's the only one the browser is allowed to play:
+    play_bot_move(client, "a7a6", expected_status_code=HTTPStatus.BAD_REQUEST)
+    play_bot_move(client, challenge_minimalist.bot_first_move)  # type: ignore[arg-type]
+
+    response = play_player_move(client, "h2g1")
+    response_html = response.content.decode()
+    # The browser doesn't have to compute the bot's move this time:
+    assert "playBotMove(" not in response_html
+    assert 'data-hx-post="/htmx/bot/pieces/server-move/?board_id=main"' in response_html
+    # ...and it can't choose it either:
+    play_bot_move(client, "a7a6", expected_status_code=HTTPStatus.BAD_REQUEST)
+
+    response = client.post("/htmx/bot/pieces/server-move/")
+    assert response.status_code == HTTPStatus.OK
+    [game_state] = get_session_content(client).games.values()
+    assert len(game_state.moves) == 3 * 4
+    assert " w " in game_state.fen
+
+    # It's now the player's turn: asking for a bot move redirects to the game
+    response = client.post("/htmx/bot/pieces/server-move/")
+    assert response.status_code == HTTPStatus.FOUND
+
+
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@pytest.mark.django_db
+def test_htmx_game_server_bot_move_fails_when_disabled(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    client: "DjangoClient",
+):
+    get_current_challenge_mock.return_value = challenge_minimalist
+
+    client.get("/")
+    play_bot_move(client, challenge_minimalist.bot_first_move)  # type: ignore[arg-type]
+    play_player_move(client, "h2g1")
+
+    response = client.post("/htmx/bot/pieces/server-move/")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    ("url", "render_functions"),
+    (
+        (
+            "/htmx/no-selection/",
+            ("DailyChallengeGamePresenter", "daily_challenge_moving_parts_fragment"),
+        ),
+        (
+            "/htmx/pieces/f7/select/",
+            ("DailyChallengeGamePresenter", "daily_challenge_moving_parts_fragment"),
+        ),
+        (
+            "/htmx/daily-challenge/modals/help/",
+            ("DailyChallengeGamePresenter", "help_modal"),
+        ),
+        ("/htmx/daily-challenge/modals/stats/", ("stats_modal",)),
+    ),
+)
+@mock.patch("apps.daily_challenge.business_logic.get_current_daily_challenge")
+@pytest.mark.django_db
+def test_htmx_fragments_conditional_get(
+    # Mocks
+    get_current_challenge_mock: mock.MagicMock,
+    # Test dependencies
+    challenge_minimalist: "DailyChallenge",
+    client: "DjangoClient",
+    # Test parameters
+    url: str,
+    render_functions: tuple[str, ...],
+):
+    from .. import views
+
+    get_current_challenge_mock.return_value = challenge_minimalist
+
+    client.get("/")
+    play_bot_move(client, challenge_minimalist.bot_first_move)  # type: ignore[arg-type]
+
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    etag = response["ETag"]
+    assert "private" in response["Cache-Control"]
+    assert "no-cache" in response["Cache-Control"]
+
+    # The client already has this version: nothing has to be rendered
+    with contextlib.ExitStack() as stack:
+        render_mocks = [
+            stack.enter_context(
+                mock.patch.object(
+                    views, function_name, wraps=getattr(views, function_name)
+                )
+            )
+            for function_name in render_functions
+        ]
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert response.content == b""
+        for render_mock in render_mocks:
+            render_mock.assert_not_called()
+
+    # Once the player has moved, their browser's version is stale:
+    play_player_move(client, "a1b1")
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response["ETag"] != etag
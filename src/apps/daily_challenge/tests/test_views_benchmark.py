@@ -0,0 +1,100 @@
+from typing import TYPE_CHECKING
+
+import pytest
+from django.core.management import call_command
+from django.urls import get_resolver
+
+from ..benchmarks.views_benchmark import (
+    GAME_SCRIPTS,
+    ViewsBenchmarkReport,
+    compare_views_benchmark_reports,
+    run_views_benchmark,
+)
+from ..models import DailyChallenge, DailyChallengeStats
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_game_scripts_cover_all_our_views():
+    _, app_resolver = get_resolver().namespace_dict["daily_challenge"]
+    routed_views = {
+        url_pattern.callback.__name__ for url_pattern in app_resolver.url_patterns
+    }
+    scripted_views = {
+        step.view_name for script in GAME_SCRIPTS for step in script.steps
+    }
+
+    assert scripted_views == routed_views
+
+
+@pytest.mark.django_db
+def test_views_benchmark():
+    challenges_count = DailyChallenge.objects.count()
+
+    report = run_views_benchmark(iterations=2)
+
+    select_piece_stats = report.views["htmx_game_select_piece"]
+    # 3 selections per iteration in the "select_and_move" script:
+    assert select_piece_stats.requests_count == 6
+    assert 0 < select_piece_stats.p50_ms <= select_piece_stats.p95_ms
+    assert select_piece_stats.allocated_kib > 0
+    # Rendering a selected piece doesn't need the database:
+    assert select_piece_stats.db_queries_count == 0
+
+    assert ViewsBenchmarkReport.from_json(report.to_json()) == report
+    assert compare_views_benchmark_reports(report, report)["game_view"] == 0
+
+    # The benchmark doesn't leave any trace in the database:
+    assert DailyChallenge.objects.count() == challenges_count
+    assert not DailyChallengeStats.objects.exists()
+
+
+@pytest.mark.django_db
+def test_views_benchmark_session_engines():
+    scripts = [script for script in GAME_SCRIPTS if script.name == "select_and_move"]
+
+    signed_cookies_report = run_views_benchmark(
+        iterations=1,
+        scripts=scripts,
+        session_engine="django.contrib.sessions.backends.signed_cookies",
+    )
+    sqlite_sessions_report = run_views_benchmark(
+        iterations=1,
+        scripts=scripts,
+        session_engine="apps.daily_challenge.sqlite_sessions",
+    )
+
+    assert sqlite_sessions_report.session_engine.endswith("sqlite_sessions")
+    for view_name in ("htmx_game_move_piece", "htmx_game_bot_move"):
+        signed_cookies_stats = signed_cookies_report.views[view_name]
+        sqlite_sessions_stats = sqlite_sessions_report.views[view_name]
+        # With the player state kept server-side, only a session key travels:
+        assert (
+            0
+            < sqlite_sessions_stats.request_cookie_bytes
+            < signed_cookies_stats.request_cookie_bytes
+        )
+        assert (
+            0
+            < sqlite_sessions_stats.response_cookie_bytes
+            < signed_cookies_stats.response_cookie_bytes
+        )
+
+
+@pytest.mark.django_db
+def test_dailychallenge_benchmark_views_command(tmp_path: "Path", capsys):
+    first_report_path = tmp_path / "first.json"
+    call_command(
+        "dailychallenge_benchmark_views", iterations=1, output=first_report_path
+    )
+    call_command(
+        "dailychallenge_benchmark_views",
+        iterations=1,
+        compare_with=first_report_path,
+    )
+
+    first_report = ViewsBenchmarkReport.from_json(first_report_path.read_bytes())
+    assert first_report.iterations == 1
+    assert "htmx_game_bot_move" in first_report.views
+    assert "p50 vs" in capsys.readouterr().out
@@ -92,8 +92,13 @@ urlpatterns = [
         views.htmx_game_bot_move,
         name="htmx_game_bot_move",
     ),
+    path(
+        "htmx/bot/pieces/server-move/",
+        views.htmx_game_server_bot_move,
+        name="htmx_game_server_bot_move",
+    ),
     # Debug views (staff only)
-    path("debug/reset-today/", views.debug_reset_today),
-    path("debug/reset-all-stats/", views.debug_reset_stats),
-    path("debug/view-cookie/", views.debug_view_cookie),
+    path("debug/reset-today/", views.debug_reset_today, name="debug_reset_today"),
+    path("debug/reset-all-stats/", views.debug_reset_stats, name="debug_reset_stats"),
+    path("debug/view-cookie/", views.debug_view_cookie, name="debug_view_cookie"),
 ]
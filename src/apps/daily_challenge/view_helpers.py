@@ -1,5 +1,12 @@
+import contextlib
+import copy
 import dataclasses
-from typing import TYPE_CHECKING, cast
+import logging
+import threading
+import time
+from collections import Counter
+from functools import cached_property
+from typing import TYPE_CHECKING, Literal, cast
 
 from .business_logic import manage_new_daily_challenge_stats_logic
 from .cookie_helpers import (
@@ -8,58 +15,146 @@ from .cookie_helpers import (
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from django.http import HttpRequest
 
     from apps.chess.models import UserPrefs
 
+    from .cookie_helpers import DailyChallengeStateForPlayer
     from .models import DailyChallenge, PlayerGameState, PlayerStats
 
+_logger = logging.getLogger(__name__)
+
+
+GameContextPart = Literal["user", "challenge", "game_state", "user_prefs"]
+
 
-@dataclasses.dataclass(eq=False, kw_only=True, frozen=True, slots=True)
 class GameContext:
     """
     A context object that holds the current daily challenge, the current game state,
     and some other data that is useful for our Views (aka "Controllers" in MVC).
-    """
 
-    challenge: "DailyChallenge"
+    Each part of it is loaded lazily, the first time it's accessed - so Views only pay
+    for what they use: the user prefs modal doesn't need to fetch the current challenge
+    from the database, for example.
+    """
 
-    is_preview: bool
-    is_staff_user: bool
-    """`is_preview` is True if we're in admin preview mode"""
-    game_state: "PlayerGameState"
-    stats: "PlayerStats"
-    user_prefs: "UserPrefs"
-    created: bool
-    """if the game state was created on the fly as we were initialising that object"""
-    board_id: str = "main"
+    def __init__(self, request: "HttpRequest", *, board_id: str = "main"):
+        self._request = request
+        self.board_id = board_id
+        self.load_durations: dict[GameContextPart, float] = {}
+        """how long it took to load each part of this context, in seconds"""
 
     @classmethod
     def create_from_request(cls, request: "HttpRequest") -> "GameContext":
-        is_staff_user: bool = request.user.is_staff
-        challenge, is_preview = get_current_daily_challenge_or_admin_preview(request)
-        game_state, stats, created = get_or_create_daily_challenge_state_for_player(
-            request=request, challenge=challenge
-        )
-        user_prefs = get_user_prefs_from_request(request)
         # TODO: validate the "board_id" data?
         board_id = cast(str, request.GET.get("board_id", "main"))
+        return cls(request, board_id=board_id)
+
+    @cached_property
+    def is_staff_user(self) -> bool:
+        with self._loading("user"):
+            return self._request.user.is_staff
+
+    @property
+    def challenge(self) -> "DailyChallenge":
+        return self._challenge_and_preview_flag[0]
+
+    @property
+    def is_preview(self) -> bool:
+        """`is_preview` is True if we're in admin preview mode"""
+        return self._challenge_and_preview_flag[1]
+
+    @property
+    def game_state(self) -> "PlayerGameState":
+        return self._state_for_player.game_state
+
+    @property
+    def stats(self) -> "PlayerStats":
+        return self._state_for_player.stats
+
+    @property
+    def created(self) -> bool:
+        """if the game state was created on the fly as we were loading it"""
+        return self._state_for_player.created
+
+    @cached_property
+    def user_prefs(self) -> "UserPrefs":
+        with self._loading("user_prefs"):
+            return get_user_prefs_from_request(self._request)
 
-        if created:
-            manage_new_daily_challenge_stats_logic(
-                stats, is_preview=is_preview, is_staff_user=is_preview
+    @property
+    def loaded_parts(self) -> frozenset[GameContextPart]:
+        return frozenset(self.load_durations)
+
+    @cached_property
+    def _challenge_and_preview_flag(self) -> tuple["DailyChallenge", bool]:
+        with self._loading("challenge"):
+            return get_current_daily_challenge_or_admin_preview(self._request)
+
+    @cached_property
+    def _state_for_player(self) -> "DailyChallengeStateForPlayer":
+        challenge, is_preview = self._challenge_and_preview_flag
+        with self._loading("game_state"):
+            state_for_player = get_or_create_daily_challenge_state_for_player(
+                request=self._request, challenge=challenge
             )
+            if state_for_player.created:
+                manage_new_daily_challenge_stats_logic(
+                    state_for_player.stats,
+                    is_preview=is_preview,
+                    is_staff_user=is_preview,
+                )
+        return state_for_player
+
+    @contextlib.contextmanager
+    def _loading(self, part: GameContextPart) -> "Iterator[None]":
+        start = time.perf_counter()
+        yield
+        self.load_durations[part] = time.perf_counter() - start
+
+
+@dataclasses.dataclass(kw_only=True)
+class GameContextViewUsage:
+    """What the GameContexts of a given View loaded, since the worker started."""
+
+    calls_count: int = 0
+    loads_count: Counter[GameContextPart] = dataclasses.field(default_factory=Counter)
+    load_durations: dict[GameContextPart, float] = dataclasses.field(
+        default_factory=dict
+    )
+    """total time spent loading each part, in seconds"""
+
 
-        return cls(
-            challenge=challenge,
-            is_preview=is_preview,
-            is_staff_user=is_staff_user,
-            game_state=game_state,
-            stats=stats,
-            user_prefs=user_prefs,
-            created=created,
-            board_id=board_id,
+_game_context_usage_by_view: dict[str, GameContextViewUsage] = {}
+_game_context_usage_lock = threading.Lock()
+
+
+def record_game_context_usage(view_name: str, ctx: GameContext) -> None:
+    _logger.debug(
+        "View '%s' loaded these GameContext parts: %s",
+        view_name,
+        ", ".join(sorted(ctx.loaded_parts)) or "none",
+    )
+    with _game_context_usage_lock:
+        usage = _game_context_usage_by_view.setdefault(
+            view_name, GameContextViewUsage()
         )
+        usage.calls_count += 1
+        usage.loads_count.update(ctx.loaded_parts)
+        for part, duration in ctx.load_durations.items():
+            usage.load_durations[part] = usage.load_durations.get(part, 0) + duration
+
+
+def get_game_context_usage() -> dict[str, GameContextViewUsage]:
+    with _game_context_usage_lock:
+        return copy.deepcopy(_game_context_usage_by_view)
+
+
+def reset_game_context_usage() -> None:
+    with _game_context_usage_lock:
+        _game_context_usage_by_view.clear()
 
 
 def get_current_daily_challenge_or_admin_preview(
@@ -8,12 +8,15 @@ from django.shortcuts import redirect, resolve_url
 from django.views.decorators.http import require_POST, require_safe
 from django_htmx.http import HttpResponseClientRedirect
 
+from apps.chess.board_roles import BoardRoles
 from apps.chess.helpers import get_active_player_side_from_fen, uci_move_squares
+from apps.chess.server_bot import get_server_bot
 from apps.chess.types import ChessInvalidActionException, ChessInvalidMoveException
 from apps.utils.view_decorators import user_is_staff
 from apps.utils.views_helpers import htmx_aware_redirect
 
 from .business_logic import (
+    get_challenge_move_graph,
     manage_daily_challenge_defeat_logic,
     manage_daily_challenge_moved_piece_logic,
     manage_daily_challenge_victory_logic,
@@ -28,6 +31,7 @@ from .components.misc_ui.user_prefs_modal import user_prefs_modal
 from .components.pages.daily_chess import (
     daily_challenge_moving_parts_fragment,
     daily_challenge_page,
+    daily_challenge_selection_status_fragment,
 )
 from .cookie_helpers import (
     clear_daily_challenge_game_state_in_session,
@@ -43,6 +47,7 @@ from .views_decorators import (
     handle_chess_logic_exceptions,
     redirect_if_game_not_started,
     with_game_context,
+    with_game_state_etag,
 )
 
 if TYPE_CHECKING:
@@ -70,7 +75,7 @@ def game_view(request: "HttpRequest", *, ctx: "GameContext") -> HttpResponse:
         )
 
         ctx.game_state.fen = ctx.challenge.fen_before_bot_first_move
-        ctx.game_state.piece_role_by_square = (
+        ctx.game_state.piece_role_by_square = BoardRoles.from_piece_role_by_square(
             ctx.challenge.piece_role_by_square_before_bot_first_move
         )
 
@@ -109,6 +114,7 @@ def game_view(request: "HttpRequest", *, ctx: "GameContext") -> HttpResponse:
 @require_safe
 @with_game_context
 @redirect_if_game_not_started
+@with_game_state_etag
 def htmx_game_no_selection(
     request: "HttpRequest", *, ctx: "GameContext"
 ) -> HttpResponse:
@@ -120,7 +126,7 @@ def htmx_game_no_selection(
         refresh_last_move=False,
     )
 
-    return _daily_challenge_moving_parts_fragment_response(
+    return _daily_challenge_selection_fragment_response(
         game_presenter=game_presenter, request=request, board_id=ctx.board_id
     )
 
@@ -129,6 +135,7 @@ def htmx_game_no_selection(
 @handle_chess_logic_exceptions
 @with_game_context
 @redirect_if_game_not_started
+@with_game_state_etag
 def htmx_game_select_piece(
     request: "HttpRequest", *, ctx: "GameContext", location: "Square"
 ) -> HttpResponse:
@@ -141,7 +148,7 @@ def htmx_game_select_piece(
         refresh_last_move=False,
     )
 
-    return _daily_challenge_moving_parts_fragment_response(
+    return _daily_challenge_selection_fragment_response(
         game_presenter=game_presenter, request=request, board_id=ctx.board_id
     )
 
@@ -170,7 +177,11 @@ def htmx_game_move_piece(
     _logger.info("Game state from player cookie: %s", ctx.game_state)
 
     new_game_state, captured_piece_role = move_daily_challenge_piece(
-        game_state=ctx.game_state, from_=from_, to=to, is_my_side=is_my_side
+        game_state=ctx.game_state,
+        from_=from_,
+        to=to,
+        is_my_side=is_my_side,
+        move_graph=get_challenge_move_graph(ctx.challenge),
     )
 
     just_won, just_lost = False, False
@@ -225,6 +236,7 @@ def htmx_game_move_piece(
 
 @require_safe
 @with_game_context
+@with_game_state_etag
 def htmx_daily_challenge_stats_modal(
     request: "HttpRequest", *, ctx: "GameContext"
 ) -> HttpResponse:
@@ -237,6 +249,7 @@ def htmx_daily_challenge_stats_modal(
 
 @require_safe
 @with_game_context
+@with_game_state_etag
 def htmx_daily_challenge_help_modal(
     request: "HttpRequest", *, ctx: "GameContext"
 ) -> HttpResponse:
@@ -472,6 +485,7 @@ def htmx_see_daily_challenge_solution_play(
         from_=target_move[0],
         to=target_move[1],
         is_my_side=False,
+        move_graph=get_challenge_move_graph(ctx.challenge),
     )
     assert new_game_state.solution_index is not None
     new_game_state.solution_index += 1
@@ -513,6 +527,14 @@ def htmx_game_bot_move(
         # It is not the bot's turn... something fishy is going on 😅
         return htmx_aware_redirect(request, "daily_challenge:daily_game_view")
 
+    if get_server_bot() is not None and not (
+        ctx.game_state.fen == ctx.challenge.fen_before_bot_first_move
+        and f"{from_}{to}" == ctx.challenge.bot_first_move
+    ):
+        # Our bot's moves are computed server-side: the only one the player's
+        # browser is allowed to play is the challenge's forced first move.
+        raise ChessInvalidActionException("Bot moves are computed server-side")
+
     return _play_bot_move(
         request=request,
         ctx=ctx,
@@ -521,6 +543,34 @@ def htmx_game_bot_move(
     )
 
 
+@require_POST
+@handle_chess_logic_exceptions
+@with_game_context
+@redirect_if_game_not_started
+def htmx_game_server_bot_move(
+    request: "HttpRequest", *, ctx: "GameContext"
+) -> HttpResponse:
+    # Same as `htmx_game_bot_move`, but the move is computed by our server-side bot
+    # rather than by the player's browser.
+    if (server_bot := get_server_bot()) is None:
+        raise ChessInvalidActionException("Server-side bot moves are disabled")
+
+    _logger.info("Game state from player cookie: %s", ctx.game_state)
+
+    active_player_side = get_active_player_side_from_fen(ctx.game_state.fen)
+    is_bot_turn = active_player_side == ctx.challenge.bot_side
+    if not is_bot_turn:
+        # It is not the bot's turn... something fishy is going on 😅
+        return htmx_aware_redirect(request, "daily_challenge:daily_game_view")
+
+    return _play_bot_move(
+        request=request,
+        ctx=ctx,
+        move=server_bot.get_move(fen=ctx.game_state.fen, depth=ctx.challenge.bot_depth),
+        board_id=ctx.board_id,
+    )
+
+
 @require_safe
 @user_passes_test(user_is_staff)
 @with_game_context
@@ -557,7 +607,8 @@ def debug_view_cookie(request: "HttpRequest") -> HttpResponse:
     )
 
     def format_struct(struct):
-        return msgspec.json.format(msgspec.json.encode(struct).decode())
+        # (our `BoardRoles` are displayed as regular dicts)
+        return msgspec.json.format(msgspec.json.encode(struct, enc_hook=dict).decode())
 
     return HttpResponse(
         f"""<p>Game state exists before check: {'no' if created else 'yes'}</p>"""
@@ -586,6 +637,7 @@ def _play_bot_move(
         from_=move[0],
         to=move[1],
         is_my_side=False,
+        move_graph=get_challenge_move_graph(ctx.challenge),
     )
 
     game_presenter = DailyChallengeGamePresenter(
@@ -631,6 +683,25 @@ def _daily_challenge_moving_parts_fragment_response(
     )
 
 
+def _daily_challenge_selection_fragment_response(
+    *,
+    game_presenter: DailyChallengeGamePresenter,
+    request: "HttpRequest",
+    board_id: str,
+) -> HttpResponse:
+    # When pieces are selected client-side, "chess-main.ts" only needs the status of
+    # the selection:
+    if request.GET.get("parts") == "status":
+        return HttpResponse(
+            daily_challenge_selection_status_fragment(
+                game_presenter=game_presenter, board_id=board_id
+            )
+        )
+    return _daily_challenge_moving_parts_fragment_response(
+        game_presenter=game_presenter, request=request, board_id=board_id
+    )
+
+
 @functools.lru_cache(maxsize=20)
 def _daily_challenge_move_for_solution_index(
     challenge_solution: str, solution_index: int
@@ -1,19 +1,30 @@
 import functools
+import hashlib
 from typing import TYPE_CHECKING
 
+import msgspec
+from django.conf import settings
 from django.core.exceptions import BadRequest
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.timezone import now
 
 from apps.chess.types import ChessLogicException
 
 from ..utils.views_helpers import htmx_aware_redirect
-from .cookie_helpers import clear_daily_challenge_game_state_in_session
-from .view_helpers import GameContext
+from .cookie_helpers import (
+    clear_daily_challenge_game_state_in_session,
+    get_player_state_version,
+)
+from .view_helpers import GameContext, record_game_context_usage
 
 if TYPE_CHECKING:
     from django.http import HttpRequest, HttpResponse
 
     from .models import PlayerStats
 
+_ETAG_ENCODER = msgspec.msgpack.Encoder()
+
 
 def handle_chess_logic_exceptions(func):
     @functools.wraps(func)
@@ -30,7 +41,10 @@ def with_game_context(func):
     @functools.wraps(func)
     def wrapper(request: "HttpRequest", *args, **kwargs):
         ctx = GameContext.create_from_request(request)
-        return func(request, *args, ctx=ctx, **kwargs)
+        try:
+            return func(request, *args, ctx=ctx, **kwargs)
+        finally:
+            record_game_context_usage(func.__name__, ctx)
 
     return wrapper
 
@@ -45,6 +59,49 @@ def redirect_if_game_not_started(func):
     return wrapper
 
 
+def with_game_state_etag(func):
+    """
+    For the safe views that only depend on the challenge and the player's state:
+    they get an ETag, and clients that already have the response for the current
+    state get a "304 Not Modified" - without us having to render it again.
+    Must be applied after `with_game_context`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(request: "HttpRequest", *args, ctx: GameContext, **kwargs):
+        # (in development our code changes without the version changing)
+        if settings.DEBUG:
+            return func(request, *args, ctx=ctx, **kwargs)
+
+        etag = quote_etag(_game_state_fingerprint(request, ctx))
+        if (
+            not_modified_response := get_conditional_response(request, etag=etag)
+        ) is None:
+            response = func(request, *args, ctx=ctx, **kwargs)
+        else:
+            response = not_modified_response
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            # Each player has their own state, and it must be revalidated each time:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
+
+
+def _game_state_fingerprint(request: "HttpRequest", ctx: GameContext) -> str:
+    key_fields = (
+        settings.ZAKUCHESS_VERSION,
+        request.get_full_path(),  # the view, its parameters and the board ID
+        ctx.challenge.id,
+        ctx.challenge.updated_at.isoformat(),
+        ctx.is_preview,
+        now().date().isoformat(),
+        *get_player_state_version(request),
+    )
+    return hashlib.blake2b(_ETAG_ENCODER.encode(key_fields), digest_size=16).hexdigest()
+
+
 def _redirect_to_game_view_screen_with_brand_new_game(
     request: "HttpRequest", player_stats: "PlayerStats"
 ) -> "HttpResponse":
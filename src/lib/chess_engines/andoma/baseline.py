@@ -0,0 +1,124 @@
+# N.B. Copy-pasted from https://github.com/healeycodes/andoma, as it was before our
+# ZakuChess changes to `movegeneration.py`: a fixed-depth minimax, without iterative
+# deepening, transposition table or killer/history moves.
+# It's only used as the baseline of our `chess_engines_bench` benchmark - the only
+# change is the `nodes` counter, which replaces upstream's `debug_info`.
+
+import chess
+
+from .evaluate import evaluate_board
+from .movegeneration import MATE_SCORE, MATE_THRESHOLD, get_ordered_moves
+
+
+class BaselineSearcher:
+    def __init__(self) -> None:
+        self.nodes = 0
+
+    def search(self, board: chess.Board, depth: int) -> chess.Move:
+        self.nodes = 0
+        return self.minimax_root(depth, board)
+
+    def minimax_root(self, depth: int, board: chess.Board) -> chess.Move:
+        """
+        What is the highest value move per our evaluation function?
+        """
+        # White always wants to maximize (and black to minimize)
+        # the board score according to evaluate_board()
+        maximize = board.turn == chess.WHITE
+        best_move = -float("inf")
+        if not maximize:
+            best_move = float("inf")
+
+        moves = get_ordered_moves(board)
+        best_move_found = moves[0]
+
+        for move in moves:
+            board.push(move)
+            # Checking if draw can be claimed at this level, because the threefold repetition check
+            # can be expensive. This should help the bot avoid a draw if it's not favorable
+            # https://python-chess.readthedocs.io/en/latest/core.html#chess.Board.can_claim_draw
+            if board.can_claim_draw():
+                value = 0.0
+            else:
+                value = self.minimax(
+                    depth - 1, board, -float("inf"), float("inf"), not maximize
+                )
+            board.pop()
+            if maximize and value >= best_move:
+                best_move = value
+                best_move_found = move
+            elif not maximize and value <= best_move:
+                best_move = value
+                best_move_found = move
+
+        return best_move_found
+
+    def minimax(
+        self,
+        depth: int,
+        board: chess.Board,
+        alpha: float,
+        beta: float,
+        is_maximising_player: bool,
+    ) -> float:
+        """
+        Core minimax logic.
+        https://en.wikipedia.org/wiki/Minimax
+        """
+        self.nodes += 1
+
+        if board.is_checkmate():
+            # The previous move resulted in checkmate
+            return -MATE_SCORE if is_maximising_player else MATE_SCORE
+        # When the game is over and it's not a checkmate it's a draw
+        # In this case, don't evaluate. Just return a neutral result: zero
+        elif board.is_game_over():
+            return 0
+
+        if depth == 0:
+            return evaluate_board(board)
+
+        if is_maximising_player:
+            best_move = -float("inf")
+            moves = get_ordered_moves(board)
+            for move in moves:
+                board.push(move)
+                curr_move = self.minimax(
+                    depth - 1, board, alpha, beta, not is_maximising_player
+                )
+                # Each ply after a checkmate is slower, so they get ranked slightly less
+                # We want the fastest mate!
+                if curr_move > MATE_THRESHOLD:
+                    curr_move -= 1
+                elif curr_move < -MATE_THRESHOLD:
+                    curr_move += 1
+                best_move = max(
+                    best_move,
+                    curr_move,
+                )
+                board.pop()
+                alpha = max(alpha, best_move)
+                if beta <= alpha:
+                    return best_move
+            return best_move
+        else:
+            best_move = float("inf")
+            moves = get_ordered_moves(board)
+            for move in moves:
+                board.push(move)
+                curr_move = self.minimax(
+                    depth - 1, board, alpha, beta, not is_maximising_player
+                )
+                if curr_move > MATE_THRESHOLD:
+                    curr_move -= 1
+                elif curr_move < -MATE_THRESHOLD:
+                    curr_move += 1
+                best_move = min(
+                    best_move,
+                    curr_move,
+                )
+                board.pop()
+                beta = min(beta, best_move)
+                if beta <= alpha:
+                    return best_move
+            return best_move
@@ -1,30 +1,131 @@
 # N.B. Copy-pasted from https://github.com/healeycodes/andoma
+# ZakuChess additions: search budgets, a Zobrist-hashed transposition table,
+# iterative deepening, captures-first and (opt-in) killer/history moves ordering and a
+# root-parallel search.
 
 import time
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
 
 import chess
+import chess.polyglot
 
 from .evaluate import check_end_game, evaluate_board, move_value
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
 debug_info: Dict[str, Any] = {}
 
 
 MATE_SCORE = 1000000000
 MATE_THRESHOLD = 999000000
 
+# Flags of our transposition table's entries: is the stored value exact,
+# or only a bound of the position's actual value?
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class SearchBudgetExceeded(Exception):
+    """Raised when a search exceeds its time or nodes budget."""
+
+
+class TranspositionTableEntry(NamedTuple):
+    key: int
+    depth: int
+    value: float
+    flag: int
+    move: Optional[chess.Move]
+    generation: int
+
 
-def next_move(depth: int, board: chess.Board, debug=True) -> chess.Move:
+class TranspositionTable:
     """
-    What is the next best move?
+    A fixed-capacity table of search results, keyed by the positions' Zobrist hash.
+
+    Each key can only be stored in one slot (`key % capacity`). When 2 positions
+    compete for the same slot, the entry is replaced if it comes from a previous
+    search, or if the new result was searched at least as deep.
     """
-    debug_info.clear()
-    debug_info["nodes"] = 0
-    t0 = time.time()
 
-    move = minimax_root(depth, board)
+    def __init__(self, capacity: int = 2**16):
+        self.capacity = capacity
+        self._slots: List[Optional[TranspositionTableEntry]] = [None] * capacity
+        self.generation = 0
+        self.probes = self.hits = self.stores = 0
+
+    def new_search(self) -> None:
+        """Entries of previous searches become the first candidates for replacement."""
+        self.generation += 1
+
+    def probe(self, key: int) -> Optional[TranspositionTableEntry]:
+        self.probes += 1
+        entry = self._slots[key % self.capacity]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(
+        self,
+        key: int,
+        depth: int,
+        value: float,
+        flag: int,
+        move: Optional[chess.Move],
+    ) -> None:
+        index = key % self.capacity
+        current = self._slots[index]
+        if (
+            current is None
+            or current.generation != self.generation
+            or current.key == key
+            or depth >= current.depth
+        ):
+            self._slots[index] = TranspositionTableEntry(
+                key, depth, value, flag, move, self.generation
+            )
+            self.stores += 1
+
+    def occupancy(self) -> float:
+        return sum(1 for entry in self._slots if entry is not None) / self.capacity
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+
+def next_move(
+    depth: int,
+    board: chess.Board,
+    debug=True,
+    *,
+    time_limit: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+    transposition_table: Optional[TranspositionTable] = None,
+    executor: "Optional[Executor]" = None,
+    workers: int = 1,
+) -> chess.Move:
+    """
+    What is the next best move?
 
-    debug_info["time"] = time.time() - t0
+    We search with iterative deepening: if a time limit (in seconds) or a nodes
+    budget is given, we return the best move of the deepest search that fit in it.
+    With an `executor`, the root moves of the last depth are searched in parallel
+    - the nodes budget only applies to the depths searched in this process.
+    """
+    searcher = Searcher(
+        transposition_table=(
+            transposition_table
+            if transposition_table is not None
+            else TranspositionTable()
+        ),
+        max_nodes=max_nodes,
+        executor=executor,
+        workers=workers,
+    )
+    move = searcher.search(board, depth, time_limit=time_limit)
+
+    debug_info.clear()
+    debug_info.update(searcher.stats())
     if debug:
         print(f"info {debug_info}")
     return move
@@ -47,101 +148,392 @@ def get_ordered_moves(board: chess.Board) -> List[chess.Move]:
     return list(in_order)
 
 
-def minimax_root(depth: int, board: chess.Board) -> chess.Move:
+class Searcher:
     """
-    What is the highest value move per our evaluation function?
+    Alpha-beta minimax, with iterative deepening.
+    The transposition table and the "captures first" moves ordering can be disabled,
+    mostly to benchmark what they bring. The killer/history moves ordering heuristics
+    are disabled by default: on our benchmark positions they don't spare any nodes
+    once the captures are searched first.
+
+    With an `executor` (a process pool, typically), the root moves of the last
+    iteration are searched by `workers` processes in parallel - see
+    `_search_root_in_parallel()`.
     """
-    # White always wants to maximize (and black to minimize)
-    # the board score according to evaluate_board()
-    maximize = board.turn == chess.WHITE
-    best_move = -float("inf")
-    if not maximize:
-        best_move = float("inf")
 
-    moves = get_ordered_moves(board)
-    best_move_found = moves[0]
+    def __init__(
+        self,
+        *,
+        transposition_table: Optional[TranspositionTable] = None,
+        order_captures_first: bool = True,
+        use_move_ordering_heuristics: bool = False,
+        max_nodes: Optional[int] = None,
+        executor: "Optional[Executor]" = None,
+        workers: int = 1,
+    ):
+        self.transposition_table = transposition_table
+        self.order_captures_first = order_captures_first
+        self.use_move_ordering_heuristics = use_move_ordering_heuristics
+        self.max_nodes = max_nodes
+        self.executor = executor
+        self.workers = workers
+        self.deadline: Optional[float] = None
+        self.nodes = 0
+        self.completed_depth = 0
+        # The score of the best move found by the deepest completed search,
+        # according to evaluate_board() - i.e. from White's point of view:
+        self.score: Optional[float] = None
+        # How long it took to complete each depth, in seconds:
+        self.time_to_depth: List[float] = []
+        # The last 2 quiet moves that produced a beta cutoff, by ply:
+        self._killers: Dict[int, List[chess.Move]] = {}
+        # How much each (from, to) quiet move produced beta cutoffs:
+        self._history: Dict[Tuple[chess.Square, chess.Square], int] = {}
+
+    def search(
+        self, board: chess.Board, depth: int, *, time_limit: Optional[float] = None
+    ) -> chess.Move:
+        start = time.time()
+        self.deadline = start + time_limit if time_limit is not None else None
+        self.nodes = 0
+        self.completed_depth = 0
+        self.score = None
+        self.time_to_depth = []
+        self._killers.clear()
+        self._history.clear()
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+
+        best_move = get_ordered_moves(board)[0]
+        for current_depth in range(1, depth + 1):
+            parallel = (
+                self.executor is not None
+                and self.workers > 1
+                and current_depth == depth
+            )
+            try:
+                # (an interrupted search doesn't pop its moves: let's work on a copy)
+                if parallel:
+                    best_move, self.score = self._search_root_in_parallel(
+                        board.copy(), current_depth
+                    )
+                else:
+                    best_move, self.score = self._search_root(
+                        board.copy(), current_depth
+                    )
+            except SearchBudgetExceeded:
+                break
+            self.completed_depth = current_depth
+            self.time_to_depth.append(time.time() - start)
+        return best_move
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = self.time_to_depth[-1] if self.time_to_depth else 0.0
+        stats: Dict[str, Any] = {
+            "nodes": self.nodes,
+            "depth": self.completed_depth,
+            "time": elapsed,
+            "nps": round(self.nodes / elapsed) if elapsed else 0,
+        }
+        if (table := self.transposition_table) is not None:
+            stats["tt_hit_rate"] = round(table.hit_rate(), 3)
+        return stats
+
+    def _search_root(self, board: chess.Board, depth: int) -> Tuple[chess.Move, float]:
+        # White always wants to maximize (and black to minimize)
+        # the board score according to evaluate_board()
+        maximize = board.turn == chess.WHITE
+        best_value = -float("inf") if maximize else float("inf")
+        alpha, beta = -float("inf"), float("inf")
+
+        key = chess.polyglot.zobrist_hash(board)
+        moves = self._ordered_moves(board, 0, self._transposition_move(key))
+        best_move_found = moves[0]
+
+        for move in moves:
+            value = self._search_root_move(board, move, depth, alpha, beta)
+            if maximize and value > best_value:
+                best_value, best_move_found = value, move
+                alpha = max(alpha, value)
+            elif not maximize and value < best_value:
+                best_value, best_move_found = value, move
+                beta = min(beta, value)
+
+        if self.transposition_table is not None:
+            self.transposition_table.store(
+                key, depth, best_value, EXACT, best_move_found
+            )
+        return best_move_found, best_value
+
+    def _search_root_in_parallel(
+        self, board: chess.Board, depth: int
+    ) -> Tuple[chess.Move, float]:
+        """
+        Searches the root moves in rounds of `workers` moves, with the alpha-beta
+        bounds of the previous rounds.
+
+        The moves are ordered like `_search_root()` would do it, and the results of
+        each round are processed in that order: a move only replaces the best one
+        if it's strictly better. Since our search values don't depend on the order
+        the positions were visited in, we get the same move as the serial search.
+        """
+        assert self.executor is not None
+        maximize = board.turn == chess.WHITE
+        best_value = -float("inf") if maximize else float("inf")
+        alpha, beta = -float("inf"), float("inf")
+
+        key = chess.polyglot.zobrist_hash(board)
+        moves = self._ordered_moves(board, 0, self._transposition_move(key))
+        best_move_found = moves[0]
+
+        # The first move is likely to be the best one: we search it here, so the
+        # next rounds start with a tight bound.
+        rounds = [moves[:1]] + [
+            moves[i : i + self.workers] for i in range(1, len(moves), self.workers)
+        ]
+        for round_index, round_moves in enumerate(rounds):
+            if round_index == 0:
+                results = [
+                    (
+                        self._search_root_move(
+                            board, round_moves[0], depth, alpha, beta
+                        ),
+                        0,
+                    )
+                ]
+            else:
+                futures = [
+                    self.executor.submit(
+                        _search_root_move_in_worker,
+                        board,
+                        move,
+                        depth,
+                        alpha,
+                        beta,
+                        self.deadline,
+                        self.order_captures_first,
+                        self.use_move_ordering_heuristics,
+                        self._killers,
+                        self._history,
+                    )
+                    for move in round_moves
+                ]
+                results = [future.result() for future in futures]
+            for move, (value, nodes) in zip(round_moves, results):
+                self.nodes += nodes
+                if maximize and value > best_value:
+                    best_value, best_move_found = value, move
+                    alpha = max(alpha, value)
+                elif not maximize and value < best_value:
+                    best_value, best_move_found = value, move
+                    beta = min(beta, value)
 
-    for move in moves:
+        if self.transposition_table is not None:
+            self.transposition_table.store(
+                key, depth, best_value, EXACT, best_move_found
+            )
+        return best_move_found, best_value
+
+    def _search_root_move(
+        self,
+        board: chess.Board,
+        move: chess.Move,
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> float:
+        maximize = board.turn == chess.WHITE
         board.push(move)
-        # Checking if draw can be claimed at this level, because the threefold repetition check
-        # can be expensive. This should help the bot avoid a draw if it's not favorable
-        # https://python-chess.readthedocs.io/en/latest/core.html#chess.Board.can_claim_draw
-        if board.can_claim_draw():
+        # Checking if a draw can be claimed at this level helps the bot avoid a
+        # draw if it's not favorable - but `board.can_claim_draw()` also
+        # generates all the opponent's moves, so we only check the position
+        # itself.
+        if board.halfmove_clock >= 100 or board.is_repetition(3):
             value = 0.0
         else:
-            value = minimax(depth - 1, board, -float("inf"), float("inf"), not maximize)
+            value = self._minimax(depth - 1, board, alpha, beta, not maximize, 1)
         board.pop()
-        if maximize and value >= best_move:
-            best_move = value
-            best_move_found = move
-        elif not maximize and value <= best_move:
-            best_move = value
-            best_move_found = move
+        return value
 
-    return best_move_found
+    def _minimax(
+        self,
+        depth: int,
+        board: chess.Board,
+        alpha: float,
+        beta: float,
+        is_maximising_player: bool,
+        ply: int,
+    ) -> float:
+        """
+        Core minimax logic.
+        https://en.wikipedia.org/wiki/Minimax
+        """
+        self.nodes += 1
+        self._check_search_budget()
 
+        outcome = board.outcome()
+        if outcome is not None:
+            if outcome.termination == chess.Termination.CHECKMATE:
+                # The previous move resulted in checkmate
+                return -MATE_SCORE if is_maximising_player else MATE_SCORE
+            # When the game is over and it's not a checkmate it's a draw
+            # In this case, don't evaluate. Just return a neutral result: zero
+            return 0
 
-def minimax(
-    depth: int,
-    board: chess.Board,
-    alpha: float,
-    beta: float,
-    is_maximising_player: bool,
-) -> float:
-    """
-    Core minimax logic.
-    https://en.wikipedia.org/wiki/Minimax
-    """
-    debug_info["nodes"] += 1
-
-    if board.is_checkmate():
-        # The previous move resulted in checkmate
-        return -MATE_SCORE if is_maximising_player else MATE_SCORE
-    # When the game is over and it's not a checkmate it's a draw
-    # In this case, don't evaluate. Just return a neutral result: zero
-    elif board.is_game_over():
-        return 0
+        if depth == 0:
+            return evaluate_board(board)
 
-    if depth == 0:
-        return evaluate_board(board)
+        table = self.transposition_table
+        key = 0
+        transposition_move = None
+        if table is not None:
+            key = chess.polyglot.zobrist_hash(board)
+            entry = table.probe(key)
+            if entry is not None:
+                transposition_move = entry.move
+                # (we don't use results of deeper searches: this way a position's
+                # value doesn't depend on the order the positions were visited in)
+                if entry.depth == depth:
+                    if entry.flag == EXACT:
+                        return entry.value
+                    if entry.flag == LOWER_BOUND:
+                        alpha = max(alpha, entry.value)
+                    else:
+                        beta = min(beta, entry.value)
+                    if alpha >= beta:
+                        return entry.value
 
-    if is_maximising_player:
-        best_move = -float("inf")
-        moves = get_ordered_moves(board)
-        for move in moves:
+        original_alpha, original_beta = alpha, beta
+        best_value = -float("inf") if is_maximising_player else float("inf")
+        best_move: Optional[chess.Move] = None
+        for move in self._ordered_moves(board, ply, transposition_move):
             board.push(move)
-            curr_move = minimax(depth - 1, board, alpha, beta, not is_maximising_player)
-            # Each ply after a checkmate is slower, so they get ranked slightly less
-            # We want the fastest mate!
-            if curr_move > MATE_THRESHOLD:
-                curr_move -= 1
-            elif curr_move < -MATE_THRESHOLD:
-                curr_move += 1
-            best_move = max(
-                best_move,
-                curr_move,
+            value = self._minimax(
+                depth - 1, board, alpha, beta, not is_maximising_player, ply + 1
             )
             board.pop()
-            alpha = max(alpha, best_move)
+            # Each ply after a checkmate is slower, so they get ranked slightly less
+            # We want the fastest mate!
+            if value > MATE_THRESHOLD:
+                value -= 1
+            elif value < -MATE_THRESHOLD:
+                value += 1
+            if is_maximising_player:
+                if value > best_value:
+                    best_value, best_move = value, move
+                alpha = max(alpha, best_value)
+            else:
+                if value < best_value:
+                    best_value, best_move = value, move
+                beta = min(beta, best_value)
             if beta <= alpha:
-                return best_move
-        return best_move
-    else:
-        best_move = float("inf")
-        moves = get_ordered_moves(board)
-        for move in moves:
-            board.push(move)
-            curr_move = minimax(depth - 1, board, alpha, beta, not is_maximising_player)
-            if curr_move > MATE_THRESHOLD:
-                curr_move -= 1
-            elif curr_move < -MATE_THRESHOLD:
-                curr_move += 1
-            best_move = min(
-                best_move,
-                curr_move,
+                self._record_cutoff(board, move, depth, ply)
+                break
+
+        if table is not None:
+            if best_value <= original_alpha:
+                flag = UPPER_BOUND
+            elif best_value >= original_beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            # (when all the moves failed low, the "best" one is just noise)
+            table.store(
+                key,
+                depth,
+                best_value,
+                flag,
+                None if flag == UPPER_BOUND else best_move,
             )
-            board.pop()
-            beta = min(beta, best_move)
-            if beta <= alpha:
-                return best_move
-        return best_move
+        return best_value
+
+    def _ordered_moves(
+        self, board: chess.Board, ply: int, transposition_move: Optional[chess.Move]
+    ) -> List[chess.Move]:
+        moves = get_ordered_moves(board)
+        if not self.order_captures_first and not self.use_move_ordering_heuristics:
+            if transposition_move in moves:
+                moves.remove(transposition_move)
+                moves.insert(0, transposition_move)
+            return moves
+
+        # N.B. andoma's own ordering ranks the captures which "lose" material (per its
+        # naive trade evaluation, which ignores defenders) behind the quiet moves:
+        # searching all the captures first is what actually shrinks our search tree.
+        killers = (
+            self._killers.get(ply, ()) if self.use_move_ordering_heuristics else ()
+        )
+        history = self._history
+
+        def priority(indexed_move: Tuple[int, chess.Move]) -> Tuple[int, int, int]:
+            index, move = indexed_move
+            if move == transposition_move:
+                return (0, 0, index)
+            if move.promotion is not None or board.is_capture(move):
+                return (1, 0, index)
+            if move in killers:
+                return (2, 0, index)
+            return (3, -history.get((move.from_square, move.to_square), 0), index)
+
+        return [move for _, move in sorted(enumerate(moves), key=priority)]
+
+    def _record_cutoff(
+        self, board: chess.Board, move: chess.Move, depth: int, ply: int
+    ) -> None:
+        if not self.use_move_ordering_heuristics or board.is_capture(move):
+            return
+        killers = self._killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        history_key = (move.from_square, move.to_square)
+        self._history[history_key] = self._history.get(history_key, 0) + depth * depth
+
+    def _transposition_move(self, key: int) -> Optional[chess.Move]:
+        if self.transposition_table is None:
+            return None
+        entry = self.transposition_table.probe(key)
+        return entry.move if entry is not None else None
+
+    def _check_search_budget(self) -> None:
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchBudgetExceeded()
+        # (checking the clock is not free, so we don't do it for every single node)
+        if self.deadline is not None and self.nodes % 256 == 0:
+            if time.time() > self.deadline:
+                raise SearchBudgetExceeded()
+
+
+# Each worker process keeps its own transposition table from one root move to the
+# next one.
+_worker_transposition_table: Optional[TranspositionTable] = None
+
+
+def _search_root_move_in_worker(
+    board: chess.Board,
+    move: chess.Move,
+    depth: int,
+    alpha: float,
+    beta: float,
+    deadline: Optional[float],
+    order_captures_first: bool,
+    use_move_ordering_heuristics: bool,
+    killers: Dict[int, List[chess.Move]],
+    history: Dict[Tuple[chess.Square, chess.Square], int],
+) -> Tuple[float, int]:
+    """Returns the value of the given root move, and the number of nodes searched."""
+    global _worker_transposition_table
+    if _worker_transposition_table is None:
+        _worker_transposition_table = TranspositionTable()
+    _worker_transposition_table.new_search()
+
+    searcher = Searcher(
+        transposition_table=_worker_transposition_table,
+        order_captures_first=order_captures_first,
+        use_move_ordering_heuristics=use_move_ordering_heuristics,
+    )
+    searcher.deadline = deadline
+    # (the moves ordering heuristics of the previous iterations are a good start)
+    searcher._killers, searcher._history = killers, history
+    value = searcher._search_root_move(board, move, depth, alpha, beta)
+    return value, searcher.nodes
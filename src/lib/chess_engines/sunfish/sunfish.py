@@ -9,7 +9,7 @@ from __future__ import print_function
 import re
 import sys
 import time
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from itertools import count
 
 ###############################################################################
@@ -475,7 +475,9 @@ MATE_LOWER = piece["K"] - 10 * piece["Q"]
 MATE_UPPER = piece["K"] + 10 * piece["Q"]
 
 # The table size is the maximum number of elements in the transposition table.
-TABLE_SIZE = 1e7
+# N.B. ZakuChess: upstream uses 1e7 - which is way too much for a long-lived web
+# server process, where our searches are budgeted anyway.
+TABLE_SIZE = 200_000
 
 # Constants for tuning search
 QS_LIMIT = 219
@@ -627,11 +629,63 @@ class Position(namedtuple("Position", "board score wc bc ep kp")):
 # lower <= s(pos) <= upper
 Entry = namedtuple("Entry", "lower upper")
 
+# N.B. ZakuChess: upstream's tables are plain dicts, which are cleared when they
+# become too large. Ours have a fixed capacity instead, and evict their oldest
+# entries first - so they can be shared by the searches of a game's successive
+# positions.
+TableStats = namedtuple("TableStats", "size capacity occupancy hits probes hit_rate")
+
+
+class BoundedTable:
+    """A dict-like table, which never holds more than `capacity` entries.
+    When it's full, the entry which was stored the longest time ago is replaced."""
+
+    def __init__(self, capacity=TABLE_SIZE):
+        self.capacity = int(capacity)
+        self._entries = OrderedDict()
+        self.hits = self.probes = 0
+
+    def get(self, key, default=None):
+        self.probes += 1
+        value = self._entries.get(key)
+        if value is None:
+            return default
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        entries = self._entries
+        if key in entries:
+            # A fresh result for this key: it's not old anymore
+            entries.move_to_end(key)
+        elif len(entries) >= self.capacity:
+            entries.popitem(last=False)
+        entries[key] = value
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        size = len(self._entries)
+        return TableStats(
+            size=size,
+            capacity=self.capacity,
+            occupancy=size / self.capacity,
+            hits=self.hits,
+            probes=self.probes,
+            hit_rate=self.hits / self.probes if self.probes else 0.0,
+        )
+
 
 class Searcher:
-    def __init__(self):
-        self.tp_score = {}
-        self.tp_move = {}
+    def __init__(self, tp_move=None, table_size=TABLE_SIZE):
+        """tp_move -- the killer moves' table of a previous searcher, if we search
+        the next positions of the same game"""
+        self.tp_score = BoundedTable(table_size)
+        self.tp_move = tp_move if tp_move is not None else BoundedTable(table_size)
         self.history = set()
         self.nodes = 0
 
@@ -716,9 +770,6 @@ class Searcher:
         for move, score in moves():
             best = max(best, score)
             if best >= gamma:
-                # Clear before setting, so we always have a value
-                if len(self.tp_move) > TABLE_SIZE:
-                    self.tp_move.clear()
                 # Save the move for pv construction and killer heuristic
                 self.tp_move[pos] = move
                 break
@@ -742,9 +793,6 @@ class Searcher:
                 in_check = is_dead(pos.nullmove())
                 best = -MATE_UPPER if in_check else 0
 
-        # Clear before setting, so we always have a value
-        if len(self.tp_score) > TABLE_SIZE:
-            self.tp_score.clear()
         # Table part 2
         if best >= gamma:
             self.tp_score[pos, depth, root] = Entry(best, entry.upper)
@@ -1,5 +1,8 @@
+import subprocess
 from typing import TYPE_CHECKING, Literal, TypeAlias
 
+from django.conf import settings
+
 if TYPE_CHECKING:
     import enum
     from collections.abc import Sequence
@@ -13,3 +16,17 @@ def enum_to_django_choices(enum_class: "type[enum.Enum]") -> "Sequence[DjangoCho
 
 def literal_to_django_choices(literal: "type[Literal]") -> "Sequence[DjangoChoice]":  # type: ignore[valid-type]
     return [(value, value) for value in literal.__args__]
+
+
+def get_git_revision() -> str | None:
+    """Returns the short hash of the project's current git commit, if we can get it."""
+    try:
+        return subprocess.run(
+            ("git", "rev-parse", "--short", "HEAD"),
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import re
 from os import environ as env
 from pathlib import Path
 
@@ -112,7 +113,14 @@ CACHES = {
 # Sessions
 # https://docs.djangoproject.com/en/5.1/topics/http/sessions/#using-cookie-based-sessions
 
-SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+# The "apps.daily_challenge.sqlite_sessions" engine can be used instead: it keeps the
+# players' state on the server, in a SQLite file, and only gives them a session key.
+SESSION_ENGINE = env.get(
+    "SESSION_ENGINE", "django.contrib.sessions.backends.signed_cookies"
+)
+SESSION_SQLITE_PATH = env.get(
+    "SESSION_SQLITE_PATH", str(BASE_DIR / "sessions.sqlite3")
+)
 
 # 6 months by default, so users can stop playing for a few months, come back, and see
 # that they didn't lose their stats.
@@ -195,3 +203,81 @@ JS_CHESS_ENGINE = env.get("JS_CHESS_ENGINE", "stockfish")
 MASTODON_PAGE = env.get("MASTODON_PAGE")
 CANONICAL_URL = env.get("CANONICAL_URL", "https://zakuchess.com/")
 DEBUG_LAYOUT = env.get("DEBUG_LAYOUT", "") == "1"
+
+# Results of our chess moves calculations, shared between our Gunicorn workers:
+CHESS_MOVE_RESULTS_CACHE = {
+    "BACKEND": env.get(
+        "CHESS_MOVE_RESULTS_CACHE_BACKEND",
+        "apps.chess.move_results_cache.SQLiteMoveResultsCache",
+    ),
+    "OPTIONS": {
+        "max_size": int(env.get("CHESS_MOVE_RESULTS_CACHE_MAX_SIZE", "10000")),
+    },
+}
+if CHESS_MOVE_RESULTS_CACHE["BACKEND"].endswith(".SQLiteMoveResultsCache"):
+    # (the path defaults to a file in the system's temporary directory)
+    CHESS_MOVE_RESULTS_CACHE["OPTIONS"]["path"] = env.get(
+        "CHESS_MOVE_RESULTS_CACHE_PATH"
+    )
+
+# Gunicorn kills the workers which take longer than its `--timeout` (30 seconds by
+# default) to answer a request: our slow operations must stay well under it.
+_gunicorn_timeout = re.search(r"--timeout[= ](\d+)", env.get("GUNICORN_CMD_ARGS", ""))
+GUNICORN_TIMEOUT = int(_gunicorn_timeout[1]) if _gunicorn_timeout else 30
+
+# Our bot's moves can be computed server-side by our Python chess engines, rather
+# than by Stockfish WASM in the player's browser:
+CHESS_SERVER_BOT = {
+    "ENABLED": env.get("CHESS_SERVER_BOT_ENABLED", "0") == "1",
+    "ENGINE": env.get("CHESS_SERVER_BOT_ENGINE", "andoma"),  # or "sunfish"
+    "TIME_BUDGET": float(env.get("CHESS_SERVER_BOT_TIME_BUDGET", "1.0")),  # seconds
+    "NODES_BUDGET": int(env.get("CHESS_SERVER_BOT_NODES_BUDGET", "200000")),
+    "WORKERS": int(env.get("CHESS_SERVER_BOT_WORKERS", "2")),
+    "CACHE_MAX_SIZE": int(env.get("CHESS_SERVER_BOT_CACHE_MAX_SIZE", "2000")),
+    # How long a request waits for the workers' move, before falling back to an
+    # instant one (seconds):
+    "MAX_WAIT": float(
+        env.get("CHESS_SERVER_BOT_MAX_WAIT", str(GUNICORN_TIMEOUT / 2))
+    ),
+}
+
+# Stockfish is used in the Django Admin, to compute the score of our daily challenges.
+# Its processes are kept alive between calls, in a bounded pool:
+STOCKFISH_PATH = env.get("STOCKFISH_PATH", "stockfish")
+STOCKFISH_TIME_LIMIT = float(env.get("STOCKFISH_TIME_LIMIT", "0.1"))  # seconds
+STOCKFISH_POOL = {
+    "SIZE": int(env.get("STOCKFISH_POOL_SIZE", "2")),
+    "ACQUIRE_TIMEOUT": float(env.get("STOCKFISH_POOL_ACQUIRE_TIMEOUT", "10")),
+    "HEALTH_CHECK_INTERVAL": float(
+        env.get("STOCKFISH_POOL_HEALTH_CHECK_INTERVAL", "30")
+    ),
+}
+
+# Our workers keep the current daily challenge in memory, and check this file to know
+# when challenges have been edited by another process:
+# (it defaults to a file in the system's temporary directory)
+DAILY_CHALLENGE_VERSION_STAMP_PATH = env.get("DAILY_CHALLENGE_VERSION_STAMP_PATH")
+
+# Our DailyChallengeStats counters are aggregated in memory by each worker, and
+# written to the database in batches:
+DAILY_CHALLENGE_STATS_COUNTERS_BUFFER = {
+    "ENABLED": env.get("DAILY_CHALLENGE_STATS_COUNTERS_BUFFER_ENABLED", "1") == "1",
+    "FLUSH_INTERVAL": float(
+        env.get("DAILY_CHALLENGE_STATS_COUNTERS_FLUSH_INTERVAL", "10")
+    ),
+    "FLUSH_THRESHOLD": int(
+        env.get("DAILY_CHALLENGE_STATS_COUNTERS_FLUSH_THRESHOLD", "50")
+    ),
+}
+
+# The HTML fragments of our chess boards are cached by each worker:
+DAILY_CHALLENGE_FRAGMENTS_RENDER_CACHE = {
+    "ENABLED": env.get("DAILY_CHALLENGE_FRAGMENTS_RENDER_CACHE_ENABLED", "1") == "1",
+    "MAX_SIZE": int(env.get("DAILY_CHALLENGE_FRAGMENTS_RENDER_CACHE_MAX_SIZE", "2000")),
+}
+
+# The legal targets of all the pieces are shipped with the chess board, so that
+# selecting a piece doesn't need a round-trip to the server:
+DAILY_CHALLENGE_CLIENT_SIDE_PIECE_SELECTION = (
+    env.get("DAILY_CHALLENGE_CLIENT_SIDE_PIECE_SELECTION", "1") == "1"
+)
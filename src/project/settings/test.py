@@ -7,3 +7,12 @@ from .development import *
 # To be efficient password hashers have to be slow by design
 # --> let's speed up our password hashing by purposefully opting for a weak algorithm during tests :-)
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Tests don't share anything between processes:
+CHESS_MOVE_RESULTS_CACHE = {
+    "BACKEND": "apps.chess.move_results_cache.LocMemMoveResultsCache",
+}
+CHESS_SERVER_BOT = {**CHESS_SERVER_BOT, "ENABLED": False, "WORKERS": 0}
+
+# Our tests check the stats straight after each request:
+DAILY_CHALLENGE_STATS_COUNTERS_BUFFER = {"ENABLED": False}
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings.production")
 
 application = get_wsgi_application()
+
+# Each Gunicorn worker loads this module when it boots (i.e. also when a worker is
+# recycled), so that's our chance to warm up our in-memory caches:
+from apps.daily_challenge.business_logic import (  # noqa: E402
+    warm_up_current_daily_challenge_cache,
+)
+
+warm_up_current_daily_challenge_cache()